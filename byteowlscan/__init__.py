@@ -1,3 +1,10 @@
 # my_library/__init__.py
 # Main init file for the library
-from .main import run
+# run is imported on first access, so that "import byteowlscan" stays fast
+__all__ = ["run"]
+
+def __getattr__(name):
+    if name == "run":
+        from .main import run
+        return run
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,21 @@
 import argparse
+import functools
 import logging
 import os
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
-import openai
 import yaml
 from tqdm import tqdm
 
-from byteowlscan.models import extract_gpt
-from byteowlscan.utilities import (AppConfig, app_prompt, app_utilities,
-                                   initArgs)
+from byteowlscan.models import batch_gpt, extract_gpt, gpt_scheduler
+from byteowlscan.utilities import (AppConfig, app_utilities, initArgs, local_extract, metrics,
+                                   output_sink, pipeline, result_cache, run_manifest, text_compaction)
+from byteowlscan.utilities.json_merge import JsonMerger
+from byteowlscan.utilities.lazy_import import lazy_module
+
+openai = lazy_module("openai")
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +38,7 @@ def setup_logging(config_file: str = 'logging_config.yaml') -> None:
         ]
     )
 
+@metrics.timed("stage_seconds", stage="preprocess")
 def preprocessing_with_gpt(extracted_text: str) -> str:
     """Preprocess text with GPT.
 
@@ -41,17 +48,24 @@ def preprocessing_with_gpt(extracted_text: str) -> str:
     Returns:
         str: The preprocessed text.
     """
-    preprocessing_prompt = app_prompt.generatePreProcessPrompt(extracted_text)
-    response = openai.ChatCompletion.create(
-        model=AppConfig.get("OPENAI_MODEL"),
-        messages=[
-            {"role": "system", "content": AppConfig.get("OPENAI_PREPROCESS_SYSTEM_CONTENT_PROMPT")},
-            {"role": "user", "content": preprocessing_prompt}
-        ],
-        max_tokens=AppConfig.get("OPENAI_MAX_TOKENS"),
-        temperature=AppConfig.get("OPENAI_TEMPERATURE"),
-    )
-    return response['choices'][0]['message']['content']
+    request = extract_gpt.build_preprocess_request(extracted_text)
+    cache = result_cache.get_result_cache()
+    cache_key = extract_gpt.preprocess_cache_key(extracted_text, request)
+    cached = cache.get("preprocessed", cache_key) if cache is not None else None
+    if cached is not None:
+        logger.info("Preprocessed text loaded from cache.")
+        return cached
+
+    response = gpt_scheduler.get_scheduler().call(openai.ChatCompletion.create, request)
+    metrics.record_usage(response, "preprocess")
+    retry = extract_gpt.full_budget_request(request, response, AppConfig.get("OPENAI_MAX_TOKENS"))
+    if retry is not None:
+        response = gpt_scheduler.get_scheduler().call(openai.ChatCompletion.create, retry)
+        metrics.record_usage(response, "preprocess")
+    processed_text = response['choices'][0]['message']['content']
+    if cache is not None:
+        cache.set("preprocessed", cache_key, processed_text)
+    return processed_text
 
 def process_resume(args: argparse.Namespace) -> Dict:
     """Process resumes with GPT and save the extracted information.
@@ -66,17 +80,328 @@ def process_resume(args: argparse.Namespace) -> Dict:
     final_data: Dict = {}
 
     logger.info("--- Start scanning resumes ---")
-    logger.info("---- Executing ViScanCV Pipeline ----")
-    progress_bar = tqdm(files_to_process, desc="Processing files", unit="file", colour="green")
+    manifest: run_manifest.RunManifest = run_manifest.RunManifest(run_manifest.manifest_path(args))
+    run_id: int = manifest.start_run(len(files_to_process), vars(args))
+    if args.resume:
+        files_to_process = manifest.pending(run_id, files_to_process)
+
+    try:
+        with output_sink.get_output_sink(args) as sink:
+            # Successes are recorded once the sink has written them, so --resume retries buffered ones
+            record: functools.partial = functools.partial(
+                record_when_durable, sink=sink,
+                record_fn=functools.partial(record_resume, manifest=manifest, run_id=run_id),
+            )
+            if args.batchMode:
+                logger.info("---- Executing ViScanCV Pipeline (Batch API) ----")
+                return process_resume_batch(files_to_process, args, sink, record)
+            if args.enablePipeline:
+                logger.info("---- Executing ViScanCV Pipeline (concurrent) ----")
+                return process_resume_pipeline(files_to_process, args, sink, record)
+
+            logger.info("---- Executing ViScanCV Pipeline ----")
+            progress_bar = tqdm(files_to_process, desc="Processing files", unit="file", colour="green")
+
+            for resume_path in progress_bar:
+                logger.info("Processing resume: %s", resume_path)
+                started: float = time.perf_counter()
+                try:
+                    with metrics.timer("resume_seconds"):
+                        extracted_text: str = app_utilities.parse_resume(resume_path)
+                        parsed: float = time.perf_counter()
+                        resume_data: Dict = extract_resume_stage(resume_path, extracted_text, args)
+                        extracted: float = time.perf_counter()
+                        timings: Dict = {"parse": parsed - started, "extract": extracted - parsed, "total": extracted - started}
+                        output_path: str = save_resume_stage(resume_path, resume_data, timings, extracted_text.sha256,
+                                                             args=args, sink=sink)
+                except Exception as e:
+                    logger.error("Processing failed for %s: %s", resume_path, e)
+                    metrics.inc("resumes_total", status="failed")
+                    record(resume_path, None, str(e), {"total": time.perf_counter() - started})
+                    continue
+                final_data = resume_data
+                metrics.inc("resumes_total", status="succeeded")
+                record(resume_path, output_path, None, timings, extracted_text.sha256)
+    finally:
+        manifest.finish_run(run_id)
+        manifest.log_summary(run_id)
+        logger.info("Process Completed!")
+    return final_data
 
-    for resume_path in progress_bar:
-        logger.info("Processing resume: %s", resume_path)
-        extracted_text: str = app_utilities.parse_resume(resume_path)
-        processed_text: str = preprocess_resume_text(extracted_text, args.preprocessWithGPT)
-        final_data = extract_information_from_resume(processed_text, args, final_data, resume_path)
+def record_resume(resume_path: str, output_path: str, error: str, timings: Dict, sha256: str = None, *,
+                  manifest: run_manifest.RunManifest, run_id: int) -> None:
+    """Record the outcome of one resume in the run manifest.
 
-    logger.info("Process Completed!")
-    return final_data
+    Args:
+        resume_path (str): The path to the resume.
+        output_path (str): Where the result was written, None if it failed.
+        error (str): The error message, None if it succeeded.
+        timings (dict): Seconds spent in each stage.
+        sha256 (str, optional): Content hash of the resume, computed from the file when not given.
+        manifest (RunManifest): The run manifest.
+        run_id (int): The id of the current run.
+    """
+    status: str = run_manifest.FAILED if error else run_manifest.SUCCEEDED
+    manifest.record(run_id, resume_path, status, output=output_path, error=error, seconds=timings.get("total"),
+                    sha256=sha256)
+
+def record_when_durable(resume_path: str, output_path: str, error: str, timings: Dict, sha256: str = None, *,
+                        sink: output_sink.OutputSink, record_fn) -> None:
+    """Record the outcome of one resume, a success only once its result is on disk.
+
+    JSON-lines sinks buffer records, so a resume written to one is recorded when
+    the sink flushes it. A crash before then leaves it pending for ``--resume``, and
+    a failed flush, which drops the batch, records it as failed.
+
+    Args:
+        resume_path (str): The path to the resume.
+        output_path (str): Where the result was written, None if it failed.
+        error (str): The error message, None if it succeeded.
+        timings (dict): Seconds spent in each stage.
+        sha256 (str, optional): Content hash of the resume.
+        sink (OutputSink): Where the result was written.
+        record_fn (callable): Records the outcome, see ``record_resume``.
+    """
+    if error:
+        record_fn(resume_path, output_path, error, timings, sha256)
+    else:
+        sink.when_durable(resume_path, functools.partial(record_fn, resume_path, output_path, error, timings, sha256),
+                          on_error=functools.partial(record_fn, resume_path, None, timings=timings, sha256=sha256))
+
+def process_resume_pipeline(files_to_process: List[str], args: argparse.Namespace,
+                            sink: output_sink.OutputSink, record_fn=None) -> Dict:
+    """Process resumes through the staged concurrent pipeline.
+
+    Parsing runs on a process pool sized to the cores, GPT calls run with
+    ``gptConcurrency`` threads and results are saved by a single writer.
+
+    Args:
+        files_to_process (list): Paths of the resumes to process.
+        args (argparse.Namespace): Command line arguments.
+        sink (OutputSink): Where the results are written.
+        record_fn (callable, optional): Called with the outcome of each resume, see ``record_resume``.
+
+    Returns:
+        dict: The number of resumes that ``succeeded`` and ``failed``, empty if none
+        succeeded. The extracted information is not kept in memory, it is in the sink.
+    """
+    counts: Dict = pipeline.run_pipeline(
+        files_to_process,
+        parse_fn=app_utilities.parse_resume,
+        extract_fn=functools.partial(extract_resume_stage, args=args),
+        save_fn=functools.partial(save_resume_stage, args=args, sink=sink),
+        done_fn=record_fn,
+        parse_workers=args.parseWorkers or AppConfig.get("PIPELINE_PARSE_WORKERS"),
+        extract_workers=args.gptConcurrency or AppConfig.get("PIPELINE_GPT_CONCURRENCY", 4),
+        queue_size=args.queueSize or AppConfig.get("PIPELINE_QUEUE_SIZE", 16),
+        initializer=init_parse_worker,
+        # Parse workers already run in parallel, so each one OCRs with few processes of its own
+        initargs=(dict(AppConfig.config, OCR_WORKERS=AppConfig.get("PIPELINE_OCR_WORKERS", 1)),),
+    )
+    return counts if counts["succeeded"] else {}
+
+def process_resume_batch(files_to_process: List[str], args: argparse.Namespace,
+                         sink: output_sink.OutputSink, record_fn=None) -> Dict:
+    """Process resumes through the OpenAI Batch API.
+
+    All the resumes are parsed and compacted first, on the parse process pool. Their
+    preprocessing and extraction requests are then sent as batches, with a custom id
+    stable per resume and chunk. The answers are matched back to their resume, parsed
+    like interactive ones and saved. Meant for large offline backlogs: batches cost
+    less and do not count against the rate limits, but may take up to
+    ``BATCH_COMPLETION_WINDOW``.
+
+    Args:
+        files_to_process (list): Paths of the resumes to process.
+        args (argparse.Namespace): Command line arguments.
+        sink (OutputSink): Where the results are written.
+        record_fn (callable, optional): Called with the outcome of each resume, see ``record_resume``.
+
+    Returns:
+        dict: The extracted information keyed by resume path.
+    """
+    started: float = time.perf_counter()
+    batch_dir: str = os.path.join(args.outputDir or AppConfig.get("APP_RESULT_FILEPATH", "./outputs"),
+                                  AppConfig.get("BATCH_DIRECTORY", "batches"))
+    texts: Dict = {}
+    timings: Dict = {}
+    hashes: Dict = {}
+    formats: Dict = {}
+    results: Dict = {}
+
+    def finish(resume_path: str, output_path: str, error: str) -> None:
+        timings[resume_path]["total"] = time.perf_counter() - started
+        metrics.observe("resume_seconds", timings[resume_path]["total"])
+        metrics.inc("resumes_total", status="failed" if error else "succeeded")
+        if error:
+            logger.error("Processing failed for %s: %s", resume_path, error)
+            texts.pop(resume_path, None)
+        if record_fn is not None:
+            record_fn(resume_path, output_path, error, timings[resume_path], hashes.get(resume_path))
+
+    parsed = pipeline.parse_files(
+        files_to_process, app_utilities.parse_resume,
+        workers=args.parseWorkers or AppConfig.get("PIPELINE_PARSE_WORKERS"),
+        initializer=init_parse_worker,
+        initargs=(dict(AppConfig.config, OCR_WORKERS=AppConfig.get("PIPELINE_OCR_WORKERS", 1)),),
+    )
+    for resume_path, text, seconds, error in tqdm(parsed, total=len(files_to_process), desc="Parsing files",
+                                                  unit="file", colour="green"):
+        timings[resume_path] = {"parse": seconds}
+        if error:
+            finish(resume_path, None, error)
+        else:
+            hashes[resume_path] = text.sha256
+            formats[resume_path] = text.file_format
+            texts[resume_path] = text_compaction.compact_resume_text(text, resume_path)
+
+    if args.preprocessWithGPT:
+        cache = result_cache.get_result_cache()
+        requests: Dict = {}
+        for resume_path, text in texts.items():
+            request = extract_gpt.build_preprocess_request(text)
+            cached = cache.get("preprocessed", extract_gpt.preprocess_cache_key(text, request)) if cache is not None else None
+            if cached is not None:
+                texts[resume_path] = cached
+            else:
+                requests[batch_gpt.custom_id("preprocess", resume_path)] = request
+        answers: Dict = batch_gpt.complete_in_batches(requests, batch_dir, "preprocess", AppConfig.get("OPENAI_MAX_TOKENS"))
+        for resume_path in list(texts):
+            request_id: str = batch_gpt.custom_id("preprocess", resume_path)
+            if request_id not in answers:
+                continue
+            body, error = answers[request_id]
+            try:
+                processed_text: str = None if error else body['choices'][0]['message']['content']
+            except (KeyError, IndexError, TypeError) as e:
+                error = f"Unexpected answer: {e!r}"
+            if error:
+                finish(resume_path, None, f"Preprocessing failed: {error}")
+                continue
+            if cache is not None:
+                cache.set("preprocessed", extract_gpt.preprocess_cache_key(texts[resume_path], requests[request_id]),
+                          processed_text)
+            texts[resume_path] = processed_text
+
+    local_data: Dict = {}
+    for resume_path, text in texts.items():
+        local_data[resume_path], texts[resume_path] = local_extract.pre_extract_resume(text, resume_path)
+    # Resumes fully extracted locally send no request
+    chunks: Dict = {resume_path: [] if not text.strip() else
+                    split_resume_text(resume_path, text, args, formats[resume_path]) if args.enableChunk or args.chunkBySection
+                    else [(None, text)]
+                    for resume_path, text in texts.items()}
+    requests = {}
+    cache_keys: Dict = {}
+    extracted: Dict = {}
+    for resume_path, text_chunks in chunks.items():
+        for i, (sections, chunk) in enumerate(text_chunks):
+            request_id = batch_gpt.custom_id("extract", resume_path, i)
+            request = extract_gpt.build_extract_request(chunk, args, sections)
+            cache_keys[request_id] = extract_gpt.extract_cache_key(chunk, request, sections)
+            cached = extract_gpt.get_cached_extraction(cache_keys[request_id])
+            if cached is not None:
+                extracted[request_id] = cached
+            else:
+                requests[request_id] = request
+    answers = batch_gpt.complete_in_batches(requests, batch_dir, "extract", extract_gpt.get_model_settings(args)[1])
+
+    for resume_path, text_chunks in chunks.items():
+        timings[resume_path]["extract"] = time.perf_counter() - started - (timings[resume_path]["parse"] or 0.0)
+        chunk_results: List = []
+        error: str = None
+        for i in range(len(text_chunks)):
+            request_id = batch_gpt.custom_id("extract", resume_path, i)
+            if request_id not in extracted:
+                body, error = answers[request_id]
+                if error:
+                    break
+                # One malformed answer fails its resume, not the whole batch
+                try:
+                    extracted[request_id] = extract_gpt.parse_json_response(body['choices'][0]['message']['content'].strip())
+                except Exception as e:
+                    error = str(e) or repr(e)
+                    break
+                extract_gpt.cache_extraction(cache_keys[request_id], extracted[request_id],
+                                             body['choices'][0].get('finish_reason'))
+            chunk_results.append(extracted[request_id])
+        if error:
+            finish(resume_path, None, f"Extraction failed: {error}")
+            continue
+
+        if args.enableChunk or args.chunkBySection:
+            merger: JsonMerger = JsonMerger({})
+            for chunk_data in chunk_results:
+                merger.add(chunk_data)
+            resume_data = merger.result
+        else:
+            resume_data = chunk_results[0] if chunk_results else {}
+        resume_data = local_extract.merge_local_fields(local_data[resume_path], resume_data)
+        timings[resume_path]["total"] = time.perf_counter() - started
+        try:
+            output_path: str = save_resume_stage(resume_path, resume_data, timings[resume_path], hashes[resume_path],
+                                                 args=args, sink=sink)
+        except Exception as e:
+            finish(resume_path, None, str(e))
+            continue
+        results[resume_path] = resume_data
+        finish(resume_path, output_path, None)
+
+    logger.info("Batch run finished: %d/%d resumes succeeded in %.1fs", len(results), len(files_to_process),
+                time.perf_counter() - started)
+    return results
+
+def init_parse_worker(config: Dict) -> None:
+    """Initialize a pipeline parse worker process.
+
+    Args:
+        config (dict): The application configuration.
+    """
+    AppConfig.set_config(config)
+    metrics.enable(config.get("METRICS_ENABLED", False))
+
+def extract_resume_stage(resume_path: str, extracted_text: str, args: argparse.Namespace) -> Dict:
+    """Preprocess and extract information from the text of one resume.
+
+    Contact fields are extracted locally first (see ``local_extract.pre_extract``),
+    and GPT only gets the rest of the text.
+
+    Args:
+        resume_path (str): The path to the resume.
+        extracted_text (str): The text extracted from the resume.
+        args (argparse.Namespace): Command line arguments.
+
+    Returns:
+        dict: The extracted information of the resume.
+    """
+    compacted_text: str = text_compaction.compact_resume_text(extracted_text, resume_path)
+    processed_text: str = preprocess_resume_text(compacted_text, args.preprocessWithGPT)
+    local_data, residual_text = local_extract.pre_extract_resume(processed_text, resume_path)
+    if not residual_text.strip():
+        return local_data
+    final_data: Dict = extract_information_from_resume(residual_text, args, {}, resume_path,
+                                                       getattr(extracted_text, "file_format", None))
+    return local_extract.merge_local_fields(local_data, final_data)
+
+@metrics.timed("stage_seconds", stage="save")
+def save_resume_stage(resume_path: str, final_data: Dict, timings: Dict = None, sha256: str = None, *,
+                      args: argparse.Namespace, sink: output_sink.OutputSink) -> str:
+    """Save the extracted information of one resume.
+
+    Args:
+        resume_path (str): The path to the resume.
+        final_data (dict): The extracted information of the resume.
+        timings (dict, optional): Seconds spent in each stage, stored with the record.
+        sha256 (str, optional): Content hash of the resume, stored with the record.
+        args (argparse.Namespace): Command line arguments.
+        sink (OutputSink): Where the result is written.
+
+    Returns:
+        str: Where the result was written.
+    """
+    output_path: str = sink.write(resume_path, final_data, timings, sha256)
+    logger.info("Resume processed successfully: %s -> %s", resume_path, output_path)
+    return output_path
 
 def get_files_list(args: argparse.Namespace) -> List[str]:
     """Get the list of files to be processed.
@@ -108,32 +433,107 @@ def preprocess_resume_text(extracted_text: str, preprocess_with_gpt: bool) -> st
         return preprocessing_with_gpt(extracted_text)
     return extracted_text
 
-def extract_information_from_resume(extracted_text: str, args: argparse.Namespace, final_data: Dict, resume_path: str) -> Dict:
+def extract_information_from_resume(extracted_text: str, args: argparse.Namespace, final_data: Dict, resume_path: str,
+                                    file_format: str = None) -> Dict:
     """Extract information from resume text.
 
     Args:
         extracted_text (str): The text extracted from the resume.
         args (argparse.Namespace): Command line arguments.
-        final_data (dict): The accumulated extracted data from previous resumes.
+        final_data (dict): The data to merge the chunk results into.
         resume_path (str): The path to the current resume being processed.
+        file_format (str, optional): Format of the resume, detected again when not given.
 
     Returns:
         dict: The updated extracted information.
     """
-    if args.enableChunk:
-        text_chunks: List[str] = app_utilities.process_text_in_chunks(resume_path, extracted_text)
-        for i, chunk in enumerate(text_chunks):
-            logger.info("Processing chunk %d/%d...", i + 1, len(text_chunks))
-            chunk_data: Dict = app_utilities.extract_information_with_gpt(chunk)
-            final_data = app_utilities.merge_json_data(final_data, chunk_data)
+    if args.enableChunk or args.chunkBySection:
+        text_chunks: List[Tuple] = split_resume_text(resume_path, extracted_text, args, file_format)
+        final_data = extract_chunks_concurrently(text_chunks, args, final_data)
     else:
         logger.info("Extracting information with GPT...")
         final_data = extract_gpt.extract_information_with_gpt(extracted_text, args)
-    
-    app_utilities.save_to_json(final_data, resume_path, args)
-    logger.info("Resume processed successfully: %s", resume_path)
+
     return final_data
 
+def split_resume_text(resume_path: str, extracted_text: str, args: argparse.Namespace,
+                      file_format: str = None) -> List[Tuple]:
+    """Split resume text into the chunks extracted separately.
+
+    With ``chunkBySection``, the text is split on its section headings and each chunk
+    is extracted with the prompt of its sections. Texts without a known heading, and
+    ``enableChunk`` alone, fall back to the token-count splitter and the full prompt.
+
+    Args:
+        resume_path (str): The path to the resume.
+        extracted_text (str): The text of the resume.
+        args (argparse.Namespace): Command line arguments.
+        file_format (str, optional): Format of the resume, detected again when not given.
+
+    Returns:
+        list: ``(sections, chunk)`` pairs, ``sections`` being None for the full prompt.
+    """
+    if args.chunkBySection:
+        sections: List[Tuple] = app_utilities.process_text_in_sections(resume_path, extracted_text,
+                                                                        file_format=file_format)
+        if sections:
+            logger.info("Split into %d section chunks: %s", len(sections),
+                        "; ".join(", ".join(keys) for keys, _ in sections))
+            return sections
+        logger.info("No section heading found in %s, splitting by tokens.", resume_path)
+    return [(None, chunk) for chunk in app_utilities.process_text_in_chunks(resume_path, extracted_text,
+                                                                          file_format=file_format)]
+
+def extract_chunks_concurrently(text_chunks: List[Tuple], args: argparse.Namespace, final_data: Dict) -> Dict:
+    """Extract information from the chunks of a resume concurrently.
+
+    Chunk requests are sent at once, up to ``chunkConcurrency`` per resume, and the
+    results are merged in chunk order as they arrive, so the output is identical to
+    extracting the chunks one after another.
+
+    Args:
+        text_chunks (list): The ``(sections, chunk)`` pairs of the resume text, see ``split_resume_text``.
+        args (argparse.Namespace): Command line arguments.
+        final_data (dict): The data to merge the chunk results into.
+
+    Returns:
+        dict: The merged extracted information.
+    """
+    if not text_chunks:
+        return final_data
+
+    concurrency: int = args.chunkConcurrency or AppConfig.get("CHUNK_CONCURRENCY", 4)
+    merger: JsonMerger = JsonMerger(final_data)
+    started: float = time.perf_counter()
+    chunk_seconds: float = 0.0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(text_chunks)))) as executor:
+        futures = [executor.submit(extract_chunk, chunk, args, sections) for sections, chunk in text_chunks]
+        for i, future in enumerate(futures):
+            chunk_data, elapsed = future.result()
+            chunk_seconds += elapsed
+            logger.info("Chunk %d/%d extracted in %.2fs", i + 1, len(text_chunks), elapsed)
+            merger.add(chunk_data)
+
+    logger.info("Extracted %d chunks in %.2fs (%.2fs of chunk requests)",
+                len(text_chunks), time.perf_counter() - started, chunk_seconds)
+    return merger.result
+
+def extract_chunk(chunk: str, args: argparse.Namespace, sections: Tuple = None) -> Tuple[Dict, float]:
+    """Extract information from one chunk and time the request.
+
+    Args:
+        chunk (str): The chunk of resume text.
+        args (argparse.Namespace): Command line arguments.
+        sections (tuple, optional): Schema keys of the sections in the chunk, None for the full prompt.
+
+    Returns:
+        tuple: The extracted chunk data and the seconds it took.
+    """
+    started: float = time.perf_counter()
+    chunk_data: Dict = extract_gpt.extract_information_with_gpt(chunk, args, sections)
+    return chunk_data, time.perf_counter() - started
+
 def run_process(args: argparse.Namespace) -> Dict:
     """Run the resume processing pipeline.
 
@@ -156,7 +556,19 @@ def validate_paths(args: argparse.Namespace) -> None:
         args.filePath = input("Enter the file path (PDF, DOCX, or Image): ")
 
     if args.outputDir and not os.path.exists(args.outputDir):
-        os.mkdir(args.outputDir)
+        os.makedirs(args.outputDir)
+
+def export_metrics(args: argparse.Namespace) -> None:
+    """Export the metrics of the run, if metrics are enabled.
+
+    Args:
+        args (argparse.Namespace): Command line arguments.
+    """
+    if not metrics.is_enabled():
+        return
+    metrics_file: str = args.metricsFile or AppConfig.get("METRICS_FILE", "metrics.json")
+    metrics_format: str = args.metricsFormat or AppConfig.get("METRICS_FORMAT", "json")
+    metrics.export(metrics_file, metrics_format)
 
 def run(args: argparse.Namespace = None) -> None:
     """Main function to run the resume scanning script.
@@ -170,9 +582,17 @@ def run(args: argparse.Namespace = None) -> None:
     
     file_config: str = args.config if args and args.config else "../config.yaml"
     AppConfig.init_config(file_config)
+    if args.enableCache:
+        AppConfig.set("CACHE_ENABLED", True)
+    if args.metricsFile:
+        AppConfig.set("METRICS_ENABLED", True)
+    metrics.enable(AppConfig.get("METRICS_ENABLED", False))
     openai.api_key = AppConfig.get("OPENAI_API_KEY")
+    openai.api_base = AppConfig.get("OPENAI_API_BASE", openai.api_base)
 
     structured_data: Dict = run_process(args)
+    gpt_scheduler.get_scheduler().log_summary()
+    export_metrics(args)
     if structured_data:
         logger.info("Information extracted and structured data saved successfully.")
     else:
@@ -1,6 +1,18 @@
 # my_library/__init__.py
 # Main init file for the library
-from .extract_gpt import extract_information_with_gpt
-from .extract_model import extract_text_from_pdf
-from .extract_model import extract_text_from_word
-from .extract_model import extract_text_from_image
\ No newline at end of file
+# The functions are imported on first access, so that importing one model does not load them all
+import importlib
+
+_exports = {
+    "extract_information_with_gpt": ".extract_gpt",
+    "extract_text_from_pdf": ".extract_model",
+    "extract_text_from_word": ".extract_model",
+    "extract_text_from_image": ".extract_model",
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name in _exports:
+        return getattr(importlib.import_module(_exports[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+import aiohttp
+import openai
+from byteowlscan.models import extract_gpt, gpt_scheduler
+from byteowlscan.utilities import AppConfig, metrics, result_cache
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+class AsyncGPTClient:
+    """
+    Asyncio client for the extraction and preprocessing GPT calls.
+
+    All requests share one pooled ``aiohttp`` session with keep-alive connections,
+    and a semaphore caps the number of requests in flight. Use it as an async
+    context manager::
+
+        async with AsyncGPTClient(max_in_flight=200) as client:
+            results = await asyncio.gather(*(client.extract_information(text, args) for text in texts))
+    """
+
+    def __init__(self, max_in_flight=None, connection_limit=None, keepalive_timeout=None, request_timeout=None):
+        """
+        Args:
+            max_in_flight (int): Maximum number of concurrent requests.
+            connection_limit (int): Maximum number of pooled connections, defaults to ``max_in_flight``.
+            keepalive_timeout (float): Seconds an idle connection is kept open.
+            request_timeout (float): Total timeout of one request in seconds.
+        """
+        self.max_in_flight = max_in_flight or AppConfig.get("OPENAI_MAX_IN_FLIGHT", 100)
+        self.connection_limit = connection_limit or self.max_in_flight
+        self.keepalive_timeout = keepalive_timeout or AppConfig.get("OPENAI_KEEPALIVE_TIMEOUT", 30)
+        self.request_timeout = request_timeout or AppConfig.get("OPENAI_REQUEST_TIMEOUT", 600)
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Opens the pooled HTTP session. Must be called inside the running event loop."""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self.connection_limit, keepalive_timeout=self.keepalive_timeout)
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        logger.info("Async GPT client started: %d in flight, %d connections",
+                    self.max_in_flight, self.connection_limit)
+
+    async def close(self):
+        """Closes the pooled HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def chat_completion(self, **request):
+        """
+        Sends a chat completion request over the pooled session.
+
+        Args:
+            **request: Keyword arguments for ``ChatCompletion.acreate``.
+
+        Returns:
+            The chat completion response.
+        """
+        if self._session is None:
+            await self.start()
+        async with self._semaphore:
+            # The session is looked up from a context variable, which is local to each task
+            openai.aiosession.set(self._session)
+            return await gpt_scheduler.get_scheduler().acall(openai.ChatCompletion.acreate, request)
+
+    async def extract_information(self, text_chunk, args, sections=None):
+        """
+        Async variant of ``extract_gpt.extract_information_with_gpt``.
+
+        Args:
+            text_chunk (str): Resume text to extract information from.
+            args: Command line arguments (``model`` and ``maxTokens``).
+            sections (tuple): Schema keys of the resume sections in ``text_chunk``, None for the full prompt.
+
+        Returns:
+            dict | str: The extracted information, or the raw response if it is not valid JSON.
+        """
+        request = extract_gpt.build_extract_request(text_chunk, args, sections)
+        cache_key = extract_gpt.extract_cache_key(text_chunk, request, sections)
+        cached = await _run_blocking(extract_gpt.get_cached_extraction, cache_key)
+        if cached is not None:
+            return cached
+
+        with metrics.timer("stage_seconds", stage="extract"):
+            response = await self.chat_completion(**request)
+            metrics.record_usage(response, "extract")
+            retry = extract_gpt.full_budget_request(request, response, extract_gpt.get_model_settings(args)[1])
+            if retry is not None:
+                response = await self.chat_completion(**retry)
+                metrics.record_usage(response, "extract")
+        json_response = response['choices'][0]['message']['content'].strip()
+        result = extract_gpt.parse_json_response(json_response)
+        await _run_blocking(extract_gpt.cache_extraction, cache_key, result, response['choices'][0].get('finish_reason'))
+        return result
+
+    async def preprocess(self, extracted_text):
+        """
+        Async variant of ``main.preprocessing_with_gpt``.
+
+        Args:
+            extracted_text (str): The text extracted from the resume.
+
+        Returns:
+            str: The preprocessed text.
+        """
+        request = extract_gpt.build_preprocess_request(extracted_text)
+        cache = await _run_blocking(result_cache.get_result_cache)
+        cache_key = extract_gpt.preprocess_cache_key(extracted_text, request)
+        cached = await _run_blocking(cache.get, "preprocessed", cache_key) if cache is not None else None
+        if cached is not None:
+            return cached
+
+        with metrics.timer("stage_seconds", stage="preprocess"):
+            response = await self.chat_completion(**request)
+            metrics.record_usage(response, "preprocess")
+            retry = extract_gpt.full_budget_request(request, response, AppConfig.get("OPENAI_MAX_TOKENS"))
+            if retry is not None:
+                response = await self.chat_completion(**retry)
+                metrics.record_usage(response, "preprocess")
+        processed_text = response['choices'][0]['message']['content']
+        if cache is not None:
+            await _run_blocking(cache.set, "preprocessed", cache_key, processed_text)
+        return processed_text
+
+# Function to run a blocking call (e.g. the SQLite result cache) without blocking the event loop
+async def _run_blocking(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
@@ -0,0 +1,369 @@
+import functools
+import json
+import logging
+import os
+import time
+
+from byteowlscan.models import extract_gpt, gpt_scheduler
+from byteowlscan.utilities import AppConfig, metrics, output_sink, result_cache
+from byteowlscan.utilities.lazy_import import lazy_module
+
+openai = lazy_module("openai")
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Endpoint of the requests of a batch
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Batch statuses after which nothing changes anymore
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Batch statuses whose requests must be sent again
+FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+@functools.lru_cache(maxsize=None)
+def _batch_resource():
+    """
+    Returns the Batch API resource.
+
+    openai 0.28 predates the Batch API, so the resource is declared on its generic
+    resource classes: ``Batch.create(**params)`` posts to ``/batches`` and
+    ``Batch.retrieve(id)`` reads ``/batches/{id}``.
+    """
+    from openai.api_resources.abstract import CreateableAPIResource, ListableAPIResource
+
+    class Batch(CreateableAPIResource, ListableAPIResource):
+        OBJECT_NAME = "batches"
+
+    return Batch
+
+# Function to build the stable id of a request in a batch
+def custom_id(call, resume_path, index=0):
+    """
+    Builds the id of a request in a batch, stable across runs for the same resume.
+
+    Args:
+        call (str): Kind of call, e.g. ``extract`` or ``preprocess``.
+        resume_path (str): The path to the resume.
+        index (int): Index of the chunk of the resume.
+
+    Returns:
+        str: The custom id, e.g. ``extract-3f2a...-0``.
+    """
+    return f"{call}-{result_cache.make_key(os.path.abspath(resume_path))[:24]}-{index}"
+
+# Function to write the JSON-lines input files of a batch
+def write_batch_files(requests, directory, prefix):
+    """
+    Writes batch requests to JSON-lines input files, within the Batch API limits.
+
+    A new file is started every ``BATCH_MAX_REQUESTS`` requests or ``BATCH_MAX_FILE_MB``
+    megabytes.
+
+    Args:
+        requests (dict): Chat completion request (``ChatCompletion.create`` keyword
+            arguments) keyed by custom id.
+        directory (str): Where the files are written; they are kept for auditing.
+        prefix (str): File name prefix, e.g. ``extract``.
+
+    Returns:
+        list: Paths of the files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    max_requests = AppConfig.get("BATCH_MAX_REQUESTS", 50000)
+    max_bytes = AppConfig.get("BATCH_MAX_FILE_MB", 190) * 1024 * 1024
+
+    paths, file, count, size = [], None, 0, 0
+    try:
+        for request_id, request in requests.items():
+            line = (json.dumps({"custom_id": request_id, "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": request},
+                               ensure_ascii=False) + "\n").encode("utf-8")
+            if file is None or count >= max_requests or (count and size + len(line) > max_bytes):
+                if file is not None:
+                    file.close()
+                paths.append(os.path.join(directory, f"{prefix}-{int(time.time())}-{len(paths) + 1:03d}.jsonl"))
+                file, count, size = open(paths[-1], "wb"), 0, 0
+            file.write(line)
+            count += 1
+            size += len(line)
+    finally:
+        if file is not None:
+            file.close()
+    return paths
+
+# Function to upload a batch input file and create its batch
+def submit_batch(path, metadata=None):
+    """
+    Uploads a batch input file and creates the batch.
+
+    Args:
+        path (str): Path of the JSON-lines input file.
+        metadata (dict): Optional metadata stored with the batch.
+
+    Returns:
+        str: The batch id.
+    """
+    scheduler = gpt_scheduler.get_scheduler()
+    with open(path, "rb") as file:
+        def upload():
+            # A retried upload starts over
+            file.seek(0)
+            return openai.File.create(file=file, purpose="batch")
+        input_file = scheduler.retry(upload)
+    batch = scheduler.retry(
+        _batch_resource().create,
+        input_file_id=input_file["id"],
+        endpoint=CHAT_COMPLETIONS_URL,
+        completion_window=AppConfig.get("BATCH_COMPLETION_WINDOW", "24h"),
+        metadata=metadata,
+    )
+    logger.info("Submitted batch %s (%s, input file %s).", batch["id"], os.path.basename(path), input_file["id"])
+    return batch["id"]
+
+# Function to wait for batches to finish
+def wait_for_batches(batch_ids, poll_seconds=None, timeout=None, on_final=None):
+    """
+    Polls batches until they all reach a final status.
+
+    Polls are retried on transient errors (see ``GPTScheduler.retry``).
+
+    Args:
+        batch_ids (list): Ids of the batches.
+        poll_seconds (float): Seconds between polls, defaults to ``BATCH_POLL_SECONDS``.
+        timeout (float): Seconds to wait at most, defaults to ``BATCH_TIMEOUT_HOURS``.
+        on_final (callable): Called with each batch reaching a final status.
+
+    Returns:
+        dict: The final batch object keyed by batch id.
+
+    Raises:
+        TimeoutError: If a batch is still running after ``timeout`` seconds.
+    """
+    poll_seconds = AppConfig.get("BATCH_POLL_SECONDS", 60) if poll_seconds is None else poll_seconds
+    timeout = AppConfig.get("BATCH_TIMEOUT_HOURS", 25) * 3600 if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    batches = {}
+    pending = list(batch_ids)
+    while True:
+        for batch_id in list(pending):
+            batch = gpt_scheduler.get_scheduler().retry(_batch_resource().retrieve, batch_id)
+            counts = batch.get("request_counts") or {}
+            logger.info("Batch %s: %s, %s/%s requests completed, %s failed.", batch_id, batch["status"],
+                        counts.get("completed", 0), counts.get("total", "?"), counts.get("failed", 0))
+            if batch["status"] in FINAL_STATUSES:
+                batches[batch_id] = batch
+                pending.remove(batch_id)
+                if on_final is not None:
+                    on_final(batch)
+        if not pending:
+            return batches
+        if time.monotonic() + poll_seconds > deadline:
+            raise TimeoutError(f"Batches still running after {timeout:.0f}s: {', '.join(pending)}")
+        time.sleep(poll_seconds)
+
+# Function to read the results of a finished batch
+def download_results(batch):
+    """
+    Downloads the output and error files of a finished batch.
+
+    Args:
+        batch: The batch object.
+
+    Returns:
+        dict: ``(response body, error)`` keyed by custom id; one of the two is None.
+    """
+    results = {}
+    for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+        if not file_id:
+            continue
+        content = gpt_scheduler.get_scheduler().retry(openai.File.download, file_id)
+        for line in content.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if record.get("error"):
+                results[record["custom_id"]] = (None, record["error"].get("message") or str(record["error"]))
+            elif response.get("status_code") != 200:
+                error = (response.get("body") or {}).get("error") or {}
+                results[record["custom_id"]] = (None, f"HTTP {response.get('status_code')}: {error.get('message', '')}")
+            else:
+                results[record["custom_id"]] = (response["body"], None)
+    return results
+
+# Function to hash a batch request, to recognize it in a later run
+def request_hash(request):
+    """
+    Returns:
+        str: A short hash of a chat completion request.
+    """
+    return result_cache.make_key(json.dumps(request, sort_keys=True, ensure_ascii=False))[:24]
+
+# Function to read the batches submitted by earlier runs
+def load_registry(directory):
+    """
+    Reads the registry of the batches submitted from ``directory``.
+
+    Each entry holds the ``batch_id``, its ``input_file``, its ``kind`` (file name
+    prefix), its last known ``status``, when it was ``submitted_at`` and the hash of
+    each of its ``requests`` by custom id. Entries older than ``BATCH_REGISTRY_DAYS``
+    are dropped, their output files being deleted by then.
+
+    Args:
+        directory (str): The batch directory.
+
+    Returns:
+        list: The registry entries.
+    """
+    path = os.path.join(directory, AppConfig.get("BATCH_REGISTRY_FILE", "batches.json"))
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding="utf-8") as file:
+            entries = json.load(file)
+    except ValueError as e:
+        logger.warning("Ignoring the unreadable batch registry %s: %s", path, e)
+        return []
+    oldest = time.time() - AppConfig.get("BATCH_REGISTRY_DAYS", 7) * 86400
+    return [entry for entry in entries if entry.get("submitted_at", 0) >= oldest]
+
+# Function to write the registry of the submitted batches
+def save_registry(directory, entries):
+    """
+    Writes the registry of the batches submitted from ``directory``, atomically.
+
+    Args:
+        directory (str): The batch directory.
+        entries (list): The registry entries, see ``load_registry``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    output_sink.atomic_write(os.path.join(directory, AppConfig.get("BATCH_REGISTRY_FILE", "batches.json")),
+                             json.dumps(entries, indent=1))
+
+# Function to run chat completion requests through the Batch API
+def run_batch(requests, directory, prefix):
+    """
+    Sends chat completion requests through the Batch API and waits for their responses.
+
+    Requests are written to input files (see ``write_batch_files``), each file is
+    submitted as one batch, and the responses are matched back to the requests by
+    their custom id. Submitted batches are recorded in the batch registry (see
+    ``load_registry``), so a run interrupted while waiting reattaches to them when
+    started again instead of paying for the same requests twice. Requests of a
+    reattached batch that failed, expired or was cancelled are sent again.
+
+    Args:
+        requests (dict): Chat completion request keyed by custom id.
+        directory (str): Where the input files are written.
+        prefix (str): File name prefix, e.g. ``extract``.
+
+    Returns:
+        dict: ``(response body, error)`` keyed by custom id, for every request.
+    """
+    if not requests:
+        return {}
+    started = time.perf_counter()
+    hashes = {request_id: request_hash(request) for request_id, request in requests.items()}
+    registry = load_registry(directory)
+
+    def record_status(batch):
+        for entry in registry:
+            if entry["batch_id"] == batch["id"]:
+                entry["status"] = batch["status"]
+        save_registry(directory, registry)
+
+    # Batches of earlier runs holding some of these requests, unchanged
+    reattached = []
+    remaining = dict(requests)
+    for entry in registry:
+        if entry["kind"] != prefix or entry.get("status") in FAILED_STATUSES:
+            continue
+        matching = [request_id for request_id, known_hash in entry["requests"].items()
+                    if request_id in remaining and hashes[request_id] == known_hash]
+        if matching:
+            reattached.append(entry["batch_id"])
+            for request_id in matching:
+                del remaining[request_id]
+
+    results = {}
+    batches = {}
+    if reattached:
+        logger.info("Reattaching to %d %s batches of an earlier run for %d requests.", len(reattached), prefix,
+                    len(requests) - len(remaining))
+        try:
+            batches.update(wait_for_batches(reattached, on_final=record_status))
+            for batch in batches.values():
+                results.update(download_results(batch))
+        except openai.error.OpenAIError as e:
+            # E.g. a batch the API no longer knows: its requests are sent again
+            logger.warning("Could not reattach to the batches of an earlier run, sending their requests again: %s", e)
+            batches.clear()
+            results.clear()
+        # Requests of a failed batch, or left out of it, are sent again
+        for request_id in requests:
+            if request_id not in remaining and (request_id not in results or results[request_id][1]):
+                results.pop(request_id, None)
+                remaining[request_id] = requests[request_id]
+
+    batch_ids = []
+    for path in write_batch_files(remaining, directory, prefix):
+        batch_id = submit_batch(path, metadata={"source": "byteowlscan", "kind": prefix})
+        batch_ids.append(batch_id)
+        with open(path, encoding="utf-8") as file:
+            request_ids = [json.loads(line)["custom_id"] for line in file if line.strip()]
+        registry.append({"batch_id": batch_id, "input_file": os.path.basename(path), "kind": prefix,
+                         "status": "validating", "submitted_at": time.time(),
+                         "requests": {request_id: hashes[request_id] for request_id in request_ids}})
+        save_registry(directory, registry)
+    new_batches = wait_for_batches(batch_ids, on_final=record_status)
+    batches.update(new_batches)
+    for batch in new_batches.values():
+        results.update(download_results(batch))
+
+    for batch in batches.values():
+        if batch["status"] != "completed":
+            logger.warning("Batch %s ended %s.", batch["id"], batch["status"])
+    statuses = ", ".join(sorted({batch["status"] for batch in batches.values()}))
+    for request_id in requests:
+        if request_id not in results:
+            results[request_id] = (None, f"No result in the batch output (batch {statuses})")
+
+    failed = sum(1 for request_id in requests if results[request_id][1])
+    metrics.inc("batch_requests_total", len(requests) - failed, call=prefix, status="succeeded")
+    metrics.inc("batch_requests_total", failed, call=prefix, status="failed")
+    metrics.observe("batch_seconds", time.perf_counter() - started, call=prefix)
+    logger.info("%d %s requests done in %d batches in %.1fs, %d failed.", len(requests), prefix, len(batches),
+                time.perf_counter() - started, failed)
+    return {request_id: results[request_id] for request_id in requests}
+
+# Function to run requests through the Batch API, resending the answers cut by a dynamic max_tokens
+def complete_in_batches(requests, directory, call, max_tokens):
+    """
+    Runs chat completion requests through the Batch API and records their token usage.
+
+    Answers cut by a dynamic ``max_tokens`` (see ``extract_gpt.full_budget_request``)
+    are sent again in a second round of batches with the full budget.
+
+    Args:
+        requests (dict): Chat completion request keyed by custom id.
+        directory (str): Where the batch input files are written.
+        call (str): Kind of call, e.g. ``extract`` or ``preprocess``.
+        max_tokens (int): The configured max tokens.
+
+    Returns:
+        dict: ``(response body, error)`` keyed by custom id, for every request.
+    """
+    results = run_batch(requests, directory, call)
+    retries = {}
+    for request_id, (body, error) in results.items():
+        if body is not None:
+            metrics.record_usage(body, call)
+            retry = extract_gpt.full_budget_request(requests[request_id], body, max_tokens)
+            if retry is not None:
+                retries[request_id] = retry
+    for request_id, (body, error) in run_batch(retries, directory, f"{call}-retry").items():
+        if body is not None:
+            metrics.record_usage(body, call)
+        results[request_id] = (body, error)
+    return results
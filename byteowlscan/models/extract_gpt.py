@@ -1,54 +1,366 @@
 import json
 import logging
-import re
+import math
+import time
 
-import openai
-from byteowlscan.utilities import AppConfig, app_prompt
+from byteowlscan.models import gpt_scheduler
+from byteowlscan.utilities import AppConfig, app_prompt, metrics, result_cache, resume_schema, token_counter
+from byteowlscan.utilities.json_stream import IncrementalJsonParser, repair_json
+from byteowlscan.utilities.lazy_import import lazy_module
+
+openai = lazy_module("openai")
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
 
-# Function to interact with ChatGPT and extract structured information
-def extract_information_with_gpt(text_chunk, args):
-    #Set prompt
-    prompt = app_prompt.generateExtractInfo(text_chunk)
+# Function to resolve the model and max tokens of an extraction request
+def get_model_settings(args):
+    """
+    Resolves the OpenAI model and max tokens for an extraction request.
+
+    Args:
+        args: Command line arguments (``model`` and ``maxTokens``).
+
+    Returns:
+        tuple: The model name and the max tokens.
+    """
     openai_model = args.model if args.model else AppConfig.get("OPENAI_MODEL")
-    openai_max_tokens = AppConfig.get("OPENAI_MAX_TOKENS")
-    
+
     if args.model == "gpt-4o-mini":
         openai_max_tokens = AppConfig.get("OPENAI_MAX_TOKENS")
     elif args.model == "gpt-3.5-turbo":
         openai_max_tokens = 4096
     else:
         openai_max_tokens = args.maxTokens
-        
-    #Send request and get response from openai api
-    response = openai.ChatCompletion.create(
-        model=openai_model,  # You can replace it with any other model you are using
-        messages=[
+
+    return openai_model, openai_max_tokens
+
+# Function to size max_tokens from the input
+def output_token_budget(text, max_tokens, model=None):
+    """
+    Sizes ``max_tokens`` from the input instead of always reserving the maximum.
+
+    The answer restates the resume as JSON, so it is budgeted at
+    ``OPENAI_OUTPUT_TOKENS_RATIO`` times the input tokens, at least
+    ``OPENAI_MIN_MAX_TOKENS`` and at most ``max_tokens``. A smaller reservation
+    lets the scheduler fit more requests under the tokens-per-minute limit.
+
+    Args:
+        text (str): The resume text sent in the request.
+        max_tokens (int): The configured max tokens, the upper bound.
+        model (str): Model whose tokenizer counts the tokens, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        int: The max tokens of the request (``max_tokens`` when dynamic sizing is disabled).
+    """
+    if not max_tokens or not AppConfig.get("OPENAI_DYNAMIC_MAX_TOKENS", True):
+        return max_tokens
+    budget = math.ceil(token_counter.count_tokens(text, model) * AppConfig.get("OPENAI_OUTPUT_TOKENS_RATIO", 1.5))
+    return min(max_tokens, max(AppConfig.get("OPENAI_MIN_MAX_TOKENS", 1024), budget))
+
+# Function to decide whether a request must be resent with the full max tokens
+def full_budget_request(request, response, max_tokens):
+    """
+    Returns the request to resend when the answer was cut by a dynamic ``max_tokens``.
+
+    Args:
+        request (dict): The request sent.
+        response: Its chat completion response.
+        max_tokens (int): The configured max tokens.
+
+    Returns:
+        dict | None: The request with ``max_tokens`` restored, or None if the answer is complete.
+    """
+    if response['choices'][0].get('finish_reason') != "length" or not max_tokens or request["max_tokens"] >= max_tokens:
+        return None
+    logger.warning("Answer cut at %d tokens, retrying with %d.", request["max_tokens"], max_tokens)
+    metrics.inc("gpt_budget_retries_total")
+    return dict(request, max_tokens=max_tokens)
+
+# Function to get the static instructions of an extraction request
+def extract_instructions(sections=None):
+    """
+    Returns the instructions of an extraction request, without the resume text.
+
+    They are identical byte for byte across requests, so the provider caches them
+    as a prompt prefix (see ``app_prompt.PROMPT_VERSION``).
+
+    Args:
+        sections (tuple): Schema keys of the resume sections of the request, None for
+            the full extraction instructions.
+
+    Returns:
+        str: The instructions.
+    """
+    if sections:
+        return app_prompt.generateSectionInstructions(sections)
+    return app_prompt.EXTRACT_INFO_INSTRUCTIONS
+
+# Function to build the chat completion request for information extraction
+def build_extract_request(text_chunk, args, sections=None):
+    """
+    Builds the keyword arguments of a chat completion request for extraction.
+
+    Args:
+        text_chunk (str): Resume text to extract information from.
+        args: Command line arguments.
+        sections (tuple): Schema keys of the resume sections in ``text_chunk``, to use
+            the shorter prompt of these sections. None uses the full extraction prompt.
+
+    Returns:
+        dict: Keyword arguments for ``ChatCompletion.create``.
+    """
+    openai_model, openai_max_tokens = get_model_settings(args)
+
+    request = {
+        "model": openai_model,
+        # Static messages first and the resume text last, so that requests share a cacheable prefix
+        "messages": [
             {"role": "system", "content": AppConfig.get("OPENAI_PREPROCESS_EXTRACT_INFO_PROMPT")},
-            {"role": "user", "content": prompt}
+            {"role": "user", "content": extract_instructions(sections)},
+            {"role": "user", "content": app_prompt.generateResumeText(text_chunk, sections)}
         ],
-        max_tokens=openai_max_tokens,
-        temperature=AppConfig.get("OPENAI_TEMPERATURE")
+        "max_tokens": output_token_budget(text_chunk, openai_max_tokens, openai_model),
+        "temperature": AppConfig.get("OPENAI_TEMPERATURE"),
+    }
+    response_format = resume_schema.response_format(AppConfig.get("OPENAI_RESPONSE_FORMAT"))
+    if response_format is not None:
+        request["response_format"] = response_format
+    return request
+
+# Function to build the chat completion request for preprocessing
+def build_preprocess_request(extracted_text):
+    """
+    Builds the keyword arguments of a chat completion request for preprocessing.
+
+    Args:
+        extracted_text (str): The text extracted from the resume.
+
+    Returns:
+        dict: Keyword arguments for ``ChatCompletion.create``.
+    """
+    return {
+        "model": AppConfig.get("OPENAI_MODEL"),
+        # Static messages first and the resume text last, so that requests share a cacheable prefix
+        "messages": [
+            {"role": "system", "content": AppConfig.get("OPENAI_PREPROCESS_SYSTEM_CONTENT_PROMPT")},
+            {"role": "user", "content": app_prompt.PREPROCESS_INSTRUCTIONS},
+            {"role": "user", "content": app_prompt.generatePreProcessText(extracted_text)}
+        ],
+        "max_tokens": output_token_budget(extracted_text, AppConfig.get("OPENAI_MAX_TOKENS")),
+        "temperature": AppConfig.get("OPENAI_TEMPERATURE"),
+    }
+
+# Function to build the cache key of an extraction result
+def extract_cache_key(text_chunk, request, sections=None):
+    """
+    Builds the cache key of an extraction result.
+
+    The key covers the text, the model, the max tokens, the prompt instructions and
+    their version, and the response format, so changing any of them invalidates
+    the cached result.
+
+    Args:
+        text_chunk (str): Resume text to extract information from.
+        request (dict): The extraction request built by ``build_extract_request``.
+        sections (tuple): Schema keys of the sections of the request, if any.
+
+    Returns:
+        str: The cache key.
+    """
+    return result_cache.make_key(
+        result_cache.make_key(text_chunk),
+        request["model"],
+        request["max_tokens"],
+        request["temperature"],
+        request["messages"][0]["content"],
+        extract_instructions(sections),
+        app_prompt.PROMPT_VERSION,
+        # Only when set, so that the keys of the results cached before it existed stay valid
+        *([json.dumps(request["response_format"], sort_keys=True)] if "response_format" in request else []),
     )
 
-    # Extract the structured JSON response from GPT
-    json_response = response['choices'][0]['message']['content'].strip()
+# Function to build the cache key of a preprocessed text
+def preprocess_cache_key(extracted_text, request):
+    """
+    Builds the cache key of a preprocessed text.
+
+    Args:
+        extracted_text (str): The text extracted from the resume.
+        request (dict): The preprocessing request built by ``build_preprocess_request``.
+
+    Returns:
+        str: The cache key.
+    """
+    return result_cache.make_key(
+        result_cache.make_key(extracted_text),
+        request["model"],
+        request["max_tokens"],
+        request["temperature"],
+        request["messages"][0]["content"],
+        app_prompt.PREPROCESS_INSTRUCTIONS,
+        app_prompt.PROMPT_VERSION,
+    )
+
+# Function to get a cached extraction result
+def get_cached_extraction(cache_key):
+    """
+    Gets a cached extraction result.
+
+    Args:
+        cache_key (str): Key built by ``extract_cache_key``.
+
+    Returns:
+        dict | None: The cached result, or None if caching is disabled or on a miss.
+    """
+    cache = result_cache.get_result_cache()
+    cached = cache.get("result", cache_key) if cache is not None else None
+    if cached is None:
+        return None
+    logger.info("Extraction result loaded from cache.")
+    return json.loads(cached)
+
+# Function to cache an extraction result
+def cache_extraction(cache_key, result, finish_reason=None):
+    """
+    Caches an extraction result. Raw string results (invalid JSON) and results
+    repaired from an answer cut by ``max_tokens`` or cancelled (``finish_reason``
+    ``length`` or ``cancelled``) are not cached, as they miss fields.
+
+    Args:
+        cache_key (str): Key built by ``extract_cache_key``.
+        result (dict | str): The extraction result.
+        finish_reason (str): The ``finish_reason`` of the answer.
+    """
+    cache = result_cache.get_result_cache()
+    if cache is not None and isinstance(result, dict) and finish_reason not in ("length", "cancelled"):
+        cache.set("result", cache_key, json.dumps(result, ensure_ascii=False))
+
+# Function to parse the JSON part of a GPT response
+def parse_json_response(json_response):
+    """
+    Parses the structured JSON from the content of a GPT response.
+
+    The first JSON object of the content is parsed, ignoring the text around it
+    (e.g. a Markdown fence). A cut object is repaired: its last incomplete field is
+    dropped and its brackets closed, so a truncated answer still yields the fields
+    it holds instead of being thrown away.
+
+    Args:
+        json_response (str): Content of the GPT response.
+
+    Returns:
+        dict | str: The parsed JSON, or the raw response if no valid JSON was found.
+    """
     logger.info('json_response: %s', json_response)
 
-   # Step 1: Use regex to extract the JSON part from the response, ignoring extraneous text
-    json_match = re.search(r'\{.*\}', json_response, re.DOTALL)
-    if json_match:
-        json_string = json_match.group(0)
-        try:
-            # Try to parse the cleaned JSON string
-            return json.loads(json_string)
-        except json.JSONDecodeError as e:
-            print("Error: Could not decode the response into valid JSON:", e)
-            logger.error("Error: Could not decode the response into valid JSON:", e)
-            return json_response  # Return raw string if decoding fails
-    else:
+    result, complete = repair_json(json_response)
+    if result is None:
         print("No valid JSON found in response.")
         logger.info("No valid JSON found in response.")
         return json_response  # If no JSON was found, return raw response for debugging
+    if not complete:
+        logger.warning("The JSON of the response was cut, repaired with %d top-level fields.", len(result))
+        metrics.inc("json_repairs_total")
+    return result
+
+# Function to stream a chat completion while parsing its JSON answer
+def stream_completion(request, cancel_after=None, call="extract"):
+    """
+    Sends a chat completion request with streaming and parses the JSON answer as it arrives.
+
+    The time to the first complete top-level field is recorded in
+    ``gpt_first_field_seconds``. Once the answer passes ``cancel_after`` tokens,
+    the stream is closed: a runaway answer stops costing tokens, and its partial
+    JSON is repaired by ``parse_json_response``.
+
+    Args:
+        request (dict): Keyword arguments for ``ChatCompletion.create``.
+        cancel_after (int): Tokens after which the stream is cancelled, None never cancels it.
+        call (str): Kind of call, e.g. ``extract``.
+
+    Returns:
+        dict: A response shaped like a non-streamed one (``choices`` and ``usage``), whose
+        ``finish_reason`` is ``cancelled`` when the stream was cancelled.
+    """
+    started = time.perf_counter()
+    stream = gpt_scheduler.get_scheduler().call(openai.ChatCompletion.create,
+                                                dict(request, stream=True, stream_options={"include_usage": True}))
+    parser = IncrementalJsonParser()
+    content, usage, finish_reason, tokens, first_field = [], None, None, 0, None
+    try:
+        for chunk in stream:
+            # The last chunk carries the usage and no choice
+            usage = chunk.get("usage") or usage
+            if not chunk.get("choices"):
+                continue
+            choice = chunk["choices"][0]
+            finish_reason = choice.get("finish_reason") or finish_reason
+            delta = (choice.get("delta") or {}).get("content")
+            if not delta:
+                continue
+            tokens += 1
+            content.append(delta)
+            if not parser.done and parser.feed(delta) and first_field is None:
+                first_field = time.perf_counter() - started
+                metrics.observe("gpt_first_field_seconds", first_field, call=call)
+            if cancel_after and tokens > cancel_after and not parser.done:
+                logger.warning("Cancelling the %s stream after %d tokens.", call, tokens)
+                metrics.inc("gpt_streams_cancelled_total", call=call)
+                finish_reason = "cancelled"
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return {
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(content)}, "finish_reason": finish_reason}],
+        "usage": usage,
+    }
+
+# Function to send an extraction request, streamed or not
+def complete_extraction(request, text_chunk):
+    """
+    Sends an extraction request, streamed when ``OPENAI_STREAM`` is enabled.
+
+    Streams are cancelled past ``OPENAI_STREAM_CANCEL_RATIO`` answer tokens per
+    token of resume text.
+
+    Args:
+        request (dict): The extraction request.
+        text_chunk (str): Resume text of the request.
+
+    Returns:
+        The chat completion response.
+    """
+    if not AppConfig.get("OPENAI_STREAM", False):
+        return gpt_scheduler.get_scheduler().call(openai.ChatCompletion.create, request)
+    ratio = AppConfig.get("OPENAI_STREAM_CANCEL_RATIO")
+    cancel_after = None
+    if ratio:
+        cancel_after = max(AppConfig.get("OPENAI_MIN_MAX_TOKENS", 1024),
+                           math.ceil(ratio * token_counter.count_tokens(text_chunk, request["model"])))
+    return stream_completion(request, cancel_after)
+
+# Function to interact with ChatGPT and extract structured information
+@metrics.timed("stage_seconds", stage="extract")
+def extract_information_with_gpt(text_chunk, args, sections=None):
+    request = build_extract_request(text_chunk, args, sections)
+    cache_key = extract_cache_key(text_chunk, request, sections)
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
+
+    #Send request and get response from openai api
+    response = complete_extraction(request, text_chunk)
+    metrics.record_usage(response, "extract")
+    retry = full_budget_request(request, response, get_model_settings(args)[1])
+    if retry is not None:
+        response = complete_extraction(retry, text_chunk)
+        metrics.record_usage(response, "extract")
+
+    # Extract the structured JSON response from GPT
+    json_response = response['choices'][0]['message']['content'].strip()
+    result = parse_json_response(json_response)
+    cache_extraction(cache_key, result, response['choices'][0].get('finish_reason'))
+    return result
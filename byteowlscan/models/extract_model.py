@@ -1,82 +1,118 @@
 import logging
-from pdf2image import convert_from_path
-from pdfminer.high_level import extract_text
-import pytesseract
-from PIL import Image
 import byteowlscan.utilities.semantic_splitter as SemanticSplitter
+from byteowlscan.models import image_preprocess, ocr_backends, ocr_engine, pdf_engines
+from byteowlscan.utilities import AppConfig, document_input, metrics
+from byteowlscan.utilities.lazy_import import lazy_module
+
+Image = lazy_module("PIL.Image")
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Version of the text extractors, part of the key of the cached texts. Bump it whenever
+# a change to the extractors alters the text they return.
+EXTRACTOR_VERSION = "1"
+
+# Settings that change the extracted text, also part of the key of the cached texts.
+# Workers, memory and parallelism settings only change how fast it is extracted.
+EXTRACTION_SETTINGS = (
+    "PDF_ENGINE", "PDF_ENGINE_FALLBACKS", "PDF_OCR_FALLBACK", "PDF_OCR_MIN_CHARS", "PDF_OCR_MIN_GLYPHS",
+    "PDF_OCR_IMAGE_COVERAGE", "PDF_OCR_MIN_TEXT_DENSITY",
+    "OCR_BACKEND", "OCR_TESSDATA_PATH", "OCR_LANG", "OCR_DPI", "OCR_GRAYSCALE", "OCR_PREPROCESS",
+)
+
+# Function to describe the extraction settings
+def extraction_config():
+    """
+    Returns the extractor version and the settings that change the extracted text.
+
+    Returns:
+        dict: ``version`` and the value of each of ``EXTRACTION_SETTINGS``.
+    """
+    return dict({key: AppConfig.get(key) for key in EXTRACTION_SETTINGS}, version=EXTRACTOR_VERSION)
+
 # Function to extract text from PDF
+@metrics.timed("extractor_seconds", extractor="pdf")
 def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file using multiple approaches.
-    Attempts text extraction using PDFMiner first, falls back to OCR if necessary.
+    Extracts the text layer of each page with the configured PDF engine (PyMuPDF by
+    default, pdfminer as fallback), then classifies each page and OCRs, in parallel,
+    only the pages without a usable text layer (blank, hidden or scanned).
+    When a page has both, the longer of its text layer and its OCR text is kept.
     
     Args:
-        pdf_path (str): The path to the PDF file.
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
 
     Returns:
-        str: Extracted text from the PDF.
+        str: Extracted text from the PDF, pages separated by form feeds.
+
+    Raises:
+        Exception: The error of the PDF engines, or of the OCR when no page has a text layer.
     """
     try:
-        # Attempt to extract text using PDFMiner
-        text = extract_text(pdf_path)
-        
-        if text and text.strip():
-            logger.info("Extracted text using PDFMiner.")
-        else:
-            # If PDFMiner fails, use OCR as a fallback
-            logger.info("PDFMiner extraction failed, attempting OCR.")
-            text = _extract_text_from_pdf_using_ocr(pdf_path)
-        
-        return text
+        pdf_path = document_input.to_source(pdf_path)
+        engine, pages = pdf_engines.extract_pdf_pages(pdf_path)
+
+        ocr_pages = []
+        if engine != "ocr" and AppConfig.get("PDF_OCR_FALLBACK", True):
+            ocr_pages = pdf_engines.pages_needing_ocr(pdf_path, pages)
+        if ocr_pages:
+            # Only the pages that need it are rasterized
+            logger.info("%d/%d pages need OCR, attempting OCR.", len(ocr_pages), len(pages))
+            try:
+                ocr_texts = _extract_text_from_pdf_using_ocr(pdf_path, ocr_pages)
+            except Exception:
+                # The text layer is kept when the OCR fails, the file only fails without one
+                if not any(text.strip() for text in pages.values()):
+                    raise
+            else:
+                for page_number, text in ocr_texts.items():
+                    if len(text.strip()) > len(pages[page_number].strip()):
+                        pages[page_number] = text
+
+        return "\f".join(pages[page] for page in sorted(pages))
     except Exception as e:
         logger.error("extract_text_from_pdf: %s", e)
-        return f"An error occurred: {str(e)}"
+        raise
 
 
-def _extract_text_from_pdf_using_ocr(pdf_path):
+@metrics.timed("stage_seconds", stage="ocr")
+def _extract_text_from_pdf_using_ocr(pdf_path, page_numbers=None):
     """
-    Extract text from a PDF by converting each page to an image and using OCR.
+    Extract text from PDF pages by converting them to images and using OCR.
     
     Args:
-        pdf_path (str): The path to the PDF file.
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        page_numbers (list): 1-based pages to OCR, defaults to all the pages.
 
     Returns:
-        str: Extracted text from the PDF using OCR.
+        dict: OCR'd text keyed by page number.
     """
     try:
-        # Convert PDF pages to images
-        pages = convert_from_path(pdf_path, dpi=300)
-        text = ""
-
-        # Extract text from each image using Tesseract OCR
-        for page in pages:
-            text += pytesseract.image_to_string(page, lang='vie')  # Replace 'vie' with 'eng' for English text
-        
-        return text
+        # Rasterize and OCR the pages lazily and in parallel
+        return ocr_engine.ocr_pdf_pages(pdf_path, page_numbers)
     except Exception as e:
         logger.error("_extract_text_from_pdf_using_ocr: %s", e)
-        return f"An error occurred during OCR: {str(e)}"
+        raise
 
 
 # Function to extract and clean text from Word file
+@metrics.timed("extractor_seconds", extractor="word")
 def extract_text_from_word(docx_path):
     """
     Extract text from a Word document by converting it to HTML and then to markdown.
     
     Args:
-        docx_path (str): The path to the Word document.
+        docx_path (str | bytes | memoryview): The path to the Word document, or its content.
 
     Returns:
         str: Extracted and cleaned text from the Word document.
     """
     try:
         # Convert DOCX to HTML without images
-        html_content = SemanticSplitter.convert_docx_to_html_without_images(docx_path)
+        html_content = SemanticSplitter.convert_docx_to_html(document_input.to_source(docx_path))
 
         # Convert HTML to markdown
         markdown_content = SemanticSplitter.convert_html_to_markdown(html_content)
@@ -84,24 +120,33 @@ def extract_text_from_word(docx_path):
 
     except Exception as e:
         logger.error("extract_text_from_word: %s", e)
-        return f"An error occurred: {str(e)}"
+        raise
 
 
 # Function to extract text from image (JPEG/PNG) using Tesseract OCR
+@metrics.timed("extractor_seconds", extractor="image")
 def extract_text_from_image(image_path):
     """
     Extract text from an image using Tesseract OCR.
     
     Args:
-        image_path (str): The path to the image file.
+        image_path (str | bytes | memoryview): The path to the image file, or its content.
 
     Returns:
         str: Extracted text from the image.
     """
     try:
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img, lang='vie')  # Replace 'vie' with 'eng' for English text
+        with document_input.open_stream(document_input.to_source(image_path)) as image_file:
+            img = Image.open(image_file)
+            with metrics.timer("stage_seconds", stage="ocr_preprocess"):
+                # Downscale, grayscale, binarize, deskew and crop before Tesseract. The image is
+                # not loaded yet, so a JPEG is decoded directly at the reduced size.
+                img = image_preprocess.preprocess(img, "image")
+            # The file closes with the block
+            img.load()
+        with metrics.timer("stage_seconds", stage="ocr"):
+            text = ocr_backends.image_to_string(img)  # Set OCR_LANG to 'eng' for English text
         return text
     except Exception as e:
         logger.error("extract_text_from_image: %s", e)
-        return f"An error occurred: {str(e)}"
+        raise
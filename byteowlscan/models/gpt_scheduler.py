@@ -0,0 +1,422 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from byteowlscan.utilities import AppConfig, metrics, token_counter
+from byteowlscan.utilities.lazy_import import lazy_module
+
+openai = lazy_module("openai")
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: rate limits, timeouts and transient server failures
+RETRYABLE_ERRORS = (
+    "RateLimitError",
+    "Timeout",
+    "APIConnectionError",
+    "ServiceUnavailableError",
+    "TryAgain",
+)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+class GPTScheduler:
+    """
+    Token-rate and request-rate aware scheduler for OpenAI calls.
+
+    Every call reserves its estimated tokens (prompt + ``max_tokens``) and one
+    request from two token buckets refilled at the per-minute budgets, and waits
+    while either bucket is empty. Unused tokens are refunded from the reported
+    usage (or, for a stream without usage, from the prompt estimate and the chunks
+    received), and the tokens of failed attempts are refunded in full. Rate limits, timeouts and transient errors are retried with jittered
+    exponential backoff, honouring ``Retry-After``. A rate limit also pauses all
+    callers and lowers the refill rate, which then recovers on each success.
+    The scheduler is shared by threads and asyncio tasks.
+    """
+
+    def __init__(self, tokens_per_minute=None, requests_per_minute=None, max_retries=6,
+                 backoff_base=1.0, backoff_max=60.0, request_timeout=None):
+        """
+        Args:
+            tokens_per_minute (int): Token budget per minute, None for unlimited.
+            requests_per_minute (int): Request budget per minute, None for unlimited.
+            max_retries (int): Maximum number of retries of one call.
+            backoff_base (float): First backoff delay in seconds.
+            backoff_max (float): Maximum backoff delay in seconds.
+            request_timeout (float): Timeout of one request in seconds.
+        """
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+
+        # Reentrant: a stream dropped unread settles from __del__, which may run at any point
+        self._lock = threading.RLock()
+        self._tokens = float(tokens_per_minute or 0)
+        self._requests = float(requests_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._rate_factor = 1.0
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "tokens_estimated": 0,
+            "tokens_used": 0,
+            "throttled_seconds": 0.0,
+            "working_seconds": 0.0,
+        }
+        self._started = time.monotonic()
+
+    # Function to estimate the tokens of a request before sending it
+    @staticmethod
+    def estimate_prompt_tokens(request):
+        """
+        Estimates the prompt tokens of a chat completion request.
+
+        Args:
+            request (dict): Keyword arguments of the chat completion request.
+
+        Returns:
+            int: Estimated prompt tokens.
+        """
+        model = request.get("model")
+        # Content tokens plus the per-message overhead of the chat format
+        return sum(token_counter.count_tokens(message.get("content") or "", model) + 4
+                   for message in request.get("messages", [])) + 3
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute * self._rate_factor / 60.0
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + elapsed * rate)
+        if self.requests_per_minute:
+            rate = self.requests_per_minute * self._rate_factor / 60.0
+            self._requests = min(float(self.requests_per_minute), self._requests + elapsed * rate)
+
+    def _reserve(self, tokens):
+        """
+        Tries to reserve the budget of one request.
+
+        Returns:
+            tuple: ``(wait, reserved)``. ``wait`` is 0 if the budget was reserved,
+            otherwise the seconds to wait before retrying. ``reserved`` is the number of
+            tokens actually taken from the bucket, which is capped at its size. Refunds
+            and settlements must use it, not the estimate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now, 0
+
+            wait = 0.0
+            if self.tokens_per_minute:
+                # A request larger than the whole budget can only wait for a full bucket
+                tokens = min(tokens, self.tokens_per_minute)
+                if self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) / (self.tokens_per_minute * self._rate_factor / 60.0))
+            if self.requests_per_minute and self._requests < 1:
+                wait = max(wait, (1 - self._requests) / (self.requests_per_minute * self._rate_factor / 60.0))
+            if wait > 0:
+                return wait, 0
+
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            if self.requests_per_minute:
+                self._requests -= 1
+            return 0.0, tokens
+
+    def _on_success(self, reserved, response, elapsed):
+        usage = response.get("usage") if hasattr(response, "get") else None
+        used = usage.get("total_tokens", reserved) if usage else reserved
+        with self._lock:
+            if self.tokens_per_minute:
+                # Give back what was reserved but not used
+                self._tokens = min(float(self.tokens_per_minute), self._tokens + reserved - used)
+            self._rate_factor = min(1.0, self._rate_factor + 0.02)
+            self._stats["requests"] += 1
+            self._stats["tokens_used"] += used
+            self._stats["working_seconds"] += elapsed
+
+    def _refund(self, reserved):
+        # A failed attempt gives back its whole reservation
+        with self._lock:
+            if self.tokens_per_minute:
+                self._tokens = min(float(self.tokens_per_minute), self._tokens + reserved)
+
+    def _on_error(self, error, attempt, elapsed):
+        """
+        Records a failed attempt.
+
+        Returns:
+            float: Seconds to wait before the next attempt.
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        metrics.inc("gpt_retries_total", error=type(error).__name__)
+        with self._lock:
+            self._stats["retries"] += 1
+            self._stats["working_seconds"] += elapsed
+            if isinstance(error, openai.error.RateLimitError):
+                self._stats["rate_limited"] += 1
+                # Back off every caller, not just this one, and slow the refill down
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._rate_factor = max(0.25, self._rate_factor * 0.8)
+            elif isinstance(error, openai.error.Timeout):
+                self._stats["timeouts"] += 1
+
+        logger.warning("OpenAI call failed (%s), retry %d/%d in %.1fs",
+                       type(error).__name__, attempt + 1, self.max_retries, delay)
+        return delay
+
+    def _add_throttled(self, seconds):
+        with self._lock:
+            self._stats["throttled_seconds"] += seconds
+        metrics.inc("gpt_throttled_seconds_total", seconds)
+
+    def _prepare(self, request):
+        request = dict(request)
+        if self.request_timeout:
+            request.setdefault("request_timeout", self.request_timeout)
+        tokens = self.estimate_prompt_tokens(request) + (request.get("max_tokens") or 0)
+        with self._lock:
+            self._stats["tokens_estimated"] += tokens
+        return request, tokens
+
+    def call(self, fn, request):
+        """
+        Runs a blocking OpenAI call within the rate budgets, retrying transient errors.
+
+        Args:
+            fn (callable): The API call, e.g. ``openai.ChatCompletion.create``.
+            request (dict): Keyword arguments of the call.
+
+        Returns:
+            The API response. With ``stream=True``, an iterator over the chunks whose
+            tokens are settled once it is exhausted, closed or dropped.
+        """
+        request, tokens = self._prepare(request)
+        attempt = 0
+        while True:
+            wait, reserved = self._reserve(tokens)
+            while wait > 0:
+                time.sleep(wait)
+                self._add_throttled(wait)
+                wait, reserved = self._reserve(tokens)
+
+            started = time.monotonic()
+            try:
+                response = fn(**request)
+            except openai.error.OpenAIError as e:
+                self._refund(reserved)
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self._fail(e, attempt + 1)
+                    raise
+                delay = self._on_error(e, attempt, time.monotonic() - started)
+                time.sleep(delay)
+                self._add_throttled(delay)
+                attempt += 1
+                continue
+            if request.get("stream"):
+                return _SettledStream(self, response, reserved, tokens - (request.get("max_tokens") or 0), started)
+            self._on_success(reserved, response, time.monotonic() - started)
+            return response
+
+    async def acall(self, fn, request):
+        """
+        Async variant of ``call`` for coroutine functions such as ``ChatCompletion.acreate``.
+
+        Args:
+            fn (callable): The async API call.
+            request (dict): Keyword arguments of the call.
+
+        Returns:
+            The API response.
+        """
+        request, tokens = self._prepare(request)
+        attempt = 0
+        while True:
+            wait, reserved = self._reserve(tokens)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                self._add_throttled(wait)
+                wait, reserved = self._reserve(tokens)
+
+            started = time.monotonic()
+            try:
+                response = await fn(**request)
+            except openai.error.OpenAIError as e:
+                self._refund(reserved)
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self._fail(e, attempt + 1)
+                    raise
+                delay = self._on_error(e, attempt, time.monotonic() - started)
+                await asyncio.sleep(delay)
+                self._add_throttled(delay)
+                attempt += 1
+                continue
+            self._on_success(reserved, response, time.monotonic() - started)
+            return response
+
+    def retry(self, fn, *args, **kwargs):
+        """
+        Runs an OpenAI call that does not use the rate budgets, e.g. a Batch or File
+        call, retrying transient errors like ``call``.
+
+        Args:
+            fn (callable): The API call, e.g. ``openai.File.download``.
+            *args, **kwargs: Arguments of the call.
+
+        Returns:
+            The API response.
+        """
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            except openai.error.OpenAIError as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self._fail(e, attempt + 1)
+                    raise
+                delay = self._on_error(e, attempt, time.monotonic() - started)
+                time.sleep(delay)
+                attempt += 1
+
+    def _fail(self, error, attempts):
+        with self._lock:
+            self._stats["failures"] += 1
+        logger.error("OpenAI call failed after %d attempt%s (%s): %s", attempts, "" if attempts == 1 else "s",
+                     "retryable" if _is_retryable(error) else "not retryable", error)
+
+    def summary(self):
+        """
+        Returns the statistics of the run so far.
+
+        ``throttled_seconds`` and ``working_seconds`` are summed over all concurrent
+        callers, so they can exceed the wall time.
+
+        Returns:
+            dict: Request, retry, token and timing statistics.
+        """
+        with self._lock:
+            summary = dict(self._stats)
+        summary["wall_seconds"] = time.monotonic() - self._started
+        return summary
+
+    def log_summary(self):
+        """Logs the statistics of the run."""
+        summary = self.summary()
+        logger.info(
+            "GPT scheduler: %d requests, %d retries (%d rate limited, %d timeouts), %d failed, "
+            "%d tokens used (%d estimated), %.1fs working, %.1fs throttled, %.1fs wall",
+            summary["requests"], summary["retries"], summary["rate_limited"], summary["timeouts"],
+            summary["failures"], summary["tokens_used"], summary["tokens_estimated"],
+            summary["working_seconds"], summary["throttled_seconds"], summary["wall_seconds"],
+        )
+
+class _SettledStream:
+    """
+    Passes a streamed response through and settles its reservation when it ends.
+
+    The usage is only known once the stream ends, and is missing when the server
+    does not send it or the stream is closed early. The tokens used are then the
+    prompt estimate plus one per content chunk received. A stream that is closed,
+    or dropped without being read, is settled too.
+    """
+
+    def __init__(self, scheduler, stream, reserved, prompt_tokens, started):
+        self._scheduler = scheduler
+        self._stream = stream
+        self._chunks = iter(stream)
+        self._reserved = reserved
+        self._prompt_tokens = prompt_tokens
+        self._started = started
+        self._usage = None
+        self._received = 0
+        self._settled = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._chunks)
+        except BaseException:
+            # Exhausted or broken
+            self.close()
+            raise
+        self._usage = chunk.get("usage") or self._usage
+        self._received += sum(1 for choice in chunk.get("choices") or () if (choice.get("delta") or {}).get("content"))
+        return chunk
+
+    def close(self):
+        """Closes the stream and settles its reservation, once."""
+        if self._settled:
+            return
+        self._settled = True
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            usage = self._usage or {"total_tokens": self._prompt_tokens + self._received}
+            self._scheduler._on_success(self._reserved, {"usage": usage}, time.monotonic() - self._started)
+
+    def __del__(self):
+        self.close()
+
+# Function to decide whether an OpenAI error is transient
+def _is_retryable(error):
+    # Looked up by name so that importing this module does not load openai
+    if isinstance(error, tuple(getattr(openai.error, name) for name in RETRYABLE_ERRORS)):
+        return True
+    # Generic API errors are retried only when the server failed
+    return isinstance(error, openai.error.APIError) and (error.http_status or 0) >= 500
+
+# Function to read the Retry-After header of an OpenAI error
+def _retry_after(error):
+    headers = getattr(error, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+# Function to get the process-wide scheduler
+def get_scheduler():
+    """
+    Returns the process-wide GPT scheduler, created from the config on first use.
+
+    Returns:
+        GPTScheduler: The scheduler all GPT calls go through.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = GPTScheduler(
+                tokens_per_minute=AppConfig.get("OPENAI_TPM_LIMIT"),
+                requests_per_minute=AppConfig.get("OPENAI_RPM_LIMIT"),
+                max_retries=AppConfig.get("OPENAI_MAX_RETRIES", 6),
+                backoff_base=AppConfig.get("OPENAI_BACKOFF_BASE", 1.0),
+                backoff_max=AppConfig.get("OPENAI_BACKOFF_MAX", 60.0),
+                request_timeout=AppConfig.get("OPENAI_REQUEST_TIMEOUT"),
+            )
+    return _scheduler
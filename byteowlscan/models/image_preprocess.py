@@ -0,0 +1,182 @@
+import logging
+
+from byteowlscan.utilities import AppConfig
+from byteowlscan.utilities.lazy_import import lazy_module
+
+np = lazy_module("numpy")
+Image = lazy_module("PIL.Image")
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Defaults of each preprocessing step, overridden per source type by OCR_PREPROCESS
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "target_dpi": 300,
+    "page_width_inches": 8.27,  # A4, used when the image has no plausible DPI information
+    "min_metadata_dpi": 150,  # lower DPI metadata is ignored, e.g. the 72 dpi cameras write
+    "grayscale": True,
+    "binarize": True,
+    "deskew": True,
+    "max_skew_degrees": 5.0,
+    "crop_margins": True,
+    "margin_pixels": 20,
+}
+
+# Function to get the preprocessing settings of a source type
+def get_settings(source):
+    """
+    Returns the preprocessing settings of a source type.
+
+    Args:
+        source (str): ``image`` for photos and scans, ``pdf`` for rasterized PDF pages.
+
+    Returns:
+        dict: The settings, ``DEFAULT_SETTINGS`` updated with ``OCR_PREPROCESS[source]``.
+    """
+    return dict(DEFAULT_SETTINGS, **((AppConfig.get("OCR_PREPROCESS") or {}).get(source) or {}))
+
+# Function to prepare an image for OCR
+def preprocess(image, source="image", settings=None):
+    """
+    Prepares an image for Tesseract: downscale, grayscale, binarize, deskew and crop margins.
+
+    Tesseract time grows with the pixel count, so a 12 MP color photo is brought
+    down to ``target_dpi`` in one channel before OCR. Binarization uses Otsu's
+    threshold. JPEG photos are decoded directly at the reduced size, when the image
+    is passed before it is loaded (right after ``Image.open``). Deskewing picks the rotation that maximizes the variance of the
+    row sums (text lines aligned with rows), measured on a small thumbnail.
+
+    Args:
+        image (PIL.Image.Image): The image to prepare.
+        source (str): Source type selecting the settings, ``image`` or ``pdf``.
+        settings (dict): Settings overriding those of the source type.
+
+    Returns:
+        PIL.Image.Image: The prepared image (the input image when preprocessing is disabled).
+    """
+    settings = settings or get_settings(source)
+    if not settings["enabled"]:
+        return image
+
+    size = None
+    if settings["target_dpi"]:
+        # Measured before draft(), which shrinks the image but keeps its DPI metadata
+        scale = target_scale(image, settings["target_dpi"], settings["page_width_inches"], settings["min_metadata_dpi"])
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        if image.format == "JPEG" and scale < 1.0:
+            # Let the JPEG decoder skip the resolution we are about to drop, only possible until the image is loaded
+            image.draft("L" if settings["grayscale"] or settings["binarize"] else image.mode, size)
+    if settings["grayscale"] or settings["binarize"]:
+        image = image.convert("L")
+    if size and image.size != size:
+        image = _resize(image, size)
+    if settings["deskew"]:
+        angle = skew_angle(image, settings["max_skew_degrees"])
+        if angle:
+            image = image.rotate(angle, resample=Image.BILINEAR, expand=True,
+                                 fillcolor=255 if image.mode == "L" else (255, 255, 255))
+    if settings["binarize"]:
+        threshold = otsu_threshold(image.histogram())
+        image = image.point([255 if value > threshold else 0 for value in range(256)])
+    if settings["crop_margins"]:
+        image = crop_margins(image, settings["margin_pixels"])
+    return image
+
+def target_scale(image, target_dpi, page_width_inches, min_metadata_dpi=150):
+    """
+    Returns the scale bringing an image down to ``target_dpi`` (at most 1.0).
+
+    The resolution is read from the image metadata when it is at least
+    ``min_metadata_dpi``. Otherwise it is estimated assuming the image spans
+    ``page_width_inches``: phone cameras and most JPEG encoders write 72 dpi
+    whatever the photo, which would leave a 12 MP photo at full size.
+    """
+    dpi = image.info.get("dpi", (0, 0))[0]
+    if not dpi or dpi < min_metadata_dpi:
+        dpi = image.width / page_width_inches
+    return min(1.0, target_dpi / dpi) if dpi else 1.0
+
+def downscale(image, target_dpi, page_width_inches, min_metadata_dpi=150):
+    """
+    Downscales an image to ``target_dpi``, never upscaling.
+    """
+    scale = target_scale(image, target_dpi, page_width_inches, min_metadata_dpi)
+    if scale >= 1.0:
+        return image
+    return _resize(image, (max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+
+def _resize(image, size):
+    # reducing_gap first shrinks by an integer factor with a cheap box filter
+    return image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+def otsu_threshold(histogram):
+    """
+    Computes Otsu's threshold from a 256-bin grayscale histogram.
+
+    Args:
+        histogram (list): Pixel count of each gray level, e.g. ``image.histogram()``.
+
+    Returns:
+        int: The threshold maximizing the between-class variance.
+    """
+    histogram = np.asarray(histogram[:256], dtype=np.float64)
+    weights = np.cumsum(histogram)
+    sums = np.cumsum(histogram * np.arange(256))
+    total_weight, total_sum = weights[-1], sums[-1]
+    background = weights
+    foreground = total_weight - weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_background = sums / background
+        mean_foreground = (total_sum - sums) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+    if np.all(np.isnan(variance)):
+        # Single-color image
+        return 127
+    return int(np.nanargmax(variance))
+
+def ink_mask(image):
+    """
+    Returns a mask of the dark pixels of an image (255 for ink, 0 for background).
+    """
+    gray = image.convert("L")
+    threshold = otsu_threshold(gray.histogram())
+    return gray.point([255 if value <= threshold else 0 for value in range(256)])
+
+def skew_angle(image, max_degrees, step=0.5, thumbnail_width=800):
+    """
+    Estimates the rotation (in degrees, counter-clockwise) that straightens the text lines.
+
+    Returns:
+        float: The correction angle, 0.0 when the page is already straight.
+    """
+    thumbnail = image.convert("L")
+    if thumbnail.width > thumbnail_width:
+        thumbnail = thumbnail.resize((thumbnail_width, max(1, round(thumbnail.height * thumbnail_width / thumbnail.width))),
+                                     Image.BILINEAR, reducing_gap=2.0)
+    ink = ink_mask(thumbnail)
+
+    def score(angle):
+        return float(np.var(np.asarray(ink.rotate(angle, expand=True), dtype=np.float32).sum(axis=1)))
+
+    # Only a strictly better angle replaces the upright one, so blank pages are left alone
+    best_angle, best_score = 0.0, score(0.0)
+    for angle in np.arange(-max_degrees, max_degrees + step / 2, step):
+        angle = float(angle)
+        if not angle:
+            continue
+        angle_score = score(angle)
+        if angle_score > best_score:
+            best_angle, best_score = angle, angle_score
+    return best_angle
+
+def crop_margins(image, margin_pixels):
+    """
+    Crops the blank margins around the dark content of an image, keeping ``margin_pixels``.
+    """
+    bbox = ink_mask(image).getbbox()
+    if bbox is None:
+        return image
+    left, top, right, bottom = bbox
+    return image.crop((max(0, left - margin_pixels), max(0, top - margin_pixels),
+                       min(image.width, right + margin_pixels), min(image.height, bottom + margin_pixels)))
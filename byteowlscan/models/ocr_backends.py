@@ -0,0 +1,121 @@
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from byteowlscan.utilities import AppConfig
+from byteowlscan.utilities.lazy_import import lazy_module
+
+pytesseract = lazy_module("pytesseract")
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Tesseract APIs are not thread-safe, so each thread keeps its own, per language
+_local = threading.local()
+_tesserocr_missing = False
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# Function to OCR an in-memory image with the configured backend
+def image_to_string(image, lang=None):
+    """
+    OCRs a PIL image with the backend selected by ``OCR_BACKEND``.
+
+    The ``tesserocr`` backend keeps one Tesseract API per thread with the language
+    model already loaded and passes the image in memory. The ``pytesseract`` backend
+    (the default, and the fallback when tesserocr is not installed) spawns a
+    ``tesseract`` process for every image.
+
+    Args:
+        image (PIL.Image.Image): The image to OCR.
+        lang (str): Tesseract language, defaults to ``OCR_LANG``.
+
+    Returns:
+        str: Text recognized in the image.
+    """
+    lang = lang or AppConfig.get("OCR_LANG", "vie")
+    if AppConfig.get("OCR_BACKEND", "pytesseract") == "tesserocr":
+        api = _get_tesserocr_api(lang)
+        if api is not None:
+            api.SetImage(image)
+            text = api.GetUTF8Text()
+            api.Clear()
+            return text
+    return pytesseract.image_to_string(image, lang=lang)
+
+def _get_tesserocr_api(lang):
+    """
+    Returns the Tesseract API of the current thread, loading it on first use.
+    """
+    global _tesserocr_missing
+    if _tesserocr_missing:
+        return None
+
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+    if lang not in apis:
+        try:
+            import tesserocr
+        except ImportError:
+            _tesserocr_missing = True
+            logger.warning("tesserocr is not installed, falling back to pytesseract.")
+            return None
+        tessdata_path = AppConfig.get("OCR_TESSDATA_PATH")
+        if tessdata_path:
+            apis[lang] = tesserocr.PyTessBaseAPI(path=tessdata_path, lang=lang)
+        else:
+            apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+        logger.info("Loaded Tesseract model '%s' in process %d", lang, os.getpid())
+    return apis[lang]
+
+# Function to initialize a process that runs OCR
+def init_worker(config):
+    """
+    Initializes an OCR worker process and loads the Tesseract model up front.
+
+    Used as the initializer of the OCR pool, and of any other worker pool whose
+    processes run OCR (e.g. the server's parse workers).
+
+    Args:
+        config (dict): The application configuration.
+    """
+    AppConfig.set_config(config)
+    if AppConfig.get("OCR_BACKEND", "pytesseract") == "tesserocr":
+        _get_tesserocr_api(AppConfig.get("OCR_LANG", "vie"))
+
+# Function to get the process-wide OCR worker pool
+def get_ocr_pool():
+    """
+    Returns the long-lived OCR worker pool, created on first use.
+
+    Workers load the Tesseract model once when they start and keep it for the life
+    of the process, so consecutive OCR tasks skip the model startup.
+
+    Returns:
+        ProcessPoolExecutor: The OCR worker pool, with ``OCR_WORKERS`` processes.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            workers = AppConfig.get("OCR_WORKERS") or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                        initargs=(AppConfig.config,))
+            _pool_pid = os.getpid()
+            logger.info("Started OCR worker pool with %d processes", workers)
+    return _pool
+
+# Function to stop the OCR worker pool
+def shutdown_ocr_pool():
+    """Stops the OCR worker pool of this process, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown()
+        _pool = None
+
+atexit.register(shutdown_ocr_pool)
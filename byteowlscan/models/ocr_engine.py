@@ -0,0 +1,223 @@
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from byteowlscan.models import image_preprocess, ocr_backends
+from byteowlscan.utilities import AppConfig, document_input, metrics
+from byteowlscan.utilities.lazy_import import lazy_module
+
+pdf2image = lazy_module("pdf2image")
+Image = lazy_module("PIL.Image")
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Page size used when pdfinfo does not report one (A4, in points)
+_DEFAULT_PAGE_SIZE = (595.0, 842.0)
+
+# Function to OCR a PDF page by page
+def ocr_pdf(pdf_path, dpi=None, workers=None, max_memory_mb=None, lang=None, grayscale=None):
+    """
+    Extracts text from a scanned PDF with OCR, rasterizing pages lazily.
+
+    Args:
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        dpi (int): Rasterization resolution, defaults to ``OCR_DPI``.
+        workers (int): Number of pages OCR'd at once, defaults to ``OCR_WORKERS`` or the number of cores.
+        max_memory_mb (int): Memory ceiling for the page images in flight, defaults to ``OCR_MAX_MEMORY_MB``.
+        lang (str): Tesseract language, defaults to ``OCR_LANG``.
+        grayscale (bool): Rasterize in grayscale (a third of the memory of RGB), defaults to ``OCR_GRAYSCALE``.
+
+    Returns:
+        str: Extracted text from the PDF, in page order.
+    """
+    pages = ocr_pdf_pages(pdf_path, None, dpi, workers, max_memory_mb, lang, grayscale)
+    return "".join(pages[page_number] for page_number in sorted(pages))
+
+# Function to OCR selected pages of a PDF
+def ocr_pdf_pages(pdf_path, page_numbers=None, dpi=None, workers=None, max_memory_mb=None, lang=None, grayscale=None):
+    """
+    OCRs the given pages of a PDF, rasterizing them lazily.
+
+    Consecutive pages are grouped in ranges of at most ``OCR_PAGES_PER_TASK`` pages and
+    OCR'd in parallel on the long-lived OCR worker pool. Each worker rasterizes one page
+    at a time, so at most one page image per worker is held in memory. The number of
+    ranges in flight, and if needed the DPI, are lowered so that the page images stay
+    under ``max_memory_mb``.
+
+    Files are rasterized with pdf2image (Poppler). PDFs held in memory are rasterized
+    with PyMuPDF instead, as pdf2image would write them to a temporary file first.
+
+    Args:
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        page_numbers (list): 1-based pages to OCR, defaults to all the pages.
+        dpi (int): Rasterization resolution, defaults to ``OCR_DPI``.
+        workers (int): Number of pages OCR'd at once, defaults to ``OCR_WORKERS`` or the number of cores.
+        max_memory_mb (int): Memory ceiling for the page images in flight, defaults to ``OCR_MAX_MEMORY_MB``.
+        lang (str): Tesseract language, defaults to ``OCR_LANG``.
+        grayscale (bool): Rasterize in grayscale (a third of the memory of RGB), defaults to ``OCR_GRAYSCALE``.
+
+    Returns:
+        dict: OCR'd text keyed by page number.
+    """
+    dpi = dpi or AppConfig.get("OCR_DPI", 300)
+    workers = workers or AppConfig.get("OCR_WORKERS") or os.cpu_count() or 1
+    max_memory_mb = max_memory_mb or AppConfig.get("OCR_MAX_MEMORY_MB", 1024)
+    lang = lang or AppConfig.get("OCR_LANG", "vie")
+    grayscale = AppConfig.get("OCR_GRAYSCALE", True) if grayscale is None else grayscale
+    pages_per_task = max(1, AppConfig.get("OCR_PAGES_PER_TASK", 1))
+
+    page_count, page_size = _pdf_info(pdf_path)
+    if page_numbers is None:
+        page_numbers = range(1, page_count + 1)
+    page_numbers = sorted(page for page in set(page_numbers) if 1 <= page <= page_count)
+    if not page_numbers:
+        return {}
+
+    dpi, workers = _fit_memory(page_size, dpi, workers, max_memory_mb, grayscale)
+    page_ranges = page_ranges_of(page_numbers, pages_per_task)
+    workers = min(workers, len(page_ranges))
+    name = document_input.source_name(pdf_path)
+    logger.info("OCR %s: %d of %d pages at %d DPI on %d workers", name, len(page_numbers), page_count, dpi, workers)
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_ocr_page_range(pdf_path, first, last, dpi, lang, grayscale) for first, last in page_ranges]
+    else:
+        results = _run_on_pool(pdf_path, page_ranges, workers, dpi, lang, grayscale)
+
+    texts = {}
+    for page_results in results:
+        for page_number, text, raster_seconds, ocr_seconds in page_results:
+            logger.info("OCR page %d/%d: rasterize %.2fs, ocr %.2fs, %d chars",
+                        page_number, page_count, raster_seconds, ocr_seconds, len(text))
+            metrics.observe("ocr_page_seconds", raster_seconds, step="rasterize")
+            metrics.observe("ocr_page_seconds", ocr_seconds, step="ocr")
+            texts[page_number] = text
+    logger.info("OCR %s done in %.2fs", name, time.perf_counter() - started)
+    return texts
+
+# Function to group page numbers in ranges of consecutive pages
+def page_ranges_of(page_numbers, max_pages):
+    """
+    Groups sorted page numbers in ranges of consecutive pages of at most ``max_pages`` pages.
+
+    Args:
+        page_numbers (list): Sorted 1-based page numbers.
+        max_pages (int): Maximum number of pages per range.
+
+    Returns:
+        list: ``(first, last)`` page ranges, inclusive.
+    """
+    ranges = []
+    for page in page_numbers:
+        if ranges and page == ranges[-1][1] + 1 and page - ranges[-1][0] < max_pages:
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+def _run_on_pool(pdf_path, page_ranges, workers, dpi, lang, grayscale):
+    """
+    OCRs page ranges on the OCR worker pool with at most ``workers`` ranges in flight.
+
+    Returns:
+        list: The results of ``_ocr_page_range`` for each range, in page order.
+    """
+    pool = ocr_backends.get_ocr_pool()
+    pdf_path = document_input.picklable(pdf_path)
+    results = [None] * len(page_ranges)
+    pending = {}
+    for index, (first, last) in enumerate(page_ranges):
+        if len(pending) >= workers:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        pending[pool.submit(_ocr_page_range, pdf_path, first, last, dpi, lang, grayscale)] = index
+    for future, index in pending.items():
+        results[index] = future.result()
+    return results
+
+def _ocr_page_range(pdf_path, first_page, last_page, dpi, lang, grayscale):
+    """
+    Rasterizes and OCRs a range of pages, one page at a time.
+
+    Returns:
+        list: ``(page_number, text, raster_seconds, ocr_seconds)`` for each page.
+    """
+    results = []
+    for page_number in range(first_page, last_page + 1):
+        started = time.perf_counter()
+        if isinstance(pdf_path, str):
+            images = pdf2image.convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number,
+                                       grayscale=grayscale)
+        else:
+            images = [_rasterize_page(pdf_path, page_number, dpi, grayscale)]
+        images = [image_preprocess.preprocess(image, "pdf") for image in images]
+        rasterized = time.perf_counter()
+        text = "".join(ocr_backends.image_to_string(image, lang=lang) for image in images)
+        for image in images:
+            image.close()
+        results.append((page_number, text, rasterized - started, time.perf_counter() - rasterized))
+    return results
+
+def _pdf_info(pdf_path):
+    """
+    Reads the page count and the size in points of the first page.
+
+    Returns:
+        tuple: The page count and the ``(width, height)`` page size.
+    """
+    if isinstance(pdf_path, str):
+        info = pdf2image.pdfinfo_from_path(pdf_path)
+        return int(info.get("Pages", 0)), _page_size(info)
+    with document_input.open_pdf(pdf_path) as document:
+        if not document.page_count:
+            return 0, _DEFAULT_PAGE_SIZE
+        rect = document[0].rect
+        return document.page_count, (rect.width, rect.height)
+
+def _rasterize_page(pdf_path, page_number, dpi, grayscale):
+    """
+    Rasterizes a page of a PDF held in memory with PyMuPDF.
+
+    Returns:
+        PIL.Image.Image: The page image.
+    """
+    with document_input.open_pdf(pdf_path) as document:
+        pixmap = document[page_number - 1].get_pixmap(dpi=dpi, colorspace="gray" if grayscale else "rgb", alpha=False)
+        return Image.frombytes("L" if grayscale else "RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+def _page_size(info):
+    """
+    Reads the page size in points from the pdfinfo output.
+    """
+    match = re.match(r"\s*([\d.]+)\s*x\s*([\d.]+)", str(info.get("Page size", "")))
+    if not match:
+        return _DEFAULT_PAGE_SIZE
+    return float(match.group(1)), float(match.group(2))
+
+def _fit_memory(page_size, dpi, workers, max_memory_mb, grayscale):
+    """
+    Lowers the number of workers, then the DPI, until the page images in flight fit in memory.
+
+    Returns:
+        tuple: The DPI and the number of workers to use.
+    """
+    width, height = page_size
+    channels = 1 if grayscale else 3
+    page_bytes = (width / 72.0 * dpi) * (height / 72.0 * dpi) * channels
+    max_bytes = max_memory_mb * 1024 * 1024
+
+    fitting_workers = int(max_bytes // page_bytes)
+    if fitting_workers >= 1:
+        return dpi, max(1, min(workers, fitting_workers))
+
+    # Even one page does not fit: scale the resolution down (memory grows with dpi squared)
+    fitted_dpi = int(dpi * math.sqrt(max_bytes / page_bytes))
+    logger.warning("OCR page at %d DPI exceeds the memory ceiling of %d MB, using %d DPI",
+                   dpi, max_memory_mb, fitted_dpi)
+    return max(72, fitted_dpi), 1
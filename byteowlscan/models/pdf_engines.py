@@ -0,0 +1,245 @@
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from byteowlscan.models import ocr_backends, ocr_engine
+from byteowlscan.utilities import AppConfig, document_input, metrics
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+_engines = {}
+
+# Function to register a PDF text engine
+def register_engine(name):
+    """
+    Decorator registering a PDF text engine under ``name``.
+
+    An engine is a function ``engine(pdf_path, page_numbers=None) -> dict`` returning
+    the text of each requested 1-based page (all the pages when ``page_numbers`` is None).
+    ``pdf_path`` is a path or the content of the PDF (bytes or memoryview), see
+    ``document_input.to_source``.
+
+    Args:
+        name (str): Engine name, as used in ``PDF_ENGINE`` and ``PDF_ENGINE_FALLBACKS``.
+    """
+    def decorator(fn):
+        _engines[name] = fn
+        return fn
+    return decorator
+
+def get_engine(name):
+    """
+    Returns the PDF text engine registered under ``name``.
+
+    Raises:
+        ValueError: If no engine is registered under that name.
+    """
+    if name not in _engines:
+        raise ValueError(f"Unknown PDF engine: {name}. Available engines: {', '.join(available_engines())}.")
+    return _engines[name]
+
+def available_engines():
+    """
+    Returns:
+        list: Names of the registered PDF text engines.
+    """
+    return sorted(_engines)
+
+@register_engine("pymupdf")
+def pymupdf_pages(pdf_path, page_numbers=None):
+    """
+    Extracts the text layer of each page with PyMuPDF.
+
+    Documents of at least ``PDF_PARALLEL_MIN_PAGES`` pages are split in page ranges
+    extracted in parallel on the worker pool.
+    """
+    with document_input.open_pdf(pdf_path) as document:
+        page_count = document.page_count
+    if page_numbers is None:
+        page_numbers = range(1, page_count + 1)
+    page_numbers = sorted(page for page in set(page_numbers) if 1 <= page <= page_count)
+
+    workers = AppConfig.get("PDF_WORKERS") or AppConfig.get("OCR_WORKERS") or os.cpu_count() or 1
+    if workers == 1 or len(page_numbers) < AppConfig.get("PDF_PARALLEL_MIN_PAGES", 64):
+        return _pymupdf_page_list(pdf_path, page_numbers)
+
+    pages_per_task = max(1, -(-len(page_numbers) // workers))
+    page_lists = [page_numbers[i:i + pages_per_task] for i in range(0, len(page_numbers), pages_per_task)]
+    pdf_path = document_input.picklable(pdf_path)
+    texts = {}
+    pool = ocr_backends.get_ocr_pool()
+    pending = set()
+    for page_list in page_lists:
+        if len(pending) >= workers:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                texts.update(future.result())
+        pending.add(pool.submit(_pymupdf_page_list, pdf_path, page_list))
+    for future in pending:
+        texts.update(future.result())
+    return texts
+
+def _pymupdf_page_list(pdf_path, page_numbers):
+    """
+    Extracts the text of the given pages in the current process.
+    """
+    with document_input.open_pdf(pdf_path) as document:
+        return {page: document[page - 1].get_text() for page in page_numbers}
+
+@register_engine("pdfminer")
+def pdfminer_pages(pdf_path, page_numbers=None):
+    """
+    Extracts the text layer of each page with pdfminer (pure Python, slower).
+    """
+    from pdfminer.high_level import extract_text
+
+    # pdfminer separates pages with a form feed
+    with document_input.open_stream(pdf_path) as pdf_file:
+        texts = extract_text(pdf_file, page_numbers=[page - 1 for page in page_numbers] if page_numbers else None).split("\f")
+    if texts and not texts[-1]:
+        # Trailing form feed after the last page
+        texts.pop()
+    pages = sorted(page_numbers) if page_numbers else range(1, len(texts) + 1)
+    return {page: text for page, text in zip(pages, texts)}
+
+@register_engine("ocr")
+def ocr_pages(pdf_path, page_numbers=None):
+    """
+    Rasterizes and OCRs each page.
+    """
+    return ocr_engine.ocr_pdf_pages(pdf_path, page_numbers)
+
+# Function to extract the text of a PDF with the configured engines
+def extract_pdf_pages(pdf_path, engine=None, fallbacks=None):
+    """
+    Extracts the text of each page with the first engine that works.
+
+    Args:
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        engine (str): Engine to try first, defaults to ``PDF_ENGINE``.
+        fallbacks (list): Engines tried in order when the previous one fails, defaults
+            to ``PDF_ENGINE_FALLBACKS``.
+
+    Returns:
+        tuple: The name of the engine used and the text keyed by page number.
+
+    Raises:
+        Exception: The error of the last engine when they all failed.
+    """
+    engine = engine or AppConfig.get("PDF_ENGINE", "pymupdf")
+    fallbacks = AppConfig.get("PDF_ENGINE_FALLBACKS", ["pdfminer"]) if fallbacks is None else fallbacks
+    names = [engine] + [name for name in fallbacks if name != engine]
+
+    error = None
+    for name in names:
+        started = time.perf_counter()
+        try:
+            pages = get_engine(name)(pdf_path)
+        except Exception as e:
+            logger.warning("PDF engine %s failed on %s: %s", name, document_input.source_name(pdf_path), e)
+            error = e
+            continue
+        seconds = time.perf_counter() - started
+        metrics.observe("extractor_seconds", seconds, extractor=name)
+        metrics.inc("pdf_pages_total", len(pages), engine=name)
+        logger.info("Extracted %d pages with %s in %.2fs.", len(pages), name, seconds)
+        return name, pages
+    raise error
+
+# Function to profile the pages of a PDF
+def profile_pages(pdf_path, pages):
+    """
+    Measures what each page is made of, to tell text pages from scanned ones.
+
+    Args:
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        pages (dict): Extracted text keyed by page number.
+
+    Returns:
+        dict: For each page, ``chars`` (extracted characters), ``glyphs`` (visible
+        glyphs drawn on the page, invisible OCR layers excluded), ``text_density``
+        (characters per square inch) and ``image_coverage`` (fraction of the page
+        covered by images, 0 to 1).
+    """
+    profiles = {}
+    with document_input.open_pdf(pdf_path) as document:
+        for page_number, text in pages.items():
+            page = document[page_number - 1]
+            area = abs(page.rect) or 1.0
+            image_area = 0.0
+            for image in page.get_image_info():
+                bbox = page.rect & image["bbox"]
+                if not bbox.is_empty:
+                    image_area += abs(bbox)
+            glyphs = sum(len(span["chars"]) for span in page.get_texttrace()
+                         if span["type"] != 3 and span["opacity"] > 0)
+            chars = len(text.strip())
+            profiles[page_number] = {
+                "chars": chars,
+                "glyphs": glyphs,
+                "text_density": chars / (area / 72.0 / 72.0),
+                "image_coverage": min(1.0, image_area / area),
+            }
+    return profiles
+
+# Function to decide if a page needs OCR from its profile
+def needs_ocr(profile):
+    """
+    Decides whether a page must be OCR'd.
+
+    A page is OCR'd when it has almost no text (``PDF_OCR_MIN_CHARS``), when its
+    text is not actually drawn (fewer than ``PDF_OCR_MIN_GLYPHS`` visible glyphs,
+    e.g. a hidden text layer), or when it is mostly an image
+    (``PDF_OCR_IMAGE_COVERAGE``) with sparse text (``PDF_OCR_MIN_TEXT_DENSITY``),
+    e.g. a scan with a stray header.
+
+    Args:
+        profile (dict): A page profile from ``profile_pages``.
+
+    Returns:
+        str | None: Why the page needs OCR, or None if its text layer is usable.
+    """
+    if profile["chars"] < AppConfig.get("PDF_OCR_MIN_CHARS", 20):
+        return "no text"
+    if profile.get("glyphs") is not None and profile["glyphs"] < AppConfig.get("PDF_OCR_MIN_GLYPHS", 20):
+        return "invisible text"
+    if (profile.get("image_coverage", 0.0) >= AppConfig.get("PDF_OCR_IMAGE_COVERAGE", 0.5)
+            and profile["text_density"] < AppConfig.get("PDF_OCR_MIN_TEXT_DENSITY", 5.0)):
+        return "scanned"
+    return None
+
+# Function to decide which pages need OCR
+def pages_needing_ocr(pdf_path, pages):
+    """
+    Classifies each page from its text density, image coverage and glyph count and
+    returns the pages that need OCR.
+
+    Falls back to the character count alone when PyMuPDF cannot read the file.
+
+    Args:
+        pdf_path (str | bytes | memoryview): The path to the PDF file, or its content.
+        pages (dict): Extracted text keyed by page number.
+
+    Returns:
+        list: Page numbers to OCR.
+    """
+    try:
+        profiles = profile_pages(pdf_path, pages)
+    except Exception as e:
+        logger.warning("Could not profile the pages of %s, deciding OCR from the text only: %s",
+                       document_input.source_name(pdf_path), e)
+        profiles = {page: {"chars": len(text.strip()), "glyphs": None, "text_density": float("inf")}
+                    for page, text in pages.items()}
+
+    ocr_pages = []
+    for page_number, profile in sorted(profiles.items()):
+        reason = needs_ocr(profile)
+        metrics.inc("pdf_page_classes_total", kind=reason or "text")
+        if reason:
+            logger.info("Page %d needs OCR (%s): %d chars, %s glyphs, %.1f chars/in2, %.0f%% images",
+                        page_number, reason, profile["chars"], profile["glyphs"], profile["text_density"],
+                        100 * profile.get("image_coverage", 0.0))
+            ocr_pages.append(page_number)
+    return ocr_pages
@@ -0,0 +1,411 @@
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import openai
+import requests
+
+from byteowlscan import main as byteowlscan_main
+from byteowlscan.models import gpt_scheduler, ocr_backends
+from byteowlscan.utilities import (AppConfig, app_utilities, document_input, initArgs, metrics,
+                                   pipeline, semantic_splitter, token_counter)
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted upload
+DEFAULT_MAX_UPLOAD_MB = 20
+
+class ResumeServer:
+    """
+    Long-running HTTP server extracting resumes with warm resources.
+
+    The configuration, tokenizers and splitters, the parse/OCR worker processes and
+    a pooled keep-alive HTTP session for the OpenAI API are created once at startup
+    and shared by every job. Jobs run on the concurrent pipeline. Endpoints:
+
+    - ``POST /jobs``: a JSON body ``{"paths": [...]}`` (or ``{"path": ...}``) of files
+      under ``SERVER_INPUT_ROOT``, or a raw file upload with ``?filename=cv.pdf``. Paths
+      resolving outside the root are rejected, and without a root only uploads are
+      accepted. Uploads are parsed from memory, never written to disk, and their format
+      is detected from their content. Returns ``202`` with the job, or ``200`` with the
+      results when called with ``?wait=true``.
+    - ``GET /jobs/<id>``: the status of a job and, once finished, its results and errors.
+    - ``GET /health``: liveness, uptime and job counts.
+    - ``GET /metrics``: the metrics in the Prometheus text format.
+    """
+
+    def __init__(self, args: argparse.Namespace, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Args:
+            args (argparse.Namespace): Pipeline arguments applied to every job (model, chunking...).
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 picks a free port.
+        """
+        self.args = args
+        self.started_at = time.time()
+        self.jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._max_upload_bytes = int(AppConfig.get("SERVER_MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB)) * 1024 * 1024
+        input_root = AppConfig.get("SERVER_INPUT_ROOT")
+        self.input_root: Optional[str] = os.path.realpath(input_root) if input_root else None
+        self._job_runner = ThreadPoolExecutor(max_workers=AppConfig.get("SERVER_MAX_CONCURRENT_JOBS", 4),
+                                              thread_name_prefix="job")
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._session: Optional[requests.Session] = None
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def warm_up(self) -> None:
+        """Creates the shared resources once, so the first job does not pay for them."""
+        started = time.perf_counter()
+        metrics.enable()
+
+        # One keep-alive connection pool shared by all the GPT calls
+        pool_size = AppConfig.get("SERVER_HTTP_POOL_SIZE", 32)
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        openai.requestssession = self._session
+        gpt_scheduler.get_scheduler()
+
+        # Tokenizers and splitters of the chunking stage
+        token_counter.get_encoding(self.args.model)
+        if self.args.enableChunk or self.args.chunkBySection:
+            semantic_splitter.get_splitter("text")
+            semantic_splitter.get_splitter("markdown")
+
+        # Parse workers with the document backends imported and Tesseract loaded
+        workers = self.args.parseWorkers or AppConfig.get("PIPELINE_PARSE_WORKERS") or pipeline.default_parse_workers()
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=init_server_worker,
+            initargs=(dict(AppConfig.config, OCR_WORKERS=AppConfig.get("PIPELINE_OCR_WORKERS", 1)),),
+        )
+        for future in [self._parse_pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+        logger.info("Server warmed up in %.2fs: %d parse workers", time.perf_counter() - started, workers)
+
+    def start(self) -> "ResumeServer":
+        """Warms up and serves requests on a background thread."""
+        self.warm_up()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="resume-server", daemon=True)
+        self._thread.start()
+        logger.info("Serving on %s", self.url)
+        return self
+
+    def serve_forever(self) -> None:
+        """Warms up and serves requests on the calling thread until interrupted."""
+        self.warm_up()
+        logger.info("Serving on %s", self.url)
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stops serving and releases the workers."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+        self._job_runner.shutdown(wait=True)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        if self._session is not None:
+            openai.requestssession = None
+            self._session.close()
+            self._session = None
+        ocr_backends.shutdown_ocr_pool()
+
+    def __enter__(self) -> "ResumeServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def submit(self, paths: List[str]) -> Dict:
+        """
+        Queues a job extracting ``paths``.
+
+        Args:
+            paths (list): Files to extract, or uploads kept in memory (see ``upload``).
+
+        Returns:
+            dict: The job.
+        """
+        job_id = uuid.uuid4().hex
+        job = {"id": job_id, "status": "queued", "files": list(paths), "results": {}, "errors": {},
+               "created_at": time.time(), "finished_at": None}
+        with self._lock:
+            self._forget_old_jobs()
+            self.jobs[job_id] = job
+        job["future"] = self._job_runner.submit(self._run_job, job)
+        metrics.inc("server_jobs_total")
+        return job
+
+    def _forget_old_jobs(self) -> None:
+        # Finished jobs are kept up to SERVER_MAX_JOBS_KEPT, oldest dropped first
+        finished = [job_id for job_id, job in self.jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[:max(0, len(finished) - AppConfig.get("SERVER_MAX_JOBS_KEPT", 1000) + 1)]:
+            del self.jobs[job_id]
+
+    def _run_job(self, job: Dict) -> None:
+        # The job is read by job_view while it runs: its fields change under self._lock
+        with self._lock:
+            job["status"] = "running"
+        try:
+            pipeline.run_pipeline(
+                job["files"],
+                parse_fn=app_utilities.parse_resume,
+                extract_fn=functools.partial(byteowlscan_main.extract_resume_stage, args=self.args),
+                save_fn=functools.partial(_keep_in_memory, job, self._lock),
+                extract_workers=self.args.gptConcurrency or AppConfig.get("PIPELINE_GPT_CONCURRENCY", 4),
+                queue_size=self.args.queueSize or AppConfig.get("PIPELINE_QUEUE_SIZE", 16),
+                done_fn=functools.partial(_record_error, job, self._lock),
+                executor=self._parse_pool,
+            )
+            with self._lock:
+                job["status"] = "failed" if job["errors"] and not job["results"] else "succeeded"
+        except Exception as e:
+            logger.error("Job %s failed: %s", job["id"], e)
+            with self._lock:
+                job["errors"]["job"] = str(e)
+                job["status"] = "failed"
+        finally:
+            with self._lock:
+                # Keep the names of the uploads but not their content
+                job["files"] = [str(path) for path in job["files"]]
+                job["results"] = {str(path): data for path, data in job["results"].items()}
+                job["errors"] = {str(path): error for path, error in job["errors"].items()}
+                job["finished_at"] = time.time()
+
+    def resolve_input(self, path: str) -> Optional[str]:
+        """
+        Resolves a path sent to ``POST /jobs`` against ``SERVER_INPUT_ROOT``.
+
+        Relative paths are relative to the root. Symlinks and ``..`` are resolved before
+        the check, so they cannot lead out of it.
+
+        Args:
+            path (str): The path sent by the client.
+
+        Returns:
+            str | None: The real path, or None if path jobs are disabled or it is outside the root.
+        """
+        if self.input_root is None or not isinstance(path, str):
+            return None
+        try:
+            resolved = os.path.realpath(os.path.join(self.input_root, path))
+            if os.path.commonpath([self.input_root, resolved]) != self.input_root:
+                return None
+        except ValueError:
+            # Null bytes, or another drive on Windows
+            return None
+        return resolved
+
+    def upload(self, filename: str, data: bytes) -> document_input.MemoryDocument:
+        """
+        Wraps an uploaded file so it goes through the pipeline like a path, without
+        being written to disk.
+
+        Returns:
+            MemoryDocument: The upload, named after ``filename`` with a unique prefix.
+        """
+        return document_input.MemoryDocument(f"{uuid.uuid4().hex[:8]}_{os.path.basename(filename)}", data)
+
+    def health(self) -> Dict:
+        """Returns the liveness payload of ``/health``."""
+        with self._lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "status": "ok",
+            "uptime_seconds": time.time() - self.started_at,
+            "jobs": {status: statuses.count(status) for status in ("queued", "running", "succeeded", "failed")},
+        }
+
+    def job_view(self, job_id: str) -> Optional[Dict]:
+        """Returns the public view of a job, or None if it does not exist."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            # Copied under the lock, the job's errors and files change while it runs
+            view = {key: value for key, value in job.items() if key not in ("future", "results", "errors", "files")}
+            view["files"] = [str(path) for path in job["files"]]
+            view["errors"] = {str(path): error for path, error in job["errors"].items()}
+            if job["status"] not in ("queued", "running"):
+                view["results"] = dict(job["results"])
+        return view
+
+def init_server_worker(config: Dict) -> None:
+    """Initialize a server parse worker and import the document backends up front.
+
+    Args:
+        config (dict): The application configuration.
+    """
+    byteowlscan_main.init_parse_worker(config)
+    from byteowlscan.models import extract_model, pdf_engines  # noqa: F401
+    ocr_backends.init_worker(config)
+
+def _keep_in_memory(job: Dict, lock: threading.Lock, path: str, data: Dict, timings: Dict, sha256: str) -> None:
+    """Results are returned by the API instead of being written."""
+    with lock:
+        job["results"][path] = data
+    return None
+
+def _record_error(job: Dict, lock: threading.Lock, path: str, output: str, error: str, timings: Dict,
+                  sha256: str) -> None:
+    if error:
+        with lock:
+            job["errors"][path] = error
+
+def _make_handler(server: ResumeServer):
+    class ResumeRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                self._send_json(200, server.health())
+            elif url.path == "/metrics":
+                self._send(200, metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            elif url.path.startswith("/jobs/"):
+                job = server.job_view(url.path[len("/jobs/"):])
+                if job is None:
+                    self._send_json(404, {"error": "Unknown job"})
+                else:
+                    self._send_json(200, job)
+            else:
+                self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/jobs":
+                self._send_json(404, {"error": f"Unknown path {url.path}"})
+                return
+            query = parse_qs(url.query)
+            body = self._read_body()
+            if body is None:
+                return
+
+            if "filename" in query:
+                paths = [server.upload(query["filename"][0], body)]
+            else:
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": "Expected a JSON body or a file upload with ?filename="})
+                    return
+                if not isinstance(payload, dict):
+                    self._send_json(400, {"error": "Expected a JSON object with \"paths\" or \"path\""})
+                    return
+                requested = payload.get("paths") or ([payload["path"]] if payload.get("path") else [])
+                if not isinstance(requested, list) or not all(isinstance(path, str) for path in requested):
+                    self._send_json(400, {"error": "Expected a list of paths"})
+                    return
+                if requested and server.input_root is None:
+                    self._send_json(403, {"error": "Jobs by path are disabled, set SERVER_INPUT_ROOT or upload the file"})
+                    return
+                paths = [server.resolve_input(path) for path in requested]
+                rejected = [path for path, resolved in zip(requested, paths) if resolved is None]
+                if rejected:
+                    self._send_json(403, {"error": "Paths outside the input root", "rejected": rejected})
+                    return
+                missing = [path for path, resolved in zip(requested, paths) if not os.path.isfile(resolved)]
+                if not paths or missing:
+                    self._send_json(400, {"error": "No readable files", "missing": missing})
+                    return
+
+            job = server.submit(paths)
+            if query.get("wait", ["false"])[0].lower() in ("1", "true", "yes"):
+                job["future"].result()
+                self._send_json(200, server.job_view(job["id"]))
+            else:
+                self._send_json(202, server.job_view(job["id"]))
+
+        def _read_body(self):
+            # Reads exactly Content-Length bytes, or answers with an error and returns None
+            header = self.headers.get("Content-Length")
+            if header is None:
+                return self._refuse(411, "Content-Length required")
+            try:
+                length = int(header)
+            except ValueError:
+                length = -1
+            if length < 0:
+                return self._refuse(400, "Invalid Content-Length")
+            if length > server._max_upload_bytes:
+                return self._refuse(413, "Upload too large")
+            body = self.rfile.read(length)
+            if len(body) < length:
+                return self._refuse(400, "Incomplete body")
+            return body
+
+        def _refuse(self, status, error):
+            # The unread body would be taken for the next request of a keep-alive connection
+            self.close_connection = True
+            self._send_json(status, {"error": error})
+            return None
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        def _send(self, status, data, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ResumeRequestHandler
+
+def serve(argv: Optional[List[str]] = None) -> None:
+    """Run the resume extraction server.
+
+    ``--host`` and ``--port`` select the address; the other arguments are the usual
+    pipeline arguments (``--config``, ``--apiKey``, ``--enableChunk``...).
+
+    Args:
+        argv (list, optional): Command line arguments, defaults to ``sys.argv``.
+    """
+    parser = argparse.ArgumentParser(description="Run the resume extraction server.", add_help=False)
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    server_args, pipeline_argv = parser.parse_known_args(argv)
+    args = initArgs(pipeline_argv)
+
+    byteowlscan_main.setup_logging()
+    AppConfig.init_config(args.config)
+    if args.enableCache:
+        AppConfig.set("CACHE_ENABLED", True)
+    openai.api_key = args.apiKey or AppConfig.get("OPENAI_API_KEY")
+    openai.api_base = AppConfig.get("OPENAI_API_BASE", openai.api_base)
+
+    server = ResumeServer(args, host=server_args.host or AppConfig.get("SERVER_HOST", "127.0.0.1"),
+                          port=server_args.port or AppConfig.get("SERVER_PORT", 8080))
+    server.serve_forever()
+
+__all__ = ["ResumeServer", "serve"]
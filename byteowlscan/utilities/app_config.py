@@ -7,6 +7,11 @@ class AppConfig:
     def init_config(file_path):
         AppConfig.config = AppConfig.load_config(file_path)
 
+    @staticmethod
+    def set_config(config):
+        """Set an already loaded configuration (e.g. in a worker process)."""
+        AppConfig.config = config
+
     @staticmethod
     def load_config(file_path):
         """Load YAML configuration file."""
@@ -23,5 +28,11 @@ class AppConfig:
 
     @staticmethod
     def get(key, default=None):
+        if AppConfig.config is None:
+            return default
         return AppConfig.config.get(key, default)
+
+    @staticmethod
+    def set(key, value):
+        AppConfig.config[key] = value
     
\ No newline at end of file
@@ -1,6 +1,10 @@
 
-def generatePreProcessPrompt(extracted_text):
-    prompt = f"""
+# Version of the prompt instructions. They are sent as a prefix identical byte for byte
+# across requests, ahead of the resume text, so that the provider caches it. Bump the
+# version whenever an instruction changes.
+PROMPT_VERSION = "1"
+
+PREPROCESS_INSTRUCTIONS = """
     Preprocess the extracted text from a resume to make it clear and structured without losing any content. Follow these instructions:
 
     1. Preserve every piece of information exactly as it appears.
@@ -11,14 +15,20 @@ def generatePreProcessPrompt(extracted_text):
     6. Do not modify or rephrase the content in any way.
     7. Ensure the text is well-organized and readable while retaining all original details and content structure.
 
-    Here is the extracted text to preprocess:
-    \"\"\"{extracted_text}\"\"\"
+    The extracted text to preprocess is given in the next message.
     """
-    
+
+def generatePreProcessText(extracted_text):
+    return f"""Here is the extracted text to preprocess:
+\"\"\"{extracted_text}\"\"\"
+"""
+
+def generatePreProcessPrompt(extracted_text):
+    prompt = PREPROCESS_INSTRUCTIONS + generatePreProcessText(extracted_text)
+
     return prompt
 
-def generateExtractInfo(text_chunk):
-    prompt = """
+EXTRACT_INFO_INSTRUCTIONS = """
     You are tasked with **extracting all information** from the following resume text into a JSON format, **ensuring that every detail is preserved exactly as it appears in the original text. Your extraction should be comprehensive and include all sections and details without any omissions or alterations.**
 
     **Instructions:**
@@ -197,8 +207,191 @@ def generateExtractInfo(text_chunk):
             // Include any other information that doesn't fit into the schema
         }
     }
-    **Candidate's CV:**
-    """ + text_chunk + """
+    ```
+
+    The candidate's CV is given in the next message.
     """
-    
+
+def generateResumeText(text_chunk, sections=None):
+    return ("**Candidate's CV sections:**\n" if sections else "**Candidate's CV:**\n") + text_chunk
+
+def generateExtractInfo(text_chunk):
+    prompt = EXTRACT_INFO_INSTRUCTIONS + generateResumeText(text_chunk)
+
+    return prompt
+
+# Instructions and JSON structure of each top-level key, for the section prompts
+SECTION_PROMPTS = {
+    "candidateInformation": ("""
+    - **candidateInformation:**
+        - **fullName:** Extract the full name exactly as it appears.
+        - **gender:** Include the gender if mentioned.
+        - **IDNo:** Include the identification number if mentioned.
+        - **currentPosition:** Include the current job title or desired position.
+        - **dateOfBirth:** Extract the date of birth.
+        - **hometown:** Include the hometown if mentioned.
+        - **phone:** Include all phone numbers.
+        - **email:** Include all email addresses.
+        - **address:** Extract the full address.
+        - **introduce:** Extract introduce/description about profile in resume.
+""", """
+        "candidateInformation": {
+            "fullName": "",
+            "gender": "",
+            "IDNo": "",
+            "currentPosition": "",
+            "dateOfBirth": "",
+            "hometown": "",
+            "phone": "",
+            "email": "",
+            "address": "",
+            "introduce": ""
+        }"""),
+    "careerPlan": ("""
+    - **careerPlan:** Include any statements about the candidate's career plans.
+""", """
+        "careerPlan": \"\""""),
+    "education": ("""
+    - **education:** A list of educational qualifications, each containing:
+        - **degree:** The degree obtained (e.g., "Cử nhân", "Thạc sĩ", "Tiến sĩ").
+        - **major:** The field of study or major.
+        - **university:** The name of the university or institution.
+        - **graduationDate:** The date of graduation.
+""", """
+        "education": [
+            // Include all educational qualifications
+        ]"""),
+    "workExperience": ("""
+    - **workExperience:** A list of work experiences, each containing:
+        - **company:** The name of the company.
+        - **role:** The position held.
+        - **scale:** The scale or size of the company (e.g., "Quy mô 2.000 NV").
+        - **duration:** The time period worked (e.g., "2018 - Hiện tại").
+        - **salary:** Include the salary information for this position, if mentioned.
+        - **reasonForLeaving:** Include the reason for leaving this position, if mentioned.
+        - **responsibilities:** A list of all responsibilities, actions, and sentences within the work experience, **including any sub-titles or enumerated sections** (e.g., "1/ Social Media – Digital Marketing", "2/ Trưởng nhóm truyền thông (Fresher)"). Preserve numbering, bullet points, and formatting exactly as in the original text.
+""", """
+        "workExperience": [
+            {
+                "company": "",
+                "role": "",
+                "scale": "",
+                "duration": "",
+                "salary": "",
+                "reasonForLeaving": "",
+                "responsibilities": [
+                    // Include all responsibilities, including sub-titles and enumerated sections
+                ]
+                //Another property with value related to work experience
+            }
+            // Include all work experiences
+        ]"""),
+    "skills": ("""
+    - **skills:** Include all other skills mentioned, both technical and soft skills.
+""", """
+        "skills": {
+            "technicalSkills": [
+                // Include all technical skills
+            ],
+            "softSkills": [
+                // Include all soft skills
+            ]
+        }"""),
+    "languageSkills": ("""
+    - **languageSkills:** Include any language skills mentioned.
+""", """
+        "languageSkills": [
+            // Include any language skills mentioned
+        ]"""),
+    "computerSkills": ("""
+    - **computerSkills:** Include any computer or technical skills mentioned.
+""", """
+        "computerSkills": [
+            // Include any computer or technical skills mentioned
+        ]"""),
+    "trainingCourses": ("""
+    - **trainingCourses:** A list of training courses or certifications, each containing:
+        - **course:** The name of the course or certification.
+        - **institution:** The institution or organization providing the course.
+""", """
+        "trainingCourses": [
+            // Include all training courses
+        ]"""),
+    "projects": ("""
+    - **projects:** Include any projects the candidate has worked on, as a list of objects containing relevant details.
+""", """
+        "projects": [
+            // Include any projects the candidate has worked on
+        ]"""),
+    "achievementsAndAwards": ("""
+    - **achievementsAndAwards:** List all achievements and awards.
+""", """
+        "achievementsAndAwards": [
+            // Include all achievements and awards
+        ]"""),
+    "references": ("""
+    - **references:** List any references provided, each containing relevant details.
+""", """
+        "references": [
+            // Include any references provided
+        ]"""),
+    "volunteerExperience": ("""
+    - **volunteerExperience:** Include any volunteer experience, as a list of objects containing relevant details.
+""", """
+        "volunteerExperience": [
+            // Include any volunteer experience
+        ]"""),
+    "familyInformation": ("""
+    - **familyInformation:** Include any family information provided, as a list of objects containing relevant details.
+""", """
+        "familyInformation": [
+            // Include any family information provided
+        ]"""),
+    "additionalInformation": ("""
+    - **additionalInformation:** Include any additional information that does not fit into the above categories.
+""", """
+        "additionalInformation": {
+            // Include any additional information
+        }"""),
+}
+
+# Top-level keys of the full extraction structure, for content found in the wrong section
+RESUME_KEYS = ("candidateInformation", "education", "trainingCourses", "languageSkills", "computerSkills", "skills",
+               "workExperience", "salary", "references", "availability", "expectedSalary", "reasonForApplication",
+               "careerPlan", "familyInformation", "commitmentStatement", "signDate", "achievementsAndAwards",
+               "projects", "volunteerExperience", "additionalInformation", "otherContent")
+
+def generateSectionInstructions(sections):
+    # In a fixed order, so that the same sections always give the same prefix
+    sections = [section for section in SECTION_PROMPTS if section in sections]
+    instructions = "".join(SECTION_PROMPTS[section][0] for section in sections)
+    structure = ",".join(SECTION_PROMPTS[section][1] for section in sections)
+    prompt = """
+    You are tasked with **extracting all information** from the following sections of a resume into a JSON format, **ensuring that every detail is preserved exactly as it appears in the original text.** Do not omit or alter anything.
+
+    **Instructions:**
+
+    - **Language Note:** The resume text is in Vietnamese. Do not translate or alter any content. Extract the information exactly as it appears, preserving all formatting, bullet points, and line breaks within the JSON values where applicable.
+
+    - **Output Format:** Organize the extracted data into a JSON object with the following structure:
+""" + instructions + """
+    - **Other Sections:** Information that belongs to another part of a resume goes under its usual key (""" + ", ".join(RESUME_KEYS) + """), and anything else under **otherContent**.
+
+    **Guidelines:**
+
+    - **No Content Modification:** **Do not merge, omit, or rephrase any content.** Every piece of information should be included **exactly as it appears**, including lists, headings, titles and subtitles, with their numbering, bullet points and line breaks.
+
+    - **Values, Not Property Names:** **All extracted information should be treated as values within the JSON structure, not as property names derived from the resume content.** Use only the specified property names.
+
+    - **Exclude Empty Fields:** **Only include fields in the JSON output that have corresponding data in the resume.** If a field has no data, do not include it in the JSON output.
+
+    **Provide the extracted data in the following JSON structure:**
+    ```json
+    {""" + structure + """
+    }
+    ```
+
+    The sections of the candidate's CV are given in the next message.
+    """
+
     return prompt
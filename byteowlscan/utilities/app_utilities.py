@@ -1,4 +1,3 @@
-import datetime
 import json
 import logging
 import os
@@ -9,66 +8,104 @@ from pathlib import Path
 import byteowlscan.utilities.semantic_splitter as SemanticSplitter
 from colorama import Fore
 from byteowlscan.models import extract_model
+from byteowlscan.utilities import document_input, metrics, output_sink, result_cache, resume_sections, token_counter
 from byteowlscan.utilities.app_config import AppConfig
+from byteowlscan.utilities.json_merge import JsonMerger
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
 
 # Save JSON to file
+@metrics.timed("stage_seconds", stage="save")
 def save_to_json(final_data, file_path, args):
     """
-    Saves the combined structured data as a JSON file.
+    Saves the combined structured data as a JSON file, atomically.
+
+    The file is written to ``--outputDir`` when given, otherwise to ``APP_RESULT_FILEPATH``.
 
     Args:
         final_data (dict): Extracted data to save.
         file_path (str): Original file path of the resume.
         args: Command line arguments.
     """
-    # Get current timestamp for unique file naming
-    time_stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-
-    # Get file name and clean it
-    file_name = clean_filename(get_file_name(file_path))
-
-    # Generate JSON file path
-    json_file_path = f"{AppConfig.get('APP_RESULT_FILEPATH')}/{file_name}_{time_stamp}.json"
-    if args.outputDir:
-        json_file_path = args.outputDir
-
-    # Save data as a JSON file
-    with open(json_file_path, 'w', encoding='utf-8') as json_file:
-        json.dump(final_data, json_file, ensure_ascii=False, indent=4)
+    directory = args.outputDir or AppConfig.get('APP_RESULT_FILEPATH')
+    json_file_path = output_sink.FileSink(directory).write(file_path, final_data)
 
     logger.info(f"Processed resume saved as JSON: {json_file_path}")
     print(f"{Fore.RED}Output: {json_file_path}")
 
 # Function to parse the resume and return extracted text
+@metrics.timed("stage_seconds", stage="parse")
 def parse_resume(file_path):
     """
     Parses the resume file and extracts text.
 
+    The resume may be a path or be held in memory (bytes, memoryview, file object or
+    ``document_input.MemoryDocument``), in which case it is parsed without being
+    written to disk. Its format is detected from its content, so extensionless or
+    mislabeled files are parsed too.
+
     Args:
-        file_path (str): Path to the resume file.
+        file_path (str | bytes | memoryview | file): Path to the resume file, or its content.
 
     Returns:
-        str: Extracted text from the resume.
+        ParsedText: Extracted text from the resume, with the SHA-256 of the resume in ``sha256``
+        and its format in ``file_format``.
 
     Raises:
         ValueError: If the file type is unsupported.
-    """
-    logger.info('PARSING RESUME... - File: %s', file_path)
-
-    # Determine file type and call the appropriate extraction method
-    if file_path.endswith('.pdf'):
-        return extract_model.extract_text_from_pdf(file_path)
-    elif file_path.endswith('.docx'):
-        return extract_model.extract_text_from_word(file_path)
-    elif file_path.endswith(('.png', '.jpg', '.jpeg')):
-        return extract_model.extract_text_from_image(file_path)
+        Exception: The error of the extractor when the text could not be extracted.
+    """
+    logger.info('PARSING RESUME... - File: %s', document_input.source_name(file_path))
+    source = document_input.to_source(file_path)
+
+    # Determine file type and the appropriate extraction method
+    file_format = document_input.detect_format(file_path if isinstance(file_path, str) else source)
+    if file_format == 'pdf':
+        extract_fn = extract_model.extract_text_from_pdf
+    elif file_format == 'docx':
+        extract_fn = extract_model.extract_text_from_word
+    elif file_format == 'image':
+        extract_fn = extract_model.extract_text_from_image
     else:
         logger.error("Unsupported file type!")
         raise ValueError("Unsupported file type")
 
+    # Hashed once: the hash keys the cache and is passed along to the output record and the manifest
+    sha256 = document_input.content_hash(source)
+
+    # Reuse the text of an unchanged file extracted with the same settings from the cache
+    cache = result_cache.get_result_cache()
+    cache_key = text_cache_key(sha256) if cache is not None else None
+    text = cache.get("text", cache_key) if cache is not None else None
+    if text is not None:
+        logger.info("Extracted text loaded from cache.")
+        return document_input.ParsedText(text, sha256, file_format)
+
+    # A failed extraction raises, so the file is neither sent to GPT nor cached
+    text = extract_fn(source)
+    if cache is not None:
+        cache.set("text", cache_key, text)
+    return document_input.ParsedText(text, sha256, file_format)
+
+# Function to build the cache key of an extracted text
+def text_cache_key(sha256):
+    """
+    Builds the cache key of the text extracted from a document.
+
+    The key covers the content hash of the document, the extractor version and the
+    settings that change the extracted text (PDF engines, OCR thresholds, language,
+    DPI and preprocessing, see ``extract_model.extraction_config``), so changing any
+    of them extracts the text again.
+
+    Args:
+        sha256 (str): Content hash of the document.
+
+    Returns:
+        str: The cache key.
+    """
+    return result_cache.make_key(sha256, json.dumps(extract_model.extraction_config(), sort_keys=True))
+
 # Function to check if a dictionary has all values as None or empty
 def is_empty_or_null(obj):
     """
@@ -91,6 +128,9 @@ def merge_json_data(final_data, chunk_data):
     """
     Merges JSON data from chunks, filtering out null/empty values.
 
+    Stateless wrapper around ``JsonMerger``; to merge many chunks, keep one
+    ``JsonMerger`` and ``add`` each chunk so list items are hashed only once.
+
     Args:
         final_data (dict): Existing combined data.
         chunk_data (dict): New chunk data to merge.
@@ -98,47 +138,56 @@ def merge_json_data(final_data, chunk_data):
     Returns:
         dict: Merged data.
     """
-    if not isinstance(chunk_data, dict):
-        logger.warning(f"Warning: Skipping invalid chunk data: {chunk_data}")
-        return final_data
-
-    for key, value in chunk_data.items():
-        if is_empty_or_null(value):
-            continue
-
-        if key in final_data:
-            # Handle merging lists
-            if isinstance(final_data[key], list) and isinstance(value, list):
-                final_data[key].extend([v for v in value if not is_empty_or_null(v)])
-            # Handle merging dictionaries
-            elif isinstance(final_data[key], dict) and isinstance(value, dict):
-                final_data[key] = merge_json_data(final_data[key], value)
-            # Handle merging simple values
-            else:
-                if final_data[key] != value:
-                    final_data[key] = [final_data[key], value] if not isinstance(final_data[key], list) else final_data[key] + [value]
-        else:
-            final_data[key] = value
-
-    return final_data
+    return JsonMerger(final_data).add(chunk_data).result
 
 # Function to process text into chunks to avoid exceeding token limits
-def process_text_in_chunks(file_path, content, chunk_size=16384):
+@metrics.timed("stage_seconds", stage="chunk")
+def process_text_in_chunks(file_path, content, chunk_size=16384, file_format=None):
     """
     Processes text content into chunks to avoid exceeding token limits.
 
     Args:
-        file_path (str): Path to the file being processed.
+        file_path (str): Path to the file being processed, or the ``MemoryDocument`` parsed.
         content (str): Text content to split.
         chunk_size (int): Maximum size of each chunk.
+        file_format (str, optional): Format of the file (``ParsedText.file_format``),
+            detected from the file again when not given.
 
     Returns:
         list: List of text chunks.
     """
-    if file_path.endswith(('.pdf', '.docx', '.png', '.jpg', '.jpeg')):
-        return SemanticSplitter.splitChunkMarkdown(content, chunk_size) if file_path.endswith(('.docx', '.png', '.jpg', '.jpeg')) else SemanticSplitter.splitChunkText(content, chunk_size)
+    file_format = file_format or getattr(content, "file_format", None) or document_input.detect_format(file_path)
+    if file_format in ('pdf', 'docx', 'image'):
+        return SemanticSplitter.split_markdown_into_chunks(content, chunk_size) if file_format in ('docx', 'image') else SemanticSplitter.split_text_into_chunks(content, chunk_size)
     return []
 
+# Process text into section chunks
+def process_text_in_sections(file_path, content, chunk_size=16384, file_format=None):
+    """
+    Splits text content on its resume section headings (see ``resume_sections.split_sections``).
+
+    Sections under ``SECTION_MIN_TOKENS`` are grouped together, and sections over
+    ``chunk_size`` tokens are split further like in ``process_text_in_chunks``.
+
+    Args:
+        file_path (str): Path to the file being processed.
+        content (str): Text content to split.
+        chunk_size (int): Maximum size of each chunk.
+        file_format (str, optional): Format of the file, see ``process_text_in_chunks``.
+
+    Returns:
+        list: ``(sections, chunk)`` pairs, ``sections`` being the schema keys of the
+        sections in the chunk. Empty if no section heading was found.
+    """
+    file_format = file_format or getattr(content, "file_format", None)
+    parts = []
+    for sections, text in resume_sections.split_sections(content, AppConfig.get("SECTION_MIN_TOKENS", 0)):
+        if token_counter.count_tokens(text) <= chunk_size:
+            parts.append((sections, text))
+        else:
+            parts.extend((sections, chunk) for chunk in process_text_in_chunks(file_path, text, chunk_size, file_format) or [text])
+    return parts
+
 # Get all file paths in directory
 def get_all_file_paths(directory):
     """
@@ -1,7 +1,7 @@
 import argparse
 
 
-def initArgs():
+def initArgs(argv=None):
     # Create an ArgumentParser object
     parser = argparse.ArgumentParser(description="Process command-line arguments.")
 
@@ -9,11 +9,23 @@ def initArgs():
     parser.add_argument('--filePath', type=str, help='Path to file want to scan', required=False, )
     parser.add_argument('--directoryPath', type=str, help='Directory Path contains files want to scan', required=False)
     parser.add_argument('--outputDir', type=str, help='Output directory path', required=False)
+    parser.add_argument('--outputMode', type=str, help='Output format: one JSON file per resume, a JSON-lines file or size-rolled JSON-lines shards', choices=['file', 'jsonl', 'sharded'], required=False)
     parser.add_argument('--apiKey', type=str, help='Your OPENAI Api Key', required=False)
     parser.add_argument('--model', type=str, help='Your OPENAI model', default="gpt-4o-mini", required=False)
     parser.add_argument('--maxTokens', type=int, help='Max Tokens request and response of GPT', required=False)
     parser.add_argument('--preprocessWithGPT', type=bool, help='Enable preprocess with GPT', required=False, default=False)
     parser.add_argument('--enableChunk', type=bool, help='Enable process chunk text', required=False, default=False)
+    parser.add_argument('--chunkBySection', type=bool, help='Split resumes on their section headings and extract each section with its own prompt', required=False, default=False)
+    parser.add_argument('--chunkConcurrency', type=int, help='Number of concurrent chunk requests per resume', required=False)
+    parser.add_argument('--enablePipeline', type=bool, help='Enable concurrent staged pipeline for directory batches', required=False, default=False)
+    parser.add_argument('--batchMode', type=bool, help='Send the GPT requests of the whole batch through the OpenAI Batch API (offline, cheaper, no rate limits)', required=False, default=False)
+    parser.add_argument('--parseWorkers', type=int, help='Number of parse/OCR processes in pipeline mode (default: CPU cores)', required=False)
+    parser.add_argument('--gptConcurrency', type=int, help='Number of concurrent GPT requests in pipeline mode', required=False)
+    parser.add_argument('--queueSize', type=int, help='Capacity of the queues between pipeline stages', required=False)
+    parser.add_argument('--enableCache', type=bool, help='Enable the on-disk result cache', required=False, default=False)
+    parser.add_argument('--resume', type=bool, help='Skip the files already processed according to the run manifest and retry the failed ones', required=False, default=False)
+    parser.add_argument('--metricsFile', type=str, help='Enable metrics and export them to this file at the end of the run', required=False)
+    parser.add_argument('--metricsFormat', type=str, help='Metrics export format', choices=['json', 'prometheus'], required=False)
     parser.add_argument('--config', type=str, help='File path to config', required=False, default="../../config.yaml")
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
@@ -0,0 +1,269 @@
+import hashlib
+import io
+import os
+import zipfile
+
+from byteowlscan.utilities import result_cache
+
+# Magic bytes of the supported image formats
+_IMAGE_SIGNATURES = (
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"\xff\xd8\xff",  # JPEG
+    b"II*\x00", b"MM\x00*",  # TIFF
+    b"BM",  # BMP
+)
+
+# Extensions used when the content is not recognized, e.g. an empty or damaged file
+_EXTENSION_FORMATS = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".tif": "image", ".tiff": "image", ".bmp": "image",
+    ".webp": "image",
+}
+
+# Bytes read to detect the format; PDF headers may follow some junk
+_HEADER_BYTES = 1024
+
+class MemoryDocument(str):
+    """
+    A document held in memory, e.g. an upload, that is passed around like a path.
+
+    Its string value is its name, used in the logs, the results and the output file
+    name, so it can go through the pipeline in place of a path; the parsers read its
+    ``data`` instead of a file. It pickles with its data, to reach the parse workers.
+
+        document = MemoryDocument("cv.pdf", body)
+        text = app_utilities.parse_resume(document)
+    """
+
+    def __new__(cls, name, data):
+        document = super().__new__(cls, name)
+        document.data = data
+        return document
+
+    def __reduce__(self):
+        return MemoryDocument, (str(self), bytes(self.data))
+
+class ParsedText(str):
+    """
+    Text parsed from a document, carrying the SHA-256 of the document's content and
+    its detected format.
+
+    ``parse_resume`` hashes the document once and returns its text as a
+    ``ParsedText``, so the output record and the run manifest reuse ``sha256``, and
+    the chunking ``file_format``, instead of reading the document again. It pickles
+    with them, to come back from the parse workers.
+    """
+
+    def __new__(cls, text, sha256=None, file_format=None):
+        parsed = super().__new__(cls, text)
+        parsed.sha256 = sha256
+        parsed.file_format = file_format
+        return parsed
+
+    def __reduce__(self):
+        return ParsedText, (str(self), self.sha256, self.file_format)
+
+class MemoryReader(io.RawIOBase):
+    """
+    Read-only, seekable file over a buffer, without copying it.
+
+    ``io.BytesIO`` copies a ``memoryview`` or ``bytearray`` it is given; this reads
+    straight from the buffer.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        data = self._view[self._position:self._position + len(target)]
+        target[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            # Let the owner of the buffer resize it again
+            self._view.release()
+        super().close()
+
+# Function to turn what a caller passed into a path or a buffer
+def to_source(document):
+    """
+    Normalizes a document given as a path, a buffer or a file object.
+
+    Args:
+        document (str | os.PathLike | bytes | bytearray | memoryview | MemoryDocument | file):
+            The document. A file object is read from its current position, without a
+            copy when it exposes its buffer (``io.BytesIO.getbuffer``).
+
+    Returns:
+        str | bytes | memoryview: The path of the file, or the content of the document.
+
+    Raises:
+        TypeError: If the document is none of these.
+    """
+    if isinstance(document, MemoryDocument):
+        return to_source(document.data)
+    if isinstance(document, (str, os.PathLike)):
+        return os.fspath(document)
+    if isinstance(document, (bytes, memoryview)):
+        return document
+    if isinstance(document, bytearray):
+        return memoryview(document)
+    if hasattr(document, "getbuffer"):
+        return document.getbuffer()[document.tell():]
+    if hasattr(document, "read"):
+        return document.read()
+    raise TypeError(f"Unsupported document: {type(document).__name__}")
+
+# Function to name a document in the logs
+def source_name(document):
+    """
+    Returns:
+        str: The path or name of the document, or its size if it has neither.
+    """
+    if isinstance(document, (str, os.PathLike)):
+        return os.fspath(document)
+    name = getattr(document, "name", None)
+    if isinstance(name, str):
+        return name
+    if hasattr(document, "read"):
+        return "<file object>"
+    return f"<{memoryview(document).nbytes} bytes in memory>"
+
+# Function to open a document as a binary file
+def open_stream(source):
+    """
+    Opens a path or a buffer as a binary file, a buffer being read without a copy.
+
+    Args:
+        source (str | bytes | memoryview): A path or a buffer, see ``to_source``.
+
+    Returns:
+        io.BufferedIOBase: The open file, to be closed by the caller.
+    """
+    if isinstance(source, str):
+        return open(source, "rb")
+    return io.BufferedReader(MemoryReader(source))
+
+# Function to open a PDF with PyMuPDF
+def open_pdf(source):
+    """
+    Opens a PDF with PyMuPDF, a buffer being read in place.
+
+    Args:
+        source (str | bytes | memoryview): A path or a buffer, see ``to_source``.
+
+    Returns:
+        pymupdf.Document: The open document, to be closed by the caller.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        # PyMuPDF < 1.24 only provides the fitz name
+        import fitz as pymupdf
+    if isinstance(source, str):
+        return pymupdf.open(source)
+    return pymupdf.open(stream=source, filetype="pdf")
+
+# Function to detect the format of a document from its content
+def detect_format(document):
+    """
+    Detects the format of a document from its magic bytes.
+
+    A ZIP file is a DOCX only when it holds ``word/document.xml``. A PDF header may
+    follow some junk, so it is looked for anywhere in the first KB, but only once
+    the image and ZIP signatures did not match. When the content
+    is not recognized (or a path does not exist), the extension of the path or name
+    decides, like before content detection.
+
+    Args:
+        document: The document, see ``to_source``.
+
+    Returns:
+        str | None: ``pdf``, ``docx``, ``image``, or None if the format is not supported.
+    """
+    source = to_source(document)
+    if not isinstance(source, str) or os.path.isfile(source):
+        with open_stream(source) as stream:
+            header = stream.read(_HEADER_BYTES)
+            # Signatures anchored at the start first: "%PDF-" may also appear in the
+            # first bytes of an image or a DOCX, e.g. in their metadata or a part name
+            if header.startswith(_IMAGE_SIGNATURES) or (header[:4] == b"RIFF" and header[8:12] == b"WEBP"):
+                return "image"
+            if header.startswith(b"PK\x03\x04"):
+                try:
+                    stream.seek(0)
+                    with zipfile.ZipFile(stream) as archive:
+                        if "word/document.xml" in archive.namelist():
+                            return "docx"
+                except zipfile.BadZipFile:
+                    pass
+                return None
+            if b"%PDF-" in header:
+                return "pdf"
+    name = document if isinstance(document, (str, os.PathLike)) else getattr(document, "name", None)
+    if not isinstance(name, (str, os.PathLike)):
+        return None
+    return _EXTENSION_FORMATS.get(os.path.splitext(os.fspath(name))[1].lower())
+
+# Function to hash the content of a document
+def content_hash(source):
+    """
+    Computes the SHA-256 of the content of a path or a buffer.
+
+    Args:
+        source (str | bytes | memoryview): A path or a buffer, see ``to_source``.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    if isinstance(source, str):
+        return result_cache.file_hash(source)
+    return hashlib.sha256(source).hexdigest()
+
+# Function to hash a document given in any form
+def document_hash(document):
+    """
+    Computes the SHA-256 of the content of a document, in memory or not.
+
+    Args:
+        document: The document, see ``to_source``.
+
+    Returns:
+        str | None: Hex digest of the content, or None if the file cannot be read.
+    """
+    try:
+        return content_hash(to_source(document))
+    except OSError:
+        return None
+
+# Function to make a source sendable to a worker process
+def picklable(source):
+    """
+    Returns a source that can be sent to a process pool: memoryviews cannot be
+    pickled, so they are copied to bytes once. Paths and bytes are returned as is.
+    """
+    return bytes(source) if isinstance(source, memoryview) else source
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+
+from byteowlscan.utilities import metrics
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+FIRST_WINS = "first-wins"
+UNION = "union"
+CONCAT = "concat"
+MERGE_POLICIES = (FIRST_WINS, UNION, CONCAT)
+
+# Marker of a pruned (null or empty) value
+_EMPTY = object()
+
+class JsonMerger:
+    """
+    Incremental merge engine for the JSON extracted from resume chunks.
+
+    Each chunk is pruned of null/empty values and merged in a single pass, so every
+    node is visited once. Dictionaries are merged key by key. How lists and
+    conflicting scalars are combined depends on the policy of their key:
+
+    - ``union`` (default): append list items not seen before, compared by a stable
+      structural hash, and collect distinct scalar values in a list.
+    - ``concat``: append all list items and collect differing scalar values in a list.
+    - ``first-wins``: keep the first non-empty value.
+
+    Policies are read from ``MERGE_POLICIES`` in the config, keyed by dotted path
+    (``candidateInformation.fullName``) or by key name (``workExperience``), and
+    ``MERGE_DEFAULT_POLICY`` applies to the other keys.
+    """
+
+    def __init__(self, data=None, policies=None, default_policy=None):
+        """
+        Args:
+            data (dict): Existing data to merge into, updated in place.
+            policies (dict): Merge policy per dotted path or key name.
+            default_policy (str): Merge policy of the keys without one.
+        """
+        self.result = data if data is not None else {}
+        self.policies = policies if policies is not None else (AppConfig.get("MERGE_POLICIES") or {})
+        self.default_policy = default_policy or AppConfig.get("MERGE_DEFAULT_POLICY", UNION)
+        for policy in list(self.policies.values()) + [self.default_policy]:
+            if policy not in MERGE_POLICIES:
+                raise ValueError(f"Unknown merge policy: {policy}")
+        # Structural hashes of the items of each merged list, keyed by the list identity
+        self._seen = {}
+
+    @metrics.timed("stage_seconds", stage="merge")
+    def add(self, chunk_data):
+        """
+        Merges the data of one chunk.
+
+        Args:
+            chunk_data (dict): The data extracted from a chunk.
+
+        Returns:
+            JsonMerger: The merger itself, for chaining.
+        """
+        if not isinstance(chunk_data, dict):
+            logger.warning(f"Warning: Skipping invalid chunk data: {chunk_data}")
+            return self
+        chunk_data = prune(chunk_data)
+        if chunk_data is not _EMPTY:
+            self._merge_dict(self.result, chunk_data, "")
+        return self
+
+    def _policy(self, path, key):
+        return self.policies.get(path) or self.policies.get(key) or self.default_policy
+
+    def _merge_dict(self, target, source, prefix):
+        # The source is already pruned, so it has no empty values left
+        for key, value in source.items():
+            path = f"{prefix}{key}"
+            policy = self._policy(path, key)
+
+            if key not in target:
+                if isinstance(value, dict):
+                    target[key] = {}
+                    self._merge_dict(target[key], value, path + ".")
+                elif isinstance(value, list):
+                    target[key] = []
+                    self._merge_list(target[key], value, policy)
+                else:
+                    target[key] = value
+                continue
+
+            existing = target[key]
+            if policy == FIRST_WINS:
+                if isinstance(existing, dict) and isinstance(value, dict):
+                    self._merge_dict(existing, value, path + ".")
+                continue
+            if isinstance(existing, dict) and isinstance(value, dict):
+                self._merge_dict(existing, value, path + ".")
+            elif isinstance(existing, list):
+                self._merge_list(existing, value if isinstance(value, list) else [value], policy)
+            elif existing != value:
+                # Conflicting values are collected in a list, which then grows in place
+                target[key] = [existing]
+                self._merge_list(target[key], value if isinstance(value, list) else [value], policy)
+
+    def _merge_list(self, target, items, policy):
+        if policy == CONCAT:
+            target.extend(items)
+            return
+        seen = self._seen.get(id(target))
+        if seen is None:
+            seen = self._seen[id(target)] = {structural_hash(item) for item in target}
+        for item in items:
+            digest = structural_hash(item)
+            if digest not in seen:
+                seen.add(digest)
+                target.append(item)
+
+# Function to remove null/empty values in a single pass
+def prune(value):
+    """
+    Removes null and empty values from a JSON value, visiting each node once.
+
+    Args:
+        value: A JSON value (dict, list or scalar).
+
+    Returns:
+        The pruned value, or ``_EMPTY`` if nothing is left.
+    """
+    if isinstance(value, dict):
+        pruned = {}
+        for key, child in value.items():
+            # Scalars are checked inline, only containers recurse
+            if isinstance(child, (dict, list)):
+                child = prune(child)
+                if child is _EMPTY:
+                    continue
+            elif child is None or child == "":
+                continue
+            pruned[key] = child
+        return pruned if pruned else _EMPTY
+    if isinstance(value, list):
+        pruned = []
+        for child in value:
+            if isinstance(child, (dict, list)):
+                child = prune(child)
+                if child is _EMPTY:
+                    continue
+            elif child is None or child == "":
+                continue
+            pruned.append(child)
+        return pruned if pruned else _EMPTY
+    if value is None or value == "":
+        return _EMPTY
+    return value
+
+# Function to compute a stable structural hash of a JSON value
+def structural_hash(value):
+    """
+    Computes a hash of a JSON value that is independent of dictionary key order.
+
+    Args:
+        value: A JSON value.
+
+    Returns:
+        bytes: The hash digest.
+    """
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
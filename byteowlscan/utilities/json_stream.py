@@ -0,0 +1,184 @@
+import json
+import re
+
+# Escape sequence cut at the end of a partial string, e.g. "\" or "\u00e"
+_PARTIAL_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+class IncrementalJsonParser:
+    """
+    Parses a JSON object as its text arrives, e.g. from a streamed completion.
+
+    Text before the first ``{`` (a Markdown fence, a sentence) and after the
+    object closes is ignored. Each ``feed`` only scans the new text, and returns
+    the top-level fields completed by it, so callers see the first fields long
+    before the answer ends. ``result`` repairs a cut answer: it drops the last
+    incomplete key or value and closes the open strings, arrays and objects.
+
+        parser = IncrementalJsonParser()
+        for delta in deltas:
+            for key, value in parser.feed(delta):
+                ...
+        data = parser.result()
+    """
+
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._chars = []
+        # Open containers, innermost last: [bracket, state]. Objects expect a "key",
+        # a "colon", a "value" or are "after" a value, arrays expect a "value" or are "after" one.
+        self._stack = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._literal = False
+        # Where the text can be cut and closed into valid JSON, and the closing brackets needed there
+        self._safe_end = 0
+        self._safe_closers = ""
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    @property
+    def text(self):
+        """The JSON text received so far, from the first ``{``."""
+        return "".join(self._chars)
+
+    def feed(self, text):
+        """
+        Adds text to the parser.
+
+        Args:
+            text (str): The next piece of the answer.
+
+        Returns:
+            list: ``(key, value)`` of each top-level field completed by this text.
+        """
+        fields = []
+        for ch in text:
+            if self.done:
+                break
+            if not self._started:
+                if ch != "{":
+                    continue
+                self._started = True
+            self._chars.append(ch)
+            end = len(self._chars)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._stack[-1][1] = "colon"
+                        if len(self._stack) == 1:
+                            key = "".join(self._chars[self._key_start:end])
+                            try:
+                                self._key = json.loads(key)
+                            except ValueError:
+                                # An invalid escape: keep the raw text, result() will not parse it either
+                                self._key = key[1:-1]
+                    else:
+                        self._value_done(end, fields)
+                continue
+
+            if self._literal:
+                if ch not in ",}] \t\r\n":
+                    continue
+                # The character after a number, true, false or null ends it
+                self._literal = False
+                self._value_done(end - 1, fields)
+
+            if ch in " \t\r\n":
+                continue
+            if ch in "{[":
+                self._begin_value(end - 1)
+                self._stack.append([ch, "key" if ch == "{" else "value"])
+                self._mark_safe(end)
+            elif ch in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    self._mark_safe(end)
+                    break
+                self._value_done(end, fields)
+            elif ch == '"':
+                self._in_string = True
+                self._string_is_key = self._stack[-1][0] == "{" and self._stack[-1][1] == "key"
+                if self._string_is_key:
+                    self._key_start = end - 1
+                else:
+                    self._begin_value(end - 1)
+            elif ch == ":":
+                self._stack[-1][1] = "value"
+            elif ch == ",":
+                self._stack[-1][1] = "key" if self._stack[-1][0] == "{" else "value"
+            else:
+                self._begin_value(end - 1)
+                self._literal = True
+        return fields
+
+    def result(self):
+        """
+        Returns the object received so far, repaired if the text was cut.
+
+        Returns:
+            dict | None: The object, or None if no object started.
+        """
+        if not self._started:
+            return None
+        text = self.text
+        candidates = []
+        if not self.done:
+            closers = "".join(_CLOSERS[bracket] for bracket, _ in reversed(self._stack))
+            if self._in_string and not self._string_is_key:
+                # Keep the beginning of a cut string value
+                candidates.append(_PARTIAL_ESCAPE.sub("", text) + '"' + closers)
+            elif self._literal:
+                # A number may be complete, "tru" is not
+                candidates.append(text + closers)
+        candidates.append(text[:self._safe_end] + self._safe_closers)
+        for candidate in candidates:
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                continue
+        return None
+
+    def _begin_value(self, start):
+        if len(self._stack) == 1:
+            self._value_start = start
+
+    def _value_done(self, end, fields):
+        self._stack[-1][1] = "after"
+        self._mark_safe(end)
+        if len(self._stack) == 1 and self._value_start is not None:
+            try:
+                fields.append((self._key, json.loads("".join(self._chars[self._value_start:end]))))
+            except ValueError:
+                pass
+            self._value_start = None
+
+    def _mark_safe(self, end):
+        self._safe_end = end
+        self._safe_closers = "".join(_CLOSERS[bracket] for bracket, _ in reversed(self._stack))
+
+# Function to parse a JSON object, repairing it if it was cut
+def repair_json(text):
+    """
+    Parses the first JSON object of a text, repairing it if the text was cut.
+
+    Args:
+        text (str): Text containing a JSON object, possibly truncated.
+
+    Returns:
+        tuple: The object (None if the text has none) and whether it was complete.
+    """
+    parser = IncrementalJsonParser()
+    parser.feed(text)
+    return parser.result(), parser.done
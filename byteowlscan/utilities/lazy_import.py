@@ -0,0 +1,82 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+class _LazyModule(types.ModuleType):
+    """
+    A module executed on its first attribute access.
+
+    Unlike ``importlib.util.LazyLoader`` before Python 3.12.3 (gh-114763), the load
+    is thread-safe: threads touching the module at once wait on a lock until it is
+    fully executed, instead of seeing it half loaded. Attributes set before the load
+    (e.g. ``openai.api_key``) are kept.
+    """
+
+    def __getattribute__(self, attr):
+        # type() and ModuleType.__getattribute__ do not come back here
+        if type(self) is _LazyModule:
+            state = types.ModuleType.__getattribute__(self, "__spec__").loader_state
+            with state["lock"]:
+                # The thread executing the module may access it meanwhile, like a circular import
+                if type(self) is _LazyModule and not state["loading"]:
+                    state["loading"] = True
+                    try:
+                        _execute(self, state)
+                    finally:
+                        state["loading"] = False
+        return types.ModuleType.__getattribute__(self, attr)
+
+    def __delattr__(self, attr):
+        # Loads the module first, so that the deletion is not undone by the load
+        self.__getattribute__(attr)
+        types.ModuleType.__delattr__(self, attr)
+
+def _execute(module, state):
+    attributes = types.ModuleType.__getattribute__(module, "__dict__")
+    # Attributes set on the module before it was loaded, reapplied after it like with an eager import
+    updated = {key: value for key, value in attributes.items()
+               if key not in state["__dict__"] or state["__dict__"][key] is not value}
+    spec = attributes["__spec__"]
+    spec.loader.exec_module(module)
+    attributes.update(updated)
+    module.__class__ = types.ModuleType
+
+# Function to import a module on first use
+def lazy_module(name):
+    """
+    Returns a module that is only executed when one of its attributes is first accessed.
+
+    Keeps ``import byteowlscan`` and ``--help`` fast: heavy backends (OpenAI, PyMuPDF,
+    Pillow, Tesseract, the tokenizers...) are loaded when a file of their format is
+    first processed. Use it at module level in place of ``import name``::
+
+        openai = lazy_module("openai")
+
+    The first access may come from several threads at once (the pipeline extract
+    threads, the chunk pool): it loads the module under a lock.
+
+    Args:
+        name (str): Absolute module name, e.g. ``openai`` or ``PIL.Image``.
+
+    Returns:
+        module: The module (the real one when it is already imported).
+
+    Raises:
+        ImportError: If the module is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader_state = {"__dict__": dict(module.__dict__), "lock": threading.RLock(), "loading": False}
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        # Like a regular import, so that ``parent.child`` works too
+        setattr(importlib.import_module(parent), child, module)
+    return module
@@ -0,0 +1,265 @@
+import logging
+import re
+
+from byteowlscan.utilities import metrics, token_counter
+from byteowlscan.utilities.app_config import AppConfig
+from byteowlscan.utilities.resume_sections import find_sections, fold
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Labels of the candidateInformation fields, casefolded and without diacritics
+FIELD_LABELS = {
+    "fullName": ("ho va ten", "ho ten", "ten", "ten ung vien", "full name", "name", "candidate name"),
+    "gender": ("gioi tinh", "gender", "sex"),
+    "dateOfBirth": ("ngay sinh", "ngay thang nam sinh", "sinh ngay", "date of birth", "birth date", "birthday", "dob"),
+    "IDNo": ("cmnd", "cccd", "so cmnd", "so cccd", "cmnd/cccd", "so cmnd/cccd", "can cuoc cong dan",
+             "so can cuoc cong dan", "id", "id no", "id number"),
+    "phone": ("dien thoai", "so dien thoai", "dt", "sdt", "di dong", "phone", "phone number", "mobile", "tel",
+              "telephone"),
+    "email": ("email", "e-mail", "mail", "gmail"),
+    "address": ("dia chi", "dia chi lien he", "dia chi thuong tru", "dia chi hien tai", "cho o hien tai", "noi o",
+                "noi o hien tai", "address", "current address"),
+    "hometown": ("que quan", "nguyen quan", "hometown"),
+}
+_LABEL_FIELDS = {label: field for field, labels in FIELD_LABELS.items() for label in labels}
+
+# Fields that may hold several values, joined with ", "
+MULTI_VALUE_FIELDS = ("phone", "email")
+
+# Common Vietnamese family names, casefolded and without diacritics, to recognize unlabeled names
+VIETNAMESE_SURNAMES = frozenset((
+    "nguyen", "tran", "le", "pham", "hoang", "huynh", "phan", "vu", "vo", "dang", "bui", "do", "ho", "ngo", "duong",
+    "ly", "dinh", "lam", "mai", "trinh", "truong", "ha", "cao", "luong", "luu", "ta", "kieu", "quach", "doan", "to",
+    "thai", "chau", "lai", "tang", "mac", "la", "van", "tong", "khuc", "giang", "thach", "diep", "trieu", "ong",
+))
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_PHONE = re.compile(r"(\+?\d{1,3}[\s.-]?)?(\(\d{1,4}\)[\s.-]?)?\d{2,4}([\s.-]?\d{2,4}){2,4}")
+_DATE = re.compile(r"\d{1,2}\s*[/.-]\s*\d{1,2}\s*[/.-]\s*(\d{4}|\d{2})|\d{4}-\d{2}-\d{2}"
+                   r"|ngay\s*\d{1,2}\s*thang\s*\d{1,2}\s*nam\s*\d{4}")
+_ID_NUMBER = re.compile(r"\d[\d\s.]{7,14}\d")
+_GENDERS = ("nam", "nu", "male", "female")
+# What may separate several values of a field, or surround them
+_SEPARATORS = re.compile(r"[\s,;/|]*")
+# Segments of a line holding several fields, e.g. "Email: a@b.vn | SĐT: 0901 234 567"
+_SEGMENT_SEPARATOR = re.compile(r"\s*[|•·]\s*")
+_LABELED = re.compile(r"^(?P<label>[^:：]{1,40}?)\s*[:：]\s*(?P<value>.+)$")
+_BULLET = re.compile(r"^[-–•*+·]\s*")
+
+# Function to extract the contact fields of a resume locally
+def pre_extract(text, model=None):
+    """
+    Extracts the candidateInformation contact fields of a resume with rules, without GPT.
+
+    Only the lines before the first section heading (at most
+    ``LOCAL_EXTRACT_HEADER_LINES`` of them) and the personal-information sections are
+    searched, so that the phones and emails of references are left alone. Lines whose
+    every segment is a recognized field, labeled (``Email: a@b.vn``) or not (a bare
+    email or phone number, a Vietnamese full name near the top), are removed from the
+    text sent to GPT. A single-value field found twice (e.g. two addresses) is left
+    to GPT.
+
+    Args:
+        text (str): The resume text.
+        model (str): Model whose tokenizer counts the tokens, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        tuple: The extracted ``{"candidateInformation": {...}}`` (empty if nothing was
+        found), the residual text for GPT and the stats: ``fields``, ``lines_removed``,
+        ``tokens_before`` and ``tokens_after``.
+    """
+    lines = text.split("\n")
+    sections = find_sections(text)
+    header_end = min(sections[0][1] if sections else len(lines), AppConfig.get("LOCAL_EXTRACT_HEADER_LINES", 40))
+    searched = list(range(header_end))
+    for key, start, end in sections:
+        if key == "candidateInformation":
+            searched.extend(range(start + 1, end))
+
+    parsed = {}
+    counts = {}
+    name_window = 5
+    for i in searched:
+        if not lines[i].strip():
+            continue
+        fields = _parse_line(lines[i], allow_name=i < header_end and name_window > 0)
+        name_window -= 1
+        if fields is None:
+            continue
+        parsed[i] = fields
+        for field, _ in fields:
+            counts[field] = counts.get(field, 0) + 1
+
+    ambiguous = {field for field, count in counts.items() if count > 1 and field not in MULTI_VALUE_FIELDS}
+    information = {}
+    removed = set()
+    for i, fields in parsed.items():
+        if any(field in ambiguous for field, _ in fields):
+            continue
+        removed.add(i)
+        for field, value in fields:
+            if field in MULTI_VALUE_FIELDS and field in information:
+                if value not in information[field].split(", "):
+                    information[field] += ", " + value
+            else:
+                information[field] = value
+
+    # Headings of personal sections left empty go too
+    for key, start, end in sections:
+        if key == "candidateInformation" and all(i in removed or not lines[i].strip() for i in range(start + 1, end)):
+            removed.add(start)
+    residual = "\n".join(line for i, line in enumerate(lines) if i not in removed)
+
+    stats = {
+        "fields": sorted(information),
+        "lines_removed": len(removed),
+        "tokens_before": token_counter.count_tokens(text, model),
+        "tokens_after": token_counter.count_tokens(residual, model),
+    }
+    return ({"candidateInformation": information} if information else {}), residual, stats
+
+# Function to run the local extraction tier if it is enabled, recording what it found
+def pre_extract_resume(text, resume_path=None):
+    """
+    Runs ``pre_extract`` when ``LOCAL_EXTRACT`` is enabled and logs what it found.
+
+    Args:
+        text (str): The resume text.
+        resume_path (str): The path to the resume, for the log.
+
+    Returns:
+        tuple: The locally extracted data and the text left for GPT (``{}`` and the
+        text itself when the local tier is disabled).
+    """
+    if not AppConfig.get("LOCAL_EXTRACT", True) or not text:
+        return {}, text
+    with metrics.timer("stage_seconds", stage="local"):
+        data, residual, stats = pre_extract(text)
+    for field in stats["fields"]:
+        metrics.inc("local_fields_total", field=field)
+    metrics.inc("local_tokens_saved_total", stats["tokens_before"] - stats["tokens_after"])
+    logger.info("Local extraction of %s: %d fields (%s), %d lines removed, %d -> %d tokens.",
+                resume_path or "text", len(stats["fields"]), ", ".join(stats["fields"]) or "none",
+                stats["lines_removed"], stats["tokens_before"], stats["tokens_after"])
+    return data, residual
+
+# Function to merge the locally extracted fields into the GPT result
+def merge_local_fields(local_data, result):
+    """
+    Merges the locally extracted fields into the result extracted by GPT.
+
+    Local values win, as GPT did not see their lines; phones and emails found by
+    both are combined, phones compared by their digits (``+84 901 234 567`` and
+    ``0901234567`` are the same number).
+
+    Args:
+        local_data (dict): The data returned by ``pre_extract``.
+        result (dict | str): The GPT result, or its raw answer if it was not valid JSON.
+
+    Returns:
+        dict | str: The merged result (a raw answer is returned as is).
+    """
+    if not local_data or not isinstance(result, dict):
+        return result
+    information = result.get("candidateInformation")
+    information = dict(information) if isinstance(information, dict) else {}
+    for field, value in local_data["candidateInformation"].items():
+        existing = information.get(field)
+        if field in MULTI_VALUE_FIELDS and isinstance(existing, str) and existing.strip():
+            values = value.split(", ")
+            seen = {_value_key(field, v) for v in values}
+            for v in re.split(r"\s*[,;]\s*", existing):
+                if v and _value_key(field, v) not in seen:
+                    seen.add(_value_key(field, v))
+                    values.append(v)
+            value = ", ".join(values)
+        information[field] = value
+    merged = {"candidateInformation": information}
+    merged.update((key, value) for key, value in result.items() if key != "candidateInformation")
+    return merged
+
+def _value_key(field, value):
+    """
+    Returns what is compared when combining phones or emails: the digits of a phone, an email in lowercase.
+    """
+    if field != "phone":
+        return value.lower()
+    digits = re.sub(r"\D", "", value)
+    # National form of Vietnamese numbers written with the +84 country code
+    return "0" + digits[2:] if digits.startswith("84") and len(digits) >= 11 else digits
+
+def _parse_line(line, allow_name):
+    """
+    Parses a line made of contact fields only.
+
+    Returns:
+        list | None: ``(field, value)`` of each segment, or None if a segment is something else.
+    """
+    fields = []
+    for segment in _SEGMENT_SEPARATOR.split(_BULLET.sub("", line.strip())):
+        if not segment:
+            continue
+        labeled = _LABELED.match(segment)
+        if labeled:
+            field = _LABEL_FIELDS.get(fold(labeled.group("label")))
+            value = _field_value(field, labeled.group("value").strip().rstrip(".;,")) if field else None
+        else:
+            field, value = _unlabeled_value(segment, allow_name)
+        if value is None:
+            return None
+        fields.append((field, value))
+    return fields or None
+
+def _field_value(field, value):
+    """
+    Validates the value of a labeled field.
+
+    Returns:
+        str | None: The value, or None if it does not look like one of the field.
+    """
+    if not value:
+        return None
+    if field in ("email", "phone"):
+        return _all_matches(_EMAIL if field == "email" else _PHONE, value, field == "phone")
+    if field == "dateOfBirth":
+        return value if _DATE.fullmatch(fold(value)) else None
+    if field == "IDNo":
+        digits = re.sub(r"\D", "", value)
+        return value if _ID_NUMBER.fullmatch(value) and len(digits) in (9, 12) else None
+    if field == "gender":
+        return value if fold(value) in _GENDERS else None
+    if field == "fullName":
+        return value if _looks_like_name(value, min_words=2) else None
+    return value if len(value) <= 200 else None
+
+def _unlabeled_value(segment, allow_name):
+    for field, pattern in (("email", _EMAIL), ("phone", _PHONE)):
+        value = _all_matches(pattern, segment, field == "phone")
+        if value is not None:
+            return field, value
+    if allow_name and _looks_like_name(segment, min_words=3):
+        words = segment.split()
+        if fold(words[0]) in VIETNAMESE_SURNAMES:
+            return "fullName", segment
+    return None, None
+
+def _all_matches(pattern, text, phone):
+    """
+    Returns the matches of a pattern joined with ", " if nothing but separators lies between them.
+    """
+    values, end = [], 0
+    for match in pattern.finditer(text):
+        if not _SEPARATORS.fullmatch(text[end:match.start()]):
+            return None
+        if phone and not 9 <= len(re.sub(r"\D", "", match.group())) <= 13:
+            return None
+        values.append(match.group())
+        end = match.end()
+    if not values or not _SEPARATORS.fullmatch(text[end:]):
+        return None
+    return ", ".join(values)
+
+def _looks_like_name(text, min_words):
+    words = text.split()
+    return min_words <= len(words) <= 6 and all(word.isalpha() and word[0].isupper() for word in words)
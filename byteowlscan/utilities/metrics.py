@@ -0,0 +1,320 @@
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Prefix of the exported metric names
+NAMESPACE = "byteowlscan"
+
+# Upper bounds of the histogram buckets, in seconds unless the histogram sets its own
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Upper bounds of the buckets of the histograms of ratios between 0 and 1
+RATIO_BUCKETS = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+# Buckets of the histograms that do not use DEFAULT_BUCKETS, see set_buckets
+_buckets = {"prompt_cache_ratio": RATIO_BUCKETS}
+
+# Function to turn metrics collection on or off
+def enable(enabled=True):
+    """
+    Turns metrics collection on or off for this process.
+
+    When off, timers and counters return immediately, so instrumentation costs
+    a single flag check.
+
+    Args:
+        enabled (bool): Whether to collect metrics.
+    """
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_enabled():
+    """Returns True when metrics are being collected."""
+    return _enabled
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+# Function to set the buckets of a histogram
+def set_buckets(name, buckets):
+    """
+    Sets the bucket upper bounds of a histogram, e.g. ``RATIO_BUCKETS`` for a ratio.
+
+    Call it before the first observation: series already observed keep their buckets.
+
+    Args:
+        name (str): Histogram name.
+        buckets (tuple): Increasing upper bounds, the ``+Inf`` bucket is implied.
+    """
+    with _lock:
+        _buckets[name] = tuple(buckets)
+
+# Function to increment a counter
+def inc(name, value=1, **labels):
+    """
+    Increments a counter.
+
+    Args:
+        name (str): Counter name, e.g. ``prompt_tokens_total``.
+        value (float): Amount to add.
+        **labels: Labels of the series, e.g. ``call="extract"``.
+    """
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+# Function to record an observation in a histogram
+def observe(name, value, **labels):
+    """
+    Records an observation (usually a duration in seconds) in a histogram, in the
+    buckets set by ``set_buckets`` or ``DEFAULT_BUCKETS``.
+
+    Args:
+        name (str): Histogram name, e.g. ``stage_seconds``.
+        value (float): Observed value.
+        **labels: Labels of the series, e.g. ``stage="parse"``.
+    """
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            bounds = _buckets.get(name, DEFAULT_BUCKETS)
+            histogram = _histograms[key] = {"count": 0, "sum": 0.0, "min": value, "max": value,
+                                            "bounds": bounds, "buckets": [0] * (len(bounds) + 1)}
+        histogram["count"] += 1
+        histogram["sum"] += value
+        histogram["min"] = min(histogram["min"], value)
+        histogram["max"] = max(histogram["max"], value)
+        histogram["buckets"][bisect.bisect_left(histogram["bounds"], value)] += 1
+
+@contextlib.contextmanager
+def timer(name, **labels):
+    """
+    Times the enclosed block into a histogram.
+
+    Args:
+        name (str): Histogram name.
+        **labels: Labels of the series.
+    """
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+def timed(name, **labels):
+    """
+    Decorator timing every call of a function into a histogram.
+
+    Args:
+        name (str): Histogram name.
+        **labels: Labels of the series.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started, **labels)
+        return wrapper
+    return decorator
+
+# Function to record the token usage of an OpenAI response
+def record_usage(response, call):
+    """
+    Records the prompt and completion tokens reported by an OpenAI response.
+
+    The prompt tokens served from the provider's prompt cache are counted in
+    ``cached_prompt_tokens_total``, and their share of each request in the
+    ``prompt_cache_ratio`` histogram.
+
+    Args:
+        response: The chat completion response.
+        call (str): Kind of call, e.g. ``extract`` or ``preprocess``.
+    """
+    if not _enabled:
+        return
+    usage = response.get("usage") if hasattr(response, "get") else None
+    if not usage:
+        return
+    inc("requests_total", call=call)
+    inc("prompt_tokens_total", usage.get("prompt_tokens", 0), call=call)
+    inc("completion_tokens_total", usage.get("completion_tokens", 0), call=call)
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    inc("cached_prompt_tokens_total", cached, call=call)
+    if usage.get("prompt_tokens"):
+        observe("prompt_cache_ratio", cached / usage["prompt_tokens"], call=call)
+
+def snapshot():
+    """
+    Returns a picklable copy of the metrics of this process.
+
+    Returns:
+        dict: Counters and histograms keyed by ``(name, labels)``.
+    """
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {key: dict(value, buckets=list(value["buckets"])) for key, value in _histograms.items()},
+        }
+
+def merge(other):
+    """
+    Adds a snapshot from another process (e.g. a parse worker) to this process.
+
+    Args:
+        other (dict): A snapshot returned by ``snapshot``.
+    """
+    if not _enabled or not other:
+        return
+    with _lock:
+        for key, value in other["counters"].items():
+            _counters[key] = _counters.get(key, 0) + value
+        for key, value in other["histograms"].items():
+            histogram = _histograms.get(key)
+            if histogram is None:
+                _histograms[key] = dict(value, buckets=list(value["buckets"]))
+                continue
+            histogram["count"] += value["count"]
+            histogram["sum"] += value["sum"]
+            histogram["min"] = min(histogram["min"], value["min"])
+            histogram["max"] = max(histogram["max"], value["max"])
+            histogram["buckets"] = [a + b for a, b in zip(histogram["buckets"], value["buckets"])]
+
+def reset():
+    """Clears all the metrics of this process."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def quantile(name, q, **labels):
+    """
+    Estimates a quantile of a histogram from its buckets, like Prometheus ``histogram_quantile``.
+
+    Args:
+        name (str): Histogram name.
+        q (float): Quantile between 0 and 1.
+        **labels: Labels of the series.
+
+    Returns:
+        float | None: The estimated quantile, or None if nothing was observed.
+    """
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        if not histogram or not histogram["count"]:
+            return None
+        buckets = list(histogram["buckets"])
+        bounds = histogram["bounds"]
+        low, high = histogram["min"], histogram["max"]
+
+    rank = q * sum(buckets)
+    cumulative = 0
+    for index, count in enumerate(buckets):
+        if count and cumulative + count >= rank:
+            lower = bounds[index - 1] if index > 0 else 0.0
+            upper = bounds[index] if index < len(bounds) else high
+            lower, upper = max(lower, low), min(upper, high)
+            return lower + (upper - lower) * ((rank - cumulative) / count)
+        cumulative += count
+    return high
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+def _escape_label(value):
+    # Label values escape backslashes, double quotes and line feeds in the text format
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def to_prometheus():
+    """
+    Renders the metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics as Prometheus text.
+    """
+    data = snapshot()
+    lines = []
+    typed = set()
+    for (name, labels), value in sorted(data["counters"].items()):
+        metric = f"{NAMESPACE}_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    for (name, labels), histogram in sorted(data["histograms"].items()):
+        metric = f"{NAMESPACE}_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        cumulative = 0
+        for bound, count in zip(tuple(histogram["bounds"]) + ("+Inf",), histogram["buckets"]):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+def to_json():
+    """
+    Summarizes the metrics as JSON-friendly data.
+
+    Returns:
+        dict: Counters, and count/sum/min/max/mean/p50/p95 of each histogram.
+    """
+    data = snapshot()
+    counters = [{"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(data["counters"].items())]
+    histograms = []
+    for (name, labels), histogram in sorted(data["histograms"].items()):
+        histograms.append({
+            "name": name,
+            "labels": dict(labels),
+            "count": histogram["count"],
+            "sum": histogram["sum"],
+            "min": histogram["min"],
+            "max": histogram["max"],
+            "mean": histogram["sum"] / histogram["count"] if histogram["count"] else None,
+            "p50": quantile(name, 0.5, **dict(labels)),
+            "p95": quantile(name, 0.95, **dict(labels)),
+        })
+    return {"counters": counters, "histograms": histograms}
+
+def export(file_path, format="json"):
+    """
+    Writes the metrics to a file.
+
+    Args:
+        file_path (str): Destination file.
+        format (str): ``json`` or ``prometheus``.
+    """
+    with open(file_path, "w", encoding="utf-8") as metrics_file:
+        if format == "prometheus":
+            metrics_file.write(to_prometheus())
+        else:
+            json.dump(to_json(), metrics_file, ensure_ascii=False, indent=4)
+    logger.info("Metrics exported to %s", file_path)
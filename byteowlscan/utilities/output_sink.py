@@ -0,0 +1,327 @@
+import datetime
+import functools
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+
+from byteowlscan.utilities import document_input
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+OUTPUT_MODES = ("file", "jsonl", "sharded")
+
+# Function to build the output record of a resume
+def build_record(file_path, data, timings=None, sha256=None):
+    """
+    Builds the record written for one resume.
+
+    Args:
+        file_path (str): Path of the source resume, or the ``MemoryDocument`` parsed.
+        data (dict): Extracted data.
+        timings (dict): Seconds spent in each stage, e.g. ``{"parse": 0.4, "extract": 2.1}``.
+        sha256 (str): Content hash of the resume, computed from the resume when not given.
+
+    Returns:
+        dict: The record with its source path, content hash and timing metadata.
+    """
+    return {
+        "source": str(file_path),
+        "sha256": sha256 or document_input.document_hash(file_path),
+        "processedAt": datetime.datetime.now().isoformat(timespec="seconds"),
+        "timings": {stage: round(seconds, 4) for stage, seconds in (timings or {}).items()},
+        "data": data,
+    }
+
+# Function to write a file atomically
+def atomic_write(file_path, content):
+    """
+    Writes a file through a temporary file in the same directory and a rename, so
+    readers never see a partial file and a crash never leaves a truncated one.
+
+    Args:
+        file_path (str): Destination file.
+        content (str): Text to write.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            temp_file.write(content)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class OutputSink:
+    """
+    Destination of the extracted resumes.
+
+    Sinks are used as context managers so buffered records are flushed when the run ends.
+    ``write`` is thread-safe. A record may still be buffered when ``write`` returns:
+    ``when_durable`` tells when it has reached the disk.
+    """
+
+    def write(self, file_path, data, timings=None, sha256=None):
+        """
+        Writes the extracted data of one resume.
+
+        Args:
+            file_path (str): Path of the source resume.
+            data (dict): Extracted data.
+            timings (dict): Seconds spent in each stage.
+            sha256 (str): Content hash of the resume, see ``build_record``.
+
+        Returns:
+            str: Where the record was written.
+        """
+        raise NotImplementedError
+
+    def when_durable(self, file_path, callback, on_error=None):
+        """
+        Calls ``callback()`` once the record of ``file_path`` is on disk: right away if
+        it already is, otherwise when the batch holding it is flushed.
+
+        If that batch fails to be written, its records are dropped (never written
+        later) and ``on_error(message)`` is called instead.
+
+        Args:
+            file_path (str): Path of the source resume, as given to ``write``.
+            callback (callable): Called without arguments.
+            on_error (callable, optional): Called with the error message of a failed batch.
+        """
+        callback()
+
+    def flush(self):
+        """Writes buffered records, if any."""
+
+    def close(self):
+        """Flushes and releases the sink."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class FileSink(OutputSink):
+    """
+    Writes one indented JSON file per resume, atomically.
+
+    Files keep the existing format (the extracted data only), named
+    ``<resume name>_<timestamp>_<random id>.json`` inside ``directory``. The random
+    id keeps resumes whose cleaned names match (``CV (1)``, ``CV_1``, or the same
+    name in two subdirectories) from replacing each other within the same second.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Output directory, created if missing.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def write(self, file_path, data, timings=None, sha256=None):
+        # Imported here, app_utilities imports this module
+        from byteowlscan.utilities.app_utilities import clean_filename, get_file_name
+
+        time_stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        file_name = clean_filename(get_file_name(file_path))
+        json_file_path = os.path.join(self.directory, f"{file_name}_{time_stamp}_{uuid.uuid4().hex[:8]}.json")
+        atomic_write(json_file_path, json.dumps(data, ensure_ascii=False, indent=4))
+        return json_file_path
+
+class JsonlSink(OutputSink):
+    """
+    Appends compact records to a single JSON-lines file in buffered batches.
+
+    Records are buffered in memory and written ``batch_size`` at a time with one
+    write and one fsync, instead of one file per resume. A batch that fails to be
+    written is dropped as a whole: the file is cut back to where the batch started,
+    the ``write``/``flush``/``close`` call raises, and the other records of the batch
+    get their ``on_error`` callback.
+    """
+
+    def __init__(self, file_path, batch_size=100):
+        """
+        Args:
+            file_path (str): The JSON-lines file, appended to if it exists.
+            batch_size (int): Number of records buffered before they are written.
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        self.file_path = file_path
+        self.batch_size = max(1, batch_size)
+        self._buffer = []
+        # (callback, on_error) of the buffered records, keyed by source path, see when_durable
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, file_path, data, timings=None, sha256=None):
+        line = json.dumps(build_record(file_path, data, timings, sha256), ensure_ascii=False, separators=(",", ":"))
+        callbacks, error = [], None
+        with self._lock:
+            self._buffer.append(line)
+            self._pending.setdefault(file_path, [])
+            if len(self._buffer) >= self.batch_size:
+                callbacks, error = self._flush_locked()
+            output = self.file_path
+        _run_callbacks(callbacks, error)
+        return output
+
+    def when_durable(self, file_path, callback, on_error=None):
+        with self._lock:
+            if file_path in self._pending:
+                self._pending[file_path].append((callback, on_error))
+                return
+        callback()
+
+    def flush(self):
+        with self._lock:
+            callbacks, error = self._flush_locked()
+        _run_callbacks(callbacks, error)
+
+    def close(self):
+        with self._lock:
+            callbacks, error = self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        _run_callbacks(callbacks, error)
+
+    def _flush_locked(self):
+        """
+        Writes the buffered records, or drops them all if the write fails.
+
+        Returns:
+            tuple: The callbacks to call once the lock is released (``callback`` of the
+            records written, or ``on_error`` of the records dropped), and the write
+            error or None.
+        """
+        if not self._buffer:
+            return [], None
+        records, pending = self._buffer, self._pending
+        self._buffer, self._pending = [], {}
+        start = None
+        try:
+            output = self._output_file(sum(len(line) + 1 for line in records))
+            start = os.fstat(output.fileno()).st_size
+            output.write("\n".join(records) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+        except Exception as e:
+            logger.error("Failed to write %d records to %s: %s", len(records), self.file_path, e)
+            self._discard(start)
+            message = f"Output write failed: {e}"
+            return [functools.partial(on_error, message) for path_callbacks in pending.values()
+                    for _, on_error in path_callbacks if on_error is not None], e
+        logger.debug("Wrote %d records to %s", len(records), output.name)
+        return [callback for path_callbacks in pending.values() for callback, _ in path_callbacks], None
+
+    def _discard(self, start):
+        # Drops what the failed batch left in the file buffer and on disk, so it is never written later
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        if start is not None:
+            try:
+                os.truncate(self.file_path, start)
+            except OSError as e:
+                logger.error("Could not cut %s back after a failed write: %s", self.file_path, e)
+
+    def _output_file(self, pending_size):
+        if self._file is None:
+            self._file = open(self.file_path, "a", encoding="utf-8")
+        return self._file
+
+class ShardedJsonlSink(JsonlSink):
+    """
+    JSON-lines sink that rolls over to a new shard once the current one reaches ``max_bytes``.
+
+    Shards are named ``<prefix>-00000.jsonl``, ``<prefix>-00001.jsonl``... in
+    ``directory``; a new run continues after the last existing shard.
+    """
+
+    def __init__(self, directory, max_bytes, prefix="resumes", batch_size=100):
+        """
+        Args:
+            directory (str): Directory holding the shards.
+            max_bytes (int): Size after which a new shard is started.
+            prefix (str): File name prefix of the shards.
+            batch_size (int): Number of records buffered before they are written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        # A new run starts a shard after the last existing one, even if earlier ones were removed
+        pattern = re.compile(rf"{re.escape(prefix)}-(\d+)\.jsonl")
+        shards = [int(match.group(1)) for match in map(pattern.fullmatch, os.listdir(directory)) if match]
+        self._shard = max(shards) + 1 if shards else 0
+        super().__init__(self._shard_path(), batch_size)
+
+    def _shard_path(self):
+        return os.path.join(self.directory, f"{self.prefix}-{self._shard:05d}.jsonl")
+
+    def _output_file(self, pending_size):
+        output = super()._output_file(pending_size)
+        if output.tell() and output.tell() + pending_size > self.max_bytes:
+            output.close()
+            self._shard += 1
+            self.file_path = self._shard_path()
+            self._file = output = open(self.file_path, "a", encoding="utf-8")
+            logger.info("Started output shard %s", self.file_path)
+        return output
+
+def _run_callbacks(callbacks, error=None):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error("Output callback failed: %s", e)
+    if error is not None:
+        raise error
+
+# Function to create the output sink selected by the arguments and the configuration
+def get_output_sink(args):
+    """
+    Creates the output sink for a run.
+
+    The mode comes from ``--outputMode`` or ``OUTPUT_MODE`` (``file``, ``jsonl`` or
+    ``sharded``) and the location from ``--outputDir`` or ``APP_RESULT_FILEPATH``.
+
+    Args:
+        args: Command line arguments.
+
+    Returns:
+        OutputSink: The output sink.
+
+    Raises:
+        ValueError: If the output mode is unknown.
+    """
+    mode = getattr(args, "outputMode", None) or AppConfig.get("OUTPUT_MODE", "file")
+    directory = getattr(args, "outputDir", None) or AppConfig.get("APP_RESULT_FILEPATH", "./outputs")
+    batch_size = int(AppConfig.get("OUTPUT_BATCH_SIZE", 100))
+
+    if mode == "file":
+        return FileSink(directory)
+    if mode == "jsonl":
+        return JsonlSink(os.path.join(directory, AppConfig.get("OUTPUT_JSONL_FILE", "resumes.jsonl")), batch_size)
+    if mode == "sharded":
+        max_bytes = int(AppConfig.get("OUTPUT_SHARD_SIZE_MB", 256)) * 1024 * 1024
+        return ShardedJsonlSink(directory, max_bytes, AppConfig.get("OUTPUT_SHARD_PREFIX", "resumes"), batch_size)
+    raise ValueError(f"Unknown output mode: {mode}. Expected one of {', '.join(OUTPUT_MODES)}.")
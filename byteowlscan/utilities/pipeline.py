@@ -0,0 +1,276 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from tqdm import tqdm
+
+from byteowlscan.utilities import metrics
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Sentinel telling a stage that the previous stage has finished
+_STOP = object()
+
+def default_parse_workers():
+    """
+    Returns the default number of parse workers (one per CPU core).
+
+    Returns:
+        int: Number of parse worker processes.
+    """
+    return os.cpu_count() or 1
+
+def run_pipeline(file_paths, parse_fn, extract_fn, save_fn, parse_workers=None, extract_workers=4,
+                 queue_size=16, initializer=None, initargs=(), done_fn=None, executor=None):
+    """
+    Runs resumes through a staged pipeline: parse -> extract -> save.
+
+    Parsing runs on a process pool, extraction on a pool of threads and saving on a
+    single writer thread. Stages are connected by bounded queues so memory stays flat
+    regardless of how many files are queued: the extracted data of a resume is
+    dropped once ``save_fn`` has handled it, so a caller that needs it keeps it there.
+
+    Every file reaches ``done_fn``, as failed when it could not be parsed: if the
+    parse pool breaks, the files not parsed yet are failed too. If the save stage
+    itself fails, the other stages stop, the files not saved yet are left unrecorded
+    and the error is raised.
+
+    Args:
+        file_paths (list): Paths of the resumes to process.
+        parse_fn (callable): Picklable function ``parse_fn(path) -> str``.
+        extract_fn (callable): Function ``extract_fn(path, text) -> dict``.
+        save_fn (callable): Function ``save_fn(path, data, timings, sha256) -> output``, ``timings``
+            being the seconds spent parsing and extracting the resume and ``sha256`` the content hash
+            ``parse_fn`` returned with the text (see ``document_input.ParsedText``), None if it did not.
+        parse_workers (int): Number of parse processes, defaults to the number of cores.
+        extract_workers (int): Number of concurrent extraction threads.
+        queue_size (int): Capacity of the queues between stages.
+        initializer (callable): Optional initializer for the parse processes.
+        initargs (tuple): Arguments for the initializer.
+        done_fn (callable): Optional ``done_fn(path, output, error, timings, sha256)`` called on the
+            writer thread once each resume succeeded or failed.
+        executor (ProcessPoolExecutor): Long-lived parse pool to use instead of starting one;
+            it is left running. ``parse_workers``, ``initializer`` and ``initargs`` are then ignored.
+
+    Returns:
+        dict: The number of resumes that ``succeeded`` and ``failed``.
+
+    Raises:
+        Exception: The error that stopped the save stage, if any.
+    """
+    parse_workers = parse_workers or default_parse_workers()
+    extract_workers = max(1, extract_workers)
+    queue_size = max(1, queue_size)
+
+    parsed_queue = queue.Queue(maxsize=queue_size)
+    extracted_queue = queue.Queue(maxsize=queue_size)
+    counts = {"succeeded": 0, "failed": 0}
+    # Set when the save stage fails, to stop the other stages
+    cancelled = threading.Event()
+    save_errors = []
+
+    logger.info("Pipeline started: %d parse workers, %d extract workers, queue size %d",
+                parse_workers, extract_workers, queue_size)
+
+    parse_thread = threading.Thread(
+        target=_parse_stage,
+        args=(file_paths, parse_fn, parse_workers, queue_size, parsed_queue, extract_workers, initializer, initargs,
+              executor, cancelled),
+        name="pipeline-parse",
+    )
+    extract_threads = [
+        threading.Thread(target=_extract_stage, args=(extract_fn, parsed_queue, extracted_queue, cancelled),
+                         name=f"pipeline-extract-{i}")
+        for i in range(extract_workers)
+    ]
+    save_thread = threading.Thread(
+        target=_save_stage, args=(save_fn, done_fn, extracted_queue, counts, len(file_paths), cancelled, save_errors),
+        name="pipeline-save",
+    )
+
+    parse_thread.start()
+    for thread in extract_threads:
+        thread.start()
+    save_thread.start()
+
+    parse_thread.join()
+    for thread in extract_threads:
+        thread.join()
+    extracted_queue.put(_STOP)
+    save_thread.join()
+
+    if save_errors:
+        raise save_errors[0]
+    logger.info("Pipeline finished: %d/%d resumes succeeded", counts["succeeded"], len(file_paths))
+    return counts
+
+def parse_files(file_paths, parse_fn, workers=None, initializer=None, initargs=()):
+    """
+    Parses files on a process pool, without the extract and save stages.
+
+    Metrics recorded by the workers are merged into this process.
+
+    Args:
+        file_paths (list): Paths of the resumes to parse.
+        parse_fn (callable): Picklable function ``parse_fn(path) -> str``.
+        workers (int): Number of parse processes, defaults to the number of cores.
+        initializer (callable): Optional initializer for the parse processes.
+        initargs (tuple): Arguments for the initializer.
+
+    Yields:
+        tuple: ``(path, text, seconds, error)`` as each file finishes, ``text`` and
+        ``seconds`` being None when parsing failed.
+    """
+    with ProcessPoolExecutor(max_workers=workers or default_parse_workers(), initializer=initializer,
+                             initargs=initargs) as executor:
+        futures = {executor.submit(_parse_in_worker, parse_fn, path): path for path in file_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                text, seconds, worker_metrics = future.result()
+            except Exception as e:
+                logger.error("Parse failed for %s: %s", path, e)
+                yield path, None, None, str(e)
+                continue
+            metrics.merge(worker_metrics)
+            yield path, text, seconds, None
+
+def _parse_stage(file_paths, parse_fn, parse_workers, queue_size, parsed_queue, extract_workers, initializer, initargs,
+                 executor, cancelled):
+    """
+    Submits files to the parse process pool, keeping at most ``queue_size`` in flight.
+
+    If the pool fails (e.g. ``BrokenProcessPool``), the files in flight and the files
+    not submitted yet are passed on as failed, so they still reach ``done_fn``.
+    """
+    paths = iter(file_paths)
+    pending = {}
+    # Taken from paths but not submitted yet, when submit raises
+    submitting = []
+    try:
+        owned = executor is None
+        if owned:
+            executor = ProcessPoolExecutor(max_workers=parse_workers, initializer=initializer, initargs=initargs)
+        try:
+            while not cancelled.is_set():
+                while len(pending) < queue_size:
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    submitting = [(path, time.perf_counter())]
+                    future = executor.submit(_parse_in_worker, parse_fn, path)
+                    pending[future] = submitting.pop()
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, started = pending.pop(future)
+                    item = _new_item(path, started)
+                    try:
+                        item["text"], item["timings"]["parse"], worker_metrics = future.result()
+                        item["sha256"] = getattr(item["text"], "sha256", None)
+                        metrics.merge(worker_metrics)
+                    except Exception as e:
+                        logger.error("Parse failed for %s: %s", path, e)
+                        item["error"] = str(e)
+                    # Blocks while the extract stage is behind, which throttles parsing
+                    parsed_queue.put(item)
+        finally:
+            if cancelled.is_set():
+                for future in pending:
+                    future.cancel()
+            if owned:
+                executor.shutdown()
+    except Exception as e:
+        left = list(pending.values()) + submitting + [(path, time.perf_counter()) for path in paths]
+        logger.error("Parse stage failed, failing the %d files left: %s", len(left), e)
+        for path, started in left:
+            item = _new_item(path, started)
+            item["error"] = f"Parse stage failed: {e}"
+            parsed_queue.put(item)
+    finally:
+        for _ in range(extract_workers):
+            parsed_queue.put(_STOP)
+
+def _new_item(path, started):
+    """Returns the pipeline item of a file, passed from stage to stage."""
+    return {"path": path, "text": None, "data": None, "error": None, "started": started, "timings": {}, "sha256": None}
+
+def _parse_in_worker(parse_fn, path):
+    """
+    Runs ``parse_fn`` in a worker process and returns the text, the seconds it took
+    and the metrics it recorded.
+    """
+    if metrics.is_enabled():
+        metrics.reset()
+    started = time.perf_counter()
+    text = parse_fn(path)
+    seconds = time.perf_counter() - started
+    return text, seconds, metrics.snapshot() if metrics.is_enabled() else None
+
+def _extract_stage(extract_fn, parsed_queue, extracted_queue, cancelled):
+    """
+    Pulls parsed resumes from the queue and extracts structured data from them.
+    """
+    while True:
+        item = parsed_queue.get()
+        if item is _STOP:
+            break
+        # Once the save stage has failed, items are only passed on for it to drain
+        if item["error"] is None and not cancelled.is_set():
+            started = time.perf_counter()
+            try:
+                item["data"] = extract_fn(item["path"], item["text"])
+                item["timings"]["extract"] = time.perf_counter() - started
+            except Exception as e:
+                logger.error("Extraction failed for %s: %s", item["path"], e)
+                item["error"] = str(e)
+        # The text is no longer needed, do not hold it until the item is saved
+        item["text"] = None
+        extracted_queue.put(item)
+
+def _save_stage(save_fn, done_fn, extracted_queue, counts, total, cancelled, errors):
+    """
+    Writes extracted resumes one at a time and counts the outcomes.
+
+    If it fails, the error is kept in ``errors``, the other stages are cancelled and
+    the queue is drained until they stop, so that no extract thread stays blocked on it.
+    """
+    progress_bar = tqdm(total=total, desc="Processing files", unit="file", colour="green")
+    try:
+        while True:
+            item = extracted_queue.get()
+            if item is _STOP:
+                return
+            output = None
+            if item["error"] is None:
+                try:
+                    item["timings"]["total"] = time.perf_counter() - item["started"]
+                    output = save_fn(item["path"], item["data"], item["timings"], item["sha256"])
+                except Exception as e:
+                    logger.error("Saving failed for %s: %s", item["path"], e)
+                    item["error"] = str(e)
+            item["data"] = None
+            item["timings"]["total"] = time.perf_counter() - item["started"]
+            metrics.observe("resume_seconds", item["timings"]["total"])
+            metrics.inc("resumes_total", status="failed" if item["error"] else "succeeded")
+            counts["failed" if item["error"] else "succeeded"] += 1
+            if done_fn is not None:
+                try:
+                    done_fn(item["path"], output, item["error"], item["timings"], item["sha256"])
+                except Exception as e:
+                    logger.error("Recording the outcome of %s failed: %s", item["path"], e)
+            progress_bar.update(1)
+    except BaseException as e:
+        logger.error("Save stage failed, stopping the pipeline: %s", e)
+        errors.append(e)
+        cancelled.set()
+        while extracted_queue.get() is not _STOP:
+            pass
+    finally:
+        progress_bar.close()
@@ -0,0 +1,186 @@
+import contextlib
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from byteowlscan.utilities import metrics
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_pid = None
+_cache_lock = threading.Lock()
+
+class ResultCache:
+    """
+    Persistent content-addressed cache with size-based LRU eviction.
+
+    Entries live in a SQLite database inside ``cache_dir`` and are grouped in
+    namespaces (``text``, ``preprocessed``, ``result``) so each expensive step can
+    be reused on its own. The least recently used entries are evicted once the
+    total size exceeds ``max_bytes``. Safe to share between threads and processes.
+
+    The total size is kept up to date by triggers in a ``meta`` row, so a write
+    does not sum the whole table. Access times are only rewritten once they are
+    ``access_resolution`` seconds old, so hits are usually read-only and do not
+    serialize concurrent readers.
+    """
+
+    def __init__(self, cache_dir, max_bytes, access_resolution=60.0):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache database.
+            max_bytes (int): Maximum total size of the cached values.
+            access_resolution (float): Seconds within which the access time of an entry is not rewritten.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "cache.sqlite3")
+        self.max_bytes = max_bytes
+        self.access_resolution = access_resolution
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            # One transaction: the total is seeded from the entries of an older cache exactly once
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (name, value)"
+                         " SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN"
+                         " UPDATE meta SET value = value + new.size WHERE name = 'total_size'; END")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN"
+                         " UPDATE meta SET value = value - old.size WHERE name = 'total_size'; END")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF size ON entries BEGIN"
+                         " UPDATE meta SET value = value + new.size - old.size WHERE name = 'total_size'; END")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # ``with conn`` only commits or rolls back, the connection is closed here
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, namespace, key):
+        """
+        Gets a cached value and marks it as recently used (within ``access_resolution``).
+
+        Args:
+            namespace (str): Cache namespace.
+            key (str): Cache key.
+
+        Returns:
+            str | None: The cached value, or None on a miss.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, last_access FROM entries WHERE namespace = ? AND key = ?",
+                               (namespace, key)).fetchone()
+            if row is None:
+                logger.debug("Cache miss: %s/%s", namespace, key)
+                metrics.inc("cache_requests_total", namespace=namespace, result="miss")
+                return None
+            now = time.time()
+            if now - row[1] >= self.access_resolution:
+                conn.execute("UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                             (now, namespace, key))
+        logger.debug("Cache hit: %s/%s", namespace, key)
+        metrics.inc("cache_requests_total", namespace=namespace, result="hit")
+        return row[0]
+
+    def set(self, namespace, key, value):
+        """
+        Stores a value and evicts the least recently used entries if the cache is full.
+
+        Args:
+            namespace (str): Cache namespace.
+            key (str): Cache key.
+            value (str): Value to store.
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._connect() as conn:
+            # An upsert rather than INSERT OR REPLACE, whose deletions do not fire the triggers
+            conn.execute("INSERT INTO entries (namespace, key, value, size, last_access) VALUES (?, ?, ?, ?, ?)"
+                         " ON CONFLICT (namespace, key) DO UPDATE SET"
+                         " value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                         (namespace, key, value, size, time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for namespace, key, size in conn.execute("SELECT namespace, key, size FROM entries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((namespace, key))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", evicted)
+        logger.info("Cache evicted %d entries", len(evicted))
+
+# Function to get the process-wide cache
+def get_result_cache():
+    """
+    Returns the process-wide result cache, or None when caching is disabled.
+
+    Returns:
+        ResultCache | None: The result cache.
+    """
+    global _cache, _cache_pid
+    if AppConfig.config is None or not AppConfig.get("CACHE_ENABLED", False):
+        return None
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = ResultCache(AppConfig.get("CACHE_DIR", "./.byteowlscan_cache"),
+                                 int(AppConfig.get("CACHE_MAX_SIZE_MB", 1024)) * 1024 * 1024,
+                                 AppConfig.get("CACHE_ACCESS_RESOLUTION_SECONDS", 60.0))
+            _cache_pid = os.getpid()
+    return _cache
+
+# Function to hash a file by content
+def file_hash(file_path):
+    """
+    Computes the SHA-256 of a file content.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Function to build a cache key from several parts
+def make_key(*parts):
+    """
+    Builds a cache key by hashing its parts.
+
+    Args:
+        *parts: Values identifying the cached result (text, model, prompt template...).
+
+    Returns:
+        str: Hex digest of the parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
@@ -0,0 +1,66 @@
+# JSON schema of the extraction answer, following the structure described in
+# app_prompt.generateExtractInfo. It is sent as the structured-output constraint
+# (OPENAI_RESPONSE_FORMAT: "json_schema"). It is not strict: fields without data
+# are left out and the free-form sections accept any property.
+
+_TEXT = {"type": "string"}
+_TEXT_LIST = {"type": "array", "items": {"type": "string"}}
+_ANY_LIST = {"type": "array", "items": {}}
+_ANY_OBJECT = {"type": "object"}
+
+def _object(**properties):
+    return {"type": "object", "properties": properties}
+
+RESUME_SCHEMA = _object(
+    candidateInformation=_object(
+        fullName=_TEXT, gender=_TEXT, IDNo=_TEXT, currentPosition=_TEXT, dateOfBirth=_TEXT,
+        hometown=_TEXT, phone=_TEXT, email=_TEXT, address=_TEXT, introduce=_TEXT,
+    ),
+    education={"type": "array", "items": _object(degree=_TEXT, major=_TEXT, university=_TEXT, graduationDate=_TEXT)},
+    trainingCourses={"type": "array", "items": _object(course=_TEXT, institution=_TEXT)},
+    languageSkills=_ANY_LIST,
+    computerSkills=_ANY_LIST,
+    skills=_object(technicalSkills=_TEXT_LIST, softSkills=_TEXT_LIST),
+    workExperience={"type": "array", "items": _object(
+        company=_TEXT, role=_TEXT, scale=_TEXT, duration=_TEXT, salary=_TEXT, reasonForLeaving=_TEXT,
+        responsibilities=_TEXT_LIST,
+    )},
+    salary=_TEXT,
+    references=_ANY_LIST,
+    availability=_TEXT,
+    expectedSalary=_TEXT,
+    reasonForApplication=_TEXT_LIST,
+    careerPlan=_TEXT,
+    familyInformation=_ANY_LIST,
+    commitmentStatement=_TEXT,
+    signDate=_TEXT,
+    technicalSkills=_ANY_LIST,
+    achievementsAndAwards=_ANY_LIST,
+    projects=_ANY_LIST,
+    volunteerExperience=_ANY_LIST,
+    additionalInformation=_ANY_OBJECT,
+    otherContent=_ANY_OBJECT,
+)
+
+# Function to build the response_format parameter of the extraction requests
+def response_format(kind):
+    """
+    Builds the ``response_format`` of an extraction request.
+
+    Args:
+        kind (str): ``json_schema`` (constrained to ``RESUME_SCHEMA``), ``json_object``
+            (any valid JSON) or None.
+
+    Returns:
+        dict | None: The ``response_format`` parameter, or None to send none.
+
+    Raises:
+        ValueError: If ``kind`` is not supported.
+    """
+    if not kind:
+        return None
+    if kind == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": "resume", "schema": RESUME_SCHEMA, "strict": False}}
+    if kind == "json_object":
+        return {"type": "json_object"}
+    raise ValueError(f"Unknown response format: {kind}. Use json_schema, json_object or null.")
@@ -0,0 +1,141 @@
+import re
+import unicodedata
+
+from byteowlscan.utilities import token_counter
+
+# Section headings, casefolded and without diacritics, keyed by the schema key of their content
+SECTION_HEADINGS = {
+    "candidateInformation": ("thong tin ca nhan", "thong tin lien he", "lien he", "ho so ca nhan", "gioi thieu ban than",
+                             "personal information", "personal details", "personal info", "contact",
+                             "contact information", "about me", "profile", "summary"),
+    "careerPlan": ("muc tieu nghe nghiep", "muc tieu", "dinh huong nghe nghiep", "career objective", "objective",
+                   "career goals"),
+    "education": ("hoc van", "trinh do hoc van", "qua trinh hoc tap", "trinh do chuyen mon", "education",
+                  "academic background"),
+    "workExperience": ("kinh nghiem lam viec", "kinh nghiem", "qua trinh cong tac", "qua trinh lam viec",
+                       "work experience", "experience", "professional experience", "employment history"),
+    "skills": ("ky nang", "ky nang chuyen mon", "ky nang mem", "skills", "technical skills", "soft skills"),
+    "languageSkills": ("ngoai ngu", "trinh do ngoai ngu", "languages", "language skills"),
+    "computerSkills": ("tin hoc", "trinh do tin hoc", "computer skills"),
+    "trainingCourses": ("chung chi", "bang cap va chung chi", "khoa hoc", "dao tao", "certificates", "certifications",
+                        "training", "courses"),
+    "projects": ("du an", "du an tieu bieu", "du an da tham gia", "projects"),
+    "achievementsAndAwards": ("giai thuong", "thanh tich", "danh hieu va giai thuong", "awards", "achievements",
+                              "honors and awards"),
+    "references": ("nguoi tham chieu", "nguoi gioi thieu", "nguoi tham khao", "references"),
+    "volunteerExperience": ("hoat dong", "hoat dong tinh nguyen", "hoat dong ngoai khoa", "volunteer",
+                            "volunteer experience", "activities"),
+    "familyInformation": ("thong tin gia dinh", "gia dinh", "family", "family information"),
+    "additionalInformation": ("so thich", "thong tin them", "thong tin khac", "hobbies", "interests",
+                              "additional information"),
+}
+_HEADING_SECTIONS = {heading: key for key, headings in SECTION_HEADINGS.items() for heading in headings}
+# Headings that are also common words of a resume body, only taken as headings when written
+# like one: in capitals, numbered or followed by a colon
+GENERIC_HEADINGS = frozenset(("summary", "profile", "contact", "experience", "objective", "training", "family",
+                              "activities", "volunteer"))
+
+# Bullets and numbering before a heading, e.g. "-", "II.", "2/", "3 -"
+_BULLET = re.compile(r"^[-–•*+·]\s*")
+_NUMBERING = re.compile(r"^([ivxlc]+|\d{1,2})\s*[.)/-]\s*")
+
+# Function to fold a text for heading and label matching
+def fold(text):
+    """
+    Casefolds a text and strips its diacritics, so headings and labels match whether the
+    extraction (or OCR) kept the Vietnamese accents or not.
+
+    Args:
+        text (str): Text to fold.
+
+    Returns:
+        str: The folded text, e.g. ``ho va ten`` for ``Họ và tên``.
+    """
+    text = unicodedata.normalize("NFKD", text.casefold()).replace("đ", "d")
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).split())
+
+# Function to find the section headings of a resume text
+def find_sections(text):
+    """
+    Finds the section headings of a resume text, in Vietnamese or English.
+
+    A heading is a short line (optionally numbered, e.g. "II. HỌC VẤN", and ending
+    with a colon) whose text is a known section title of ``SECTION_HEADINGS``. The
+    titles of ``GENERIC_HEADINGS`` (e.g. "Experience") must also be in capitals,
+    numbered or followed by a colon.
+
+    Args:
+        text (str): The resume text.
+
+    Returns:
+        list: ``(key, start, end)`` of each section, ``key`` being the schema key of its
+        content and ``start``/``end`` the indexes of its heading line and of the line
+        after its last line. Lines before the first heading belong to no section.
+    """
+    lines = text.split("\n")
+    headings = [(i, key) for i, key in ((i, heading_key(line)) for i, line in enumerate(lines)) if key]
+    return [(key, start, headings[n + 1][0] if n + 1 < len(headings) else len(lines))
+            for n, (start, key) in enumerate(headings)]
+
+# Function to tell whether a line is a section heading
+def heading_key(line):
+    """
+    Returns the schema key of a section heading line.
+
+    Args:
+        line (str): A line of the resume text.
+
+    Returns:
+        str | None: The key, e.g. ``education``, or None if the line is not a heading.
+    """
+    if not line or len(line) > 60:
+        return None
+    folded = _BULLET.sub("", fold(line))
+    title = _NUMBERING.sub("", folded).rstrip(" :：").strip()
+    if title in GENERIC_HEADINGS and not (line.isupper() or _NUMBERING.match(folded)
+                                          or line.rstrip().endswith((":", "："))):
+        return None
+    return _HEADING_SECTIONS.get(title)
+
+# Function to split a resume text into its sections
+def split_sections(text, min_tokens=0, model=None):
+    """
+    Splits a resume text on its section headings, for section-specific extraction.
+
+    The lines before the first heading go with the personal-information sections,
+    and sections with the same key (e.g. "Kỹ năng" and "Kỹ năng mềm") are joined.
+    Sections under ``min_tokens`` tokens are grouped into a single part, so short
+    sections do not each cost a request.
+
+    Args:
+        text (str): The resume text.
+        min_tokens (int): Sections with fewer tokens are grouped together.
+        model (str): Model whose tokenizer counts the tokens, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        list: ``(keys, text)`` of each part, ``keys`` being the tuple of the schema keys
+        of its sections. Empty if the text has no known heading.
+    """
+    sections = find_sections(text)
+    if not sections:
+        return []
+    lines = text.split("\n")
+    texts = {}
+    preamble = "\n".join(lines[:sections[0][1]]).strip()
+    if preamble:
+        texts["candidateInformation"] = [preamble]
+    for key, start, end in sections:
+        # A heading without content says nothing
+        if "\n".join(lines[start + 1:end]).strip():
+            texts.setdefault(key, []).append("\n".join(lines[start:end]).strip())
+
+    parts, small = [], []
+    for key, pieces in texts.items():
+        section_text = "\n\n".join(pieces)
+        if min_tokens and token_counter.count_tokens(section_text, model) < min_tokens:
+            small.append((key, section_text))
+        else:
+            parts.append(((key,), section_text))
+    if small:
+        parts.append((tuple(key for key, _ in small), "\n\n".join(section_text for _, section_text in small)))
+    return parts
@@ -0,0 +1,225 @@
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from byteowlscan.utilities import document_input
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Arguments that are never stored in the manifest
+_SECRET_ARGS = ("apiKey",)
+
+class RunManifest:
+    """
+    Checkpoint manifest of batch runs, stored as SQLite in the output directory.
+
+    Every run gets a row in ``runs`` and every file it handles a row in ``entries``
+    with its content hash, status, output location, error and duration. A resumed
+    run skips the files whose current content already succeeded in any run, and
+    the entries give the throughput and failure rate of each run.
+    """
+
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path (str): Path of the SQLite manifest, created if missing.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL NOT NULL,"
+                " finished_at REAL, total INTEGER NOT NULL, args TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " run_id INTEGER NOT NULL, path TEXT NOT NULL, sha256 TEXT, status TEXT NOT NULL,"
+                " output TEXT, error TEXT, seconds REAL, finished_at REAL NOT NULL,"
+                " PRIMARY KEY (run_id, path))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_path ON entries (path, status)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # ``with conn`` only commits or rolls back, the connection is closed here
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def start_run(self, total, args=None):
+        """
+        Registers a new run.
+
+        Args:
+            total (int): Number of files found for the run.
+            args (dict): Arguments of the run, stored without secrets.
+
+        Returns:
+            int: The run id.
+        """
+        stored_args = {key: value for key, value in (args or {}).items() if key not in _SECRET_ARGS}
+        with self._connect() as conn:
+            cursor = conn.execute("INSERT INTO runs (started_at, total, args) VALUES (?, ?, ?)",
+                                  (time.time(), total, json.dumps(stored_args, default=str)))
+            return cursor.lastrowid
+
+    def finish_run(self, run_id):
+        """
+        Marks a run as finished.
+
+        Args:
+            run_id (int): The run id.
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def record(self, run_id, path, status, output=None, error=None, seconds=None, sha256=None):
+        """
+        Records the outcome of one file.
+
+        Args:
+            run_id (int): The run id.
+            path (str): Path of the resume.
+            status (str): ``succeeded``, ``failed`` or ``skipped``.
+            output (str): Where the result was written.
+            error (str): Error message of a failed file.
+            seconds (float): Time spent on the file.
+            sha256 (str): Content hash, computed from the file when not given.
+        """
+        if sha256 is None:
+            sha256 = _try_file_hash(path)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries (run_id, path, sha256, status, output, error, seconds, finished_at)"
+                         " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (run_id, path, sha256, status, output, error, seconds, time.time()))
+
+    def pending(self, run_id, file_paths):
+        """
+        Filters out the files whose current content already succeeded in a previous run.
+
+        Skipped files are recorded in ``run_id``; failed and new or modified files are returned.
+
+        Args:
+            run_id (int): The id of the resumed run.
+            file_paths (list): Paths found for the run.
+
+        Returns:
+            list: Paths that still need to be processed, in their original order.
+        """
+        with self._connect() as conn:
+            done = {}
+            for path, sha256, output in conn.execute(
+                    "SELECT path, sha256, output FROM entries WHERE status = ? AND run_id != ?", (SUCCEEDED, run_id)):
+                done.setdefault(path, {})[sha256] = output
+
+        remaining = []
+        skipped = []
+        for path in file_paths:
+            if path in done:
+                sha256 = _try_file_hash(path)
+                if sha256 in done[path]:
+                    skipped.append((run_id, path, sha256, SKIPPED, done[path][sha256], None, 0.0, time.time()))
+                    continue
+            remaining.append(path)
+
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO entries (run_id, path, sha256, status, output, error, seconds, finished_at)"
+                             " VALUES (?, ?, ?, ?, ?, ?, ?, ?)", skipped)
+        logger.info("Resuming: %d files already done, %d to process", len(skipped), len(remaining))
+        return remaining
+
+    def summary(self, run_id):
+        """
+        Summarizes a run from its entries.
+
+        Args:
+            run_id (int): The run id.
+
+        Returns:
+            dict: Counts per status, wall time, files/sec over the processed files,
+            failure rate and mean seconds per file.
+        """
+        with self._connect() as conn:
+            run = conn.execute("SELECT started_at, finished_at, total FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if run is None:
+                raise ValueError(f"Unknown run: {run_id}")
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM entries WHERE run_id = ? GROUP BY status", (run_id,)))
+            mean_seconds = conn.execute("SELECT AVG(seconds) FROM entries WHERE run_id = ? AND status != ?",
+                                        (run_id, SKIPPED)).fetchone()[0]
+            last_finished = conn.execute("SELECT MAX(finished_at) FROM entries WHERE run_id = ?", (run_id,)).fetchone()[0]
+
+        started_at, finished_at, total = run
+        wall_seconds = (finished_at or last_finished or started_at) - started_at
+        processed = counts.get(SUCCEEDED, 0) + counts.get(FAILED, 0)
+        return {
+            "run_id": run_id,
+            "total": total,
+            "succeeded": counts.get(SUCCEEDED, 0),
+            "failed": counts.get(FAILED, 0),
+            "skipped": counts.get(SKIPPED, 0),
+            "finished": finished_at is not None,
+            "wall_seconds": wall_seconds,
+            "files_per_second": processed / wall_seconds if wall_seconds else None,
+            "failure_rate": counts.get(FAILED, 0) / processed if processed else None,
+            "mean_seconds_per_file": mean_seconds,
+        }
+
+    def run_ids(self):
+        """
+        Returns:
+            list: Ids of all the runs in the manifest, oldest first.
+        """
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT run_id FROM runs ORDER BY run_id")]
+
+    def failures(self, run_id):
+        """
+        Returns:
+            list: ``(path, error)`` of the files that failed in a run.
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT path, error FROM entries WHERE run_id = ? AND status = ? ORDER BY path",
+                                (run_id, FAILED)).fetchall()
+
+    def log_summary(self, run_id):
+        """
+        Logs the summary of a run.
+
+        Args:
+            run_id (int): The run id.
+        """
+        summary = self.summary(run_id)
+        logger.info("Run %d: %d succeeded, %d failed, %d skipped of %d files in %.1fs (%.2f files/s, failure rate %.1f%%)",
+                    run_id, summary["succeeded"], summary["failed"], summary["skipped"], summary["total"],
+                    summary["wall_seconds"], summary["files_per_second"] or 0.0, 100 * (summary["failure_rate"] or 0.0))
+
+def _try_file_hash(path):
+    return document_input.document_hash(path)
+
+# Function to get the path of the run manifest
+def manifest_path(args):
+    """
+    Returns the path of the run manifest, inside the output directory.
+
+    Args:
+        args: Command line arguments.
+
+    Returns:
+        str: Path of the manifest.
+    """
+    directory = getattr(args, "outputDir", None) or AppConfig.get("APP_RESULT_FILEPATH", "./outputs")
+    return os.path.join(directory, AppConfig.get("MANIFEST_FILE", "manifest.sqlite3"))
@@ -1,14 +1,83 @@
 import base64
+import os
+import threading
 from io import BytesIO
 
-import fitz  # PyMuPDF
-import mammoth
-from docx import Document
-from markdownify import markdownify as md
-from pdfminer.high_level import extract_text_to_fp
-from semantic_text_splitter import MarkdownSplitter, TextSplitter
-from tokenizers import Tokenizer
+from byteowlscan.utilities import document_input
+from byteowlscan.utilities.app_config import AppConfig
+from byteowlscan.utilities.lazy_import import lazy_module
 
+# Loaded on first use, see lazy_module
+docx = lazy_module("docx")
+mammoth = lazy_module("mammoth")
+markdownify = lazy_module("markdownify")
+pdfminer_high_level = lazy_module("pdfminer.high_level")
+semantic_text_splitter = lazy_module("semantic_text_splitter")
+tokenizers = lazy_module("tokenizers")
+
+# Process-wide tokenizer and splitter registry, rebuilt after a fork
+_registry = {}
+_registry_pid = None
+_registry_lock = threading.Lock()
+
+def _get_registry():
+    global _registry, _registry_pid
+    if _registry_pid != os.getpid():
+        _registry = {}
+        _registry_pid = os.getpid()
+    return _registry
+
+def get_tokenizer():
+    """
+    Returns the HuggingFace tokenizer, loaded once per process.
+
+    The tokenizer is read from the local file ``TOKENIZER_PATH`` when it is set, so
+    chunking works without network access. Otherwise ``TOKENIZER_NAME`` is fetched
+    from the HuggingFace hub.
+
+    Returns:
+        Tokenizer: The HuggingFace tokenizer.
+    """
+    with _registry_lock:
+        registry = _get_registry()
+        if "tokenizer" not in registry:
+            tokenizer_path = AppConfig.get("TOKENIZER_PATH")
+            if tokenizer_path:
+                registry["tokenizer"] = tokenizers.Tokenizer.from_file(tokenizer_path)
+            else:
+                registry["tokenizer"] = tokenizers.Tokenizer.from_pretrained(AppConfig.get("TOKENIZER_NAME", "bert-base-uncased"))
+        return registry["tokenizer"]
+
+def get_splitter(kind, max_tokens=16384):
+    """
+    Returns a shared splitter, built once per process for each ``(kind, max_tokens)``.
+
+    Splitters count tokens with the tokenizer of ``OPENAI_MODEL`` (tiktoken) by default,
+    so chunk sizes match the tokens actually billed. Set ``SPLITTER_TOKENIZER`` to
+    ``huggingface`` to use the tokenizer of ``get_tokenizer`` instead.
+
+    Args:
+        kind (str): ``text`` or ``markdown``.
+        max_tokens (int): Maximum number of tokens in each chunk.
+
+    Returns:
+        TextSplitter | MarkdownSplitter: The splitter.
+    """
+    key = (kind, max_tokens)
+    with _registry_lock:
+        splitter = _get_registry().get(key)
+    if splitter is not None:
+        return splitter
+
+    if kind == "markdown":
+        splitter = initialize_markdown_splitter(max_tokens)
+    elif kind == "text":
+        splitter = initialize_text_splitter(max_tokens)
+    else:
+        raise ValueError(f"Unknown splitter kind: {kind}")
+
+    with _registry_lock:
+        return _get_registry().setdefault(key, splitter)
 
 def initialize_text_splitter(max_tokens=16384):
     """
@@ -20,8 +89,9 @@ def initialize_text_splitter(max_tokens=16384):
     Returns:
         TextSplitter: Initialized text splitter.
     """
-    tokenizer = Tokenizer.from_pretrained("bert-base-uncased")
-    return TextSplitter.from_huggingface_tokenizer(tokenizer, max_tokens)
+    if AppConfig.get("SPLITTER_TOKENIZER", "tiktoken") == "huggingface":
+        return semantic_text_splitter.TextSplitter.from_huggingface_tokenizer(get_tokenizer(), max_tokens)
+    return semantic_text_splitter.TextSplitter.from_tiktoken_model(AppConfig.get("OPENAI_MODEL", "gpt-4o-mini"), max_tokens)
 
 def initialize_markdown_splitter(max_tokens=16384):
     """
@@ -33,8 +103,9 @@ def initialize_markdown_splitter(max_tokens=16384):
     Returns:
         MarkdownSplitter: Initialized Markdown text splitter.
     """
-    tokenizer = Tokenizer.from_pretrained("bert-base-uncased")
-    return MarkdownSplitter.from_huggingface_tokenizer(tokenizer, max_tokens)
+    if AppConfig.get("SPLITTER_TOKENIZER", "tiktoken") == "huggingface":
+        return semantic_text_splitter.MarkdownSplitter.from_huggingface_tokenizer(get_tokenizer(), max_tokens)
+    return semantic_text_splitter.MarkdownSplitter.from_tiktoken_model(AppConfig.get("OPENAI_MODEL", "gpt-4o-mini"), max_tokens)
 
 def convert_image(image):
     """
@@ -53,12 +124,12 @@ def convert_docx_to_html(docx_path):
     Converts a DOCX file to HTML content without images.
 
     Args:
-        docx_path (str): Path to the DOCX file.
+        docx_path (str | bytes | memoryview): Path to the DOCX file, or its content.
 
     Returns:
         str: HTML content without images.
     """
-    with open(docx_path, "rb") as docx_file:
+    with document_input.open_stream(document_input.to_source(docx_path)) as docx_file:
         result = mammoth.convert_to_html(docx_file, convert_image=mammoth.images.img_element(convert_image))
         html_content = result.value.replace("<img />", "")
     return html_content
@@ -73,7 +144,7 @@ def convert_html_to_markdown(html_content):
     Returns:
         str: Markdown content.
     """
-    return md(html_content)
+    return markdownify.markdownify(html_content)
 
 def convert_pdf_to_html(file_path):
     """
@@ -87,7 +158,7 @@ def convert_pdf_to_html(file_path):
     """
     output_buffer = BytesIO()
     with open(file_path, 'rb') as pdf_file:
-        extract_text_to_fp(pdf_file, output_buffer, output_type='html')
+        pdfminer_high_level.extract_text_to_fp(pdf_file, output_buffer, output_type='html')
     return output_buffer.getvalue().decode('utf-8')
 
 def read_docx_to_text(filename):
@@ -95,12 +166,13 @@ def read_docx_to_text(filename):
     Reads text from a DOCX file, including text from paragraphs and tables.
 
     Args:
-        filename (str): Path to the DOCX file.
+        filename (str | bytes | memoryview): Path to the DOCX file, or its content.
 
     Returns:
         str: Extracted text from the DOCX file.
     """
-    doc = Document(filename)
+    with document_input.open_stream(document_input.to_source(filename)) as docx_file:
+        doc = docx.Document(docx_file)
     full_text = []
     
     for para in doc.paragraphs:
@@ -125,7 +197,7 @@ def split_markdown_into_chunks(content, max_tokens=16384):
     Returns:
         list: List of content chunks.
     """
-    splitter = initialize_markdown_splitter(max_tokens)
+    splitter = get_splitter("markdown", max_tokens)
     return splitter.chunks(content)
 
 def split_text_into_chunks(content, max_tokens=16384):
@@ -139,5 +211,5 @@ def split_text_into_chunks(content, max_tokens=16384):
     Returns:
         list: List of content chunks.
     """
-    splitter = initialize_text_splitter(max_tokens)
+    splitter = get_splitter("text", max_tokens)
     return splitter.chunks(content)
@@ -0,0 +1,205 @@
+import logging
+import math
+import re
+
+from byteowlscan.utilities import metrics, token_counter
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Whitespace runs within a line: tabs, non-breaking and other unicode spaces
+_SPACES = re.compile(r"[^\S\n]+")
+# Zero-width characters and soft hyphens left by PDF and OCR extraction
+_INVISIBLE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+# Page numbers within a line, e.g. "Page 3", "Page 3 of 5", "Trang 3/5"
+_PAGE_REFERENCE = re.compile(r"\b(page|trang)\s*\d+(\s*(/|of|trên)\s*\d+)?", re.IGNORECASE)
+# Lines holding a page number only, e.g. "3", "3 / 5", "- 3 -", "Page 3 of 5", but not years or dates
+_PAGE_NUMBER = re.compile(r"^[-\s]*(#|\d{1,3}(\s*(/|of|trên)\s*\d{1,3})?)[-\s]*$", re.IGNORECASE)
+# Furniture key shared by the lines holding a page number only
+_PAGE_NUMBER_KEY = "#"
+
+# Share of the tokens saved by compaction, between 0 and 1
+metrics.set_buckets("compact_saved_ratio", metrics.RATIO_BUCKETS)
+
+# Function to compact a resume text before it is sent to GPT
+def compact_text(text, model=None):
+    """
+    Removes what costs tokens without carrying information, deterministically.
+
+    - Collapses whitespace runs and blank lines, and drops zero-width characters.
+      Leading indentation is kept, it carries the nesting of lists.
+    - Removes page furniture: lines found at the top or bottom of several pages
+      (headers, footers), keeping their first occurrence, and page numbers.
+    - Removes the lines of at least ``COMPACT_DEDUPE_MIN_CHARS`` characters repeating
+      the line just before them. The same line under two sections (e.g. a responsibility
+      held in two jobs) is content and is kept.
+    - Truncates at a line boundary to ``COMPACT_MAX_INPUT_TOKENS`` when it is set.
+
+    Pages are separated by form feeds, as returned by the PDF extractor.
+
+    Args:
+        text (str): The extracted resume text.
+        model (str): Model whose tokenizer counts the tokens, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        tuple: The compacted text and its stats: ``tokens_before``, ``tokens_after``,
+        ``furniture_lines``, ``duplicate_lines`` and ``truncated``.
+    """
+    pages = [_normalize_lines(page) for page in _INVISIBLE.sub("", text).split("\f")]
+    pages, furniture_lines = _remove_furniture(pages, AppConfig.get("COMPACT_FURNITURE_LINES", 3),
+                                               AppConfig.get("COMPACT_FURNITURE_MIN_SHARE", 0.5))
+    lines, duplicate_lines = _remove_duplicates([line for page in pages for line in page],
+                                                AppConfig.get("COMPACT_DEDUPE_MIN_CHARS", 30))
+    compacted = "\n".join(_collapse_blank_lines(lines))
+
+    tokens_after = token_counter.count_tokens(compacted, model)
+    max_tokens = AppConfig.get("COMPACT_MAX_INPUT_TOKENS")
+    truncated = bool(max_tokens) and tokens_after > max_tokens
+    if truncated:
+        compacted = truncate_to_tokens(compacted, max_tokens, model)
+        logger.warning("Resume text truncated from %d to %d tokens.", tokens_after, max_tokens)
+        tokens_after = token_counter.count_tokens(compacted, model)
+
+    stats = {
+        "tokens_before": token_counter.count_tokens(text, model),
+        "tokens_after": tokens_after,
+        "furniture_lines": furniture_lines,
+        "duplicate_lines": duplicate_lines,
+        "truncated": truncated,
+    }
+    return compacted, stats
+
+# Function to compact a resume text if compaction is enabled, recording the tokens saved
+def compact_resume_text(text, resume_path=None):
+    """
+    Compacts a resume text when ``COMPACT_TEXT`` is enabled and logs the tokens saved.
+
+    Args:
+        text (str): The extracted resume text.
+        resume_path (str): The path to the resume, for the log.
+
+    Returns:
+        str: The compacted text (the text itself when compaction is disabled).
+    """
+    if not AppConfig.get("COMPACT_TEXT", True) or not text:
+        return text
+    with metrics.timer("stage_seconds", stage="compact"):
+        compacted, stats = compact_text(text)
+    saved = stats["tokens_before"] - stats["tokens_after"]
+    metrics.inc("compact_tokens_total", stats["tokens_before"], kind="before")
+    metrics.inc("compact_tokens_total", stats["tokens_after"], kind="after")
+    metrics.observe("compact_saved_ratio", saved / stats["tokens_before"] if stats["tokens_before"] else 0.0)
+    logger.info("Compacted %s: %d -> %d tokens (%d saved, %d furniture and %d duplicate lines removed%s).",
+                resume_path or "text", stats["tokens_before"], stats["tokens_after"], saved,
+                stats["furniture_lines"], stats["duplicate_lines"], ", truncated" if stats["truncated"] else "")
+    return compacted
+
+# Function to cut a text to a token budget
+def truncate_to_tokens(text, max_tokens, model=None):
+    """
+    Cuts a text to at most ``max_tokens`` tokens, at the last line boundary within the budget.
+
+    Args:
+        text (str): Text to cut.
+        max_tokens (int): Token budget.
+        model (str): Model whose tokenizer counts the tokens, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        str: The beginning of the text.
+    """
+    encoding = token_counter.get_encoding(model or AppConfig.get("OPENAI_MODEL", "gpt-4o-mini"))
+    if encoding is None:
+        head = text[:max(0, max_tokens - 1) * token_counter.CHARS_PER_TOKEN]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        head = encoding.decode(tokens[:max_tokens])
+    line_end = head.rfind("\n")
+    return head[:line_end] if line_end > 0 else head
+
+def _normalize_lines(page):
+    lines = []
+    for line in page.split("\n"):
+        text = _SPACES.sub(" ", line).strip()
+        indent = line[:len(line) - len(line.lstrip())] if text else ""
+        lines.append(indent + text)
+    return lines
+
+def _furniture_key(line):
+    # Headers and footers differ from page to page by their page number only
+    key = _PAGE_REFERENCE.sub("#", line.strip().casefold())
+    return _PAGE_NUMBER_KEY if _PAGE_NUMBER.match(key) else key
+
+def _edge_lines(page, edge_lines):
+    """
+    Returns the indexes of the first and last ``edge_lines`` non-empty lines of a page.
+    """
+    indexes = [i for i, line in enumerate(page) if line]
+    return set(indexes[:edge_lines] + indexes[-edge_lines:]) if edge_lines else set()
+
+def _remove_furniture(pages, edge_lines, min_share):
+    """
+    Removes the headers, footers and page numbers repeated at the edges of the pages.
+
+    A line is furniture when it is found at the edges of ``min_share`` of the pages,
+    numbers aside. Headers and footers keep their first occurrence, page numbers are
+    all removed.
+
+    Returns:
+        tuple: The pages without furniture and the number of lines removed.
+    """
+    if len(pages) < 2:
+        return pages, 0
+    edges = [_edge_lines(page, edge_lines) for page in pages]
+    page_counts = {}
+    for page, indexes in zip(pages, edges):
+        for key in {_furniture_key(page[i]) for i in indexes}:
+            page_counts[key] = page_counts.get(key, 0) + 1
+    min_pages = max(2, math.ceil(min_share * len(pages)))
+    furniture = {key for key, count in page_counts.items() if count >= min_pages}
+
+    seen, removed, compacted = set(), 0, []
+    for page, indexes in zip(pages, edges):
+        kept = []
+        for i, line in enumerate(page):
+            key = _furniture_key(line) if i in indexes else None
+            if key in furniture and (key in seen or key == _PAGE_NUMBER_KEY):
+                removed += 1
+                continue
+            if key is not None:
+                seen.add(key)
+            kept.append(line)
+        compacted.append(kept)
+    return compacted, removed
+
+def _remove_duplicates(lines, min_chars):
+    """
+    Removes the long lines repeating the previous non-empty line, e.g. a line
+    extracted twice or carried over a page break.
+
+    Returns:
+        tuple: The lines without duplicates and the number of lines removed.
+    """
+    previous, removed, kept = None, 0, []
+    for line in lines:
+        key = line.strip().casefold()
+        if not key:
+            kept.append(line)
+            continue
+        if min_chars and len(key) >= min_chars and key == previous:
+            removed += 1
+            continue
+        previous = key
+        kept.append(line)
+    return kept, removed
+
+def _collapse_blank_lines(lines):
+    collapsed = []
+    for line in lines:
+        if line or (collapsed and collapsed[-1]):
+            collapsed.append(line)
+    while collapsed and not collapsed[-1]:
+        collapsed.pop()
+    return collapsed
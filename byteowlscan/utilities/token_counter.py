@@ -0,0 +1,51 @@
+import functools
+import logging
+
+from byteowlscan.utilities.app_config import AppConfig
+
+# Set up logging configuration
+logger = logging.getLogger(__name__)
+
+# Average characters per token, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model):
+    """
+    Loads the tiktoken encoding of an OpenAI model once per process.
+
+    Args:
+        model (str): OpenAI model name.
+
+    Returns:
+        tiktoken.Encoding | None: The encoding, or None if tiktoken or its data is unavailable.
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads the encoding on first use; set TIKTOKEN_CACHE_DIR to run offline
+        logger.warning("tiktoken encoding unavailable for %s, estimating tokens from length: %s", model, e)
+        return None
+
+# Function to count the tokens of a text for the target model
+def count_tokens(text, model=None):
+    """
+    Counts the tokens of a text with the tokenizer of the target OpenAI model.
+
+    Args:
+        text (str): Text to count.
+        model (str): OpenAI model name, defaults to ``OPENAI_MODEL``.
+
+    Returns:
+        int: Number of tokens (estimated from the length if no tokenizer is available).
+    """
+    if not text:
+        return 0
+    encoding = get_encoding(model or AppConfig.get("OPENAI_MODEL", "gpt-4o-mini"))
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
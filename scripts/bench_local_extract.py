@@ -0,0 +1,114 @@
+"""Measure what the local extraction tier saves on a sample corpus.
+
+Parses and compacts each resume, runs the local pre-extractor on it and compares
+the extraction request with and without it: prompt tokens, fields filled locally
+and the time spent. With ``--live``, both requests are also sent to the
+configured OpenAI API, and their prompt and completion tokens and latency are
+compared. Without ``--corpusDir``, synthetic resumes are generated as in
+``bench_pipeline.py``.
+
+    python scripts/bench_local_extract.py --config config.yaml --corpusDir resumes/ --output local.json
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import types
+
+from bench_pipeline import generate_corpus
+
+from byteowlscan.models import extract_gpt
+from byteowlscan.utilities import AppConfig, app_utilities, local_extract, text_compaction, token_counter
+
+
+def request_tokens(request):
+    return sum(token_counter.count_tokens(message["content"], request["model"]) for message in request["messages"])
+
+
+def send(request):
+    import openai
+    started = time.perf_counter()
+    response = openai.ChatCompletion.create(**request)
+    return response["usage"], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the savings of the local extraction tier.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--corpusDir", help="Use existing resumes instead of generating them")
+    parser.add_argument("--files", type=int, default=30, help="Number of synthetic resumes")
+    parser.add_argument("--maxPages", type=int, default=3, help="Maximum pages per synthetic resume")
+    parser.add_argument("--live", action="store_true", help="Also send both requests to the OpenAI API")
+    parser.add_argument("--output", help="Machine-readable results file")
+    args = parser.parse_args()
+
+    AppConfig.init_config(args.config)
+    corpus_dir = args.corpusDir
+    if not corpus_dir:
+        corpus_dir = tempfile.mkdtemp(prefix="byteowlscan-local-")
+        generate_corpus(corpus_dir, args.files, args.maxPages)
+    if args.live:
+        import openai
+        openai.api_key = AppConfig.get("OPENAI_API_KEY")
+        openai.api_base = AppConfig.get("OPENAI_API_BASE", openai.api_base)
+    pipeline_args = types.SimpleNamespace(model=None, maxTokens=AppConfig.get("OPENAI_MAX_TOKENS"))
+
+    rows = []
+    print(f"{'file':<32} {'fields':>6} {'lines':>6} {'prompt':>8} {'local':>8} {'saved %':>8} {'ms':>7}")
+    for path in app_utilities.get_all_file_paths(corpus_dir):
+        try:
+            text = text_compaction.compact_text(app_utilities.parse_resume(path))[0]
+        except Exception:
+            # Unsupported or unreadable file
+            continue
+        started = time.perf_counter()
+        _, residual, stats = local_extract.pre_extract(text)
+        local_ms = 1000 * (time.perf_counter() - started)
+        full_request = extract_gpt.build_extract_request(text, pipeline_args)
+        residual_request = extract_gpt.build_extract_request(residual, pipeline_args)
+        row = {
+            "file": path,
+            "fields": stats["fields"],
+            "lines_removed": stats["lines_removed"],
+            "prompt_tokens": request_tokens(full_request),
+            "local_prompt_tokens": request_tokens(residual_request),
+            "max_tokens": full_request["max_tokens"],
+            "local_max_tokens": residual_request["max_tokens"],
+            "local_ms": local_ms,
+        }
+        if args.live:
+            row["usage"], row["seconds"] = send(full_request)
+            row["local_usage"], row["local_seconds"] = send(residual_request)
+        rows.append(row)
+        saved = row["prompt_tokens"] - row["local_prompt_tokens"]
+        print(f"{os.path.basename(path)[:32]:<32} {len(row['fields']):>6} {row['lines_removed']:>6} "
+              f"{row['prompt_tokens']:>8} {row['local_prompt_tokens']:>8} "
+              f"{100 * saved / (row['prompt_tokens'] or 1):>8.1f} {local_ms:>7.2f}")
+
+    if not rows:
+        return
+    summary = {
+        "files": len(rows),
+        "fields_per_file": statistics.mean(len(row["fields"]) for row in rows),
+        "prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+        "local_prompt_tokens": sum(row["local_prompt_tokens"] for row in rows),
+        "max_tokens": sum(row["max_tokens"] for row in rows),
+        "local_max_tokens": sum(row["local_max_tokens"] for row in rows),
+        "local_ms_p50": statistics.median(row["local_ms"] for row in rows),
+    }
+    if args.live:
+        for key in ("prompt_tokens", "completion_tokens"):
+            summary[f"live_{key}"] = sum(row["usage"][key] for row in rows)
+            summary[f"live_local_{key}"] = sum(row["local_usage"][key] for row in rows)
+        summary["live_seconds_p50"] = statistics.median(row["seconds"] for row in rows)
+        summary["live_local_seconds_p50"] = statistics.median(row["local_seconds"] for row in rows)
+    print(json.dumps(summary, indent=4))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"summary": summary, "files": rows}, output_file, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
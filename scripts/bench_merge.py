@@ -0,0 +1,116 @@
+"""Benchmark the chunk JSON merge on synthetic overlapping chunks.
+
+Compares ``JsonMerger`` with the previous recursive ``merge_json_data``.
+
+    python scripts/bench_merge.py --chunks 100 --repeat 5
+"""
+import argparse
+import copy
+import random
+import time
+
+from byteowlscan.utilities.json_merge import JsonMerger
+
+
+def legacy_is_empty_or_null(obj):
+    if isinstance(obj, dict):
+        return all(legacy_is_empty_or_null(v) for v in obj.values())
+    if isinstance(obj, list):
+        return all(legacy_is_empty_or_null(v) for v in obj)
+    return obj is None or obj == ""
+
+
+def legacy_merge_json_data(final_data, chunk_data):
+    """The recursive merge used before JsonMerger, kept as the baseline."""
+    if not isinstance(chunk_data, dict):
+        return final_data
+    for key, value in chunk_data.items():
+        if legacy_is_empty_or_null(value):
+            continue
+        if key in final_data:
+            if isinstance(final_data[key], list) and isinstance(value, list):
+                final_data[key].extend([v for v in value if not legacy_is_empty_or_null(v)])
+            elif isinstance(final_data[key], dict) and isinstance(value, dict):
+                final_data[key] = legacy_merge_json_data(final_data[key], value)
+            else:
+                if final_data[key] != value:
+                    final_data[key] = [final_data[key], value] if not isinstance(final_data[key], list) else final_data[key] + [value]
+        else:
+            final_data[key] = value
+    return final_data
+
+
+def make_chunks(count, seed=0):
+    """Builds chunks whose work experience, education and skills overlap with the previous chunk."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        jobs = [{
+            "company": f"Công ty {j}",
+            "role": "Kỹ sư phần mềm",
+            "duration": f"{2000 + j} - {2001 + j}",
+            "salary": "",
+            "responsibilities": [f"Nhiệm vụ {j}.{k}" for k in range(8)],
+        } for j in (i, i + 1)]
+        chunks.append({
+            "candidateInformation": {
+                "fullName": "Nguyễn Văn A",
+                "phone": f"09{rng.randint(10000000, 99999999)}" if i % 10 == 0 else "",
+                "email": None,
+            },
+            "workExperience": jobs,
+            "education": [{"degree": "Cử nhân", "university": f"Đại học {i % 3}"}],
+            "skills": {"technicalSkills": [f"skill-{i % 7}", f"skill-{(i + 1) % 7}"], "softSkills": []},
+            "projects": [{"name": f"Dự án {i}", "description": "x" * 200}],
+            "otherContent": {},
+        })
+    return chunks
+
+
+def bench(fn, chunks, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        data = copy.deepcopy(chunks)
+        started = time.perf_counter()
+        result = fn(data)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run_legacy(chunks):
+    final_data = {}
+    for chunk in chunks:
+        final_data = legacy_merge_json_data(final_data, chunk)
+    return final_data
+
+
+def run_merger(chunks, policy="union"):
+    merger = JsonMerger(policies={}, default_policy=policy)
+    for chunk in chunks:
+        merger.add(chunk)
+    return merger.result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chunk JSON merge.")
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    legacy_seconds, legacy = bench(run_legacy, chunks, args.repeat)
+    merger_seconds, merged = bench(run_merger, chunks, args.repeat)
+    concat_seconds, concat = bench(lambda data: run_merger(data, "concat"), chunks, args.repeat)
+
+    print(f"chunks: {args.chunks}")
+    print(f"legacy merge_json_data: {legacy_seconds * 1000:.2f} ms, "
+          f"{len(legacy['workExperience'])} work experience entries")
+    print(f"JsonMerger (union):     {merger_seconds * 1000:.2f} ms, "
+          f"{len(merged['workExperience'])} work experience entries")
+    print(f"JsonMerger (concat):    {concat_seconds * 1000:.2f} ms, "
+          f"{len(concat['workExperience'])} work experience entries")
+
+
+if __name__ == "__main__":
+    main()
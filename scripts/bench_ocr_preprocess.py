@@ -0,0 +1,124 @@
+"""Benchmark OCR with and without image preprocessing.
+
+Generates synthetic phone-photo resumes (large, colored, tilted and noisy; every
+other one saved as a JPEG tagged 72 dpi, as cameras do) or uses the images of
+``--corpusDir``, and reports for each the preprocessing time, the
+pixel count, the OCR seconds and the characters recognized, raw versus
+preprocessed. For generated images the share of the original words recovered
+is reported too. OCR is skipped when Tesseract is not installed.
+
+    python scripts/bench_ocr_preprocess.py --config config.yaml --files 5
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from bench_pipeline import ascii_text, resume_lines
+
+from byteowlscan.models import image_preprocess, ocr_backends
+from byteowlscan.utilities import AppConfig
+
+
+def make_photo(index, size=(3000, 4000), angle=3.0):
+    """Renders a resume page as a 12 MP color photo: tilted, unevenly lit and noisy."""
+    rng = np.random.default_rng(index)
+    lines = [ascii_text(line) for line in resume_lines(index, 2)]
+    page = Image.new("RGB", size, (245, 240, 228))
+    draw = ImageDraw.Draw(page)
+    try:
+        font = ImageFont.load_default(size=48)
+    except TypeError:
+        font = ImageFont.load_default()
+    for i, line in enumerate(lines):
+        draw.text((200, 200 + 70 * i), line, fill=(30, 30, 40), font=font)
+    page = page.rotate(angle, resample=Image.BICUBIC, fillcolor=(120, 110, 100))
+
+    pixels = np.asarray(page, dtype=np.float32)
+    lighting = np.linspace(0.8, 1.05, size[0], dtype=np.float32)[None, :, None]
+    pixels = pixels * lighting + rng.normal(0, 8, pixels.shape).astype(np.float32)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)), " ".join(lines)
+
+
+def as_camera_jpeg(image):
+    """Saves an image the way a phone camera does: JPEG tagged 72 dpi whatever its size.
+
+    Returns a function opening it, as preprocessing decodes JPEGs at reduced size in place.
+    """
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=90, dpi=(72, 72))
+    return lambda: Image.open(io.BytesIO(output.getvalue()))
+
+
+def word_recall(text, truth):
+    words = set(truth.split())
+    return len(words & set(text.split())) / len(words) if words else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR image preprocessing.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--files", type=int, default=5, help="Number of synthetic photos")
+    parser.add_argument("--corpusDir", help="Use existing images instead of generating them")
+    parser.add_argument("--source", default="image", help="Preprocessing settings to use (image or pdf)")
+    args = parser.parse_args()
+
+    AppConfig.init_config(args.config)
+    if args.corpusDir:
+        # Functions opening each image, so the raw and the preprocessed runs each get their own
+        samples = [(lambda path=os.path.join(args.corpusDir, name): Image.open(path), None)
+                   for name in sorted(os.listdir(args.corpusDir)) if name.lower().endswith((".png", ".jpg", ".jpeg"))]
+    else:
+        samples = [make_photo(i, angle=random.Random(i).uniform(-4, 4)) for i in range(args.files)]
+        samples = [(as_camera_jpeg(image) if i % 2 else lambda image=image: image, truth)
+                   for i, (image, truth) in enumerate(samples)]
+
+    run_ocr = shutil.which("tesseract") is not None
+    if not run_ocr:
+        print("tesseract not found, reporting preprocessing only")
+
+    totals = {"preprocess": 0.0, "raw_ocr": 0.0, "ocr": 0.0, "raw_chars": 0, "chars": 0}
+    print(f"{'#':>3} {'raw MP':>7} {'prep MP':>8} {'prep s':>7} {'raw ocr s':>10} {'ocr s':>7} {'raw chars':>10} {'chars':>7} {'recall':>12}")
+    for i, (open_image, truth) in enumerate(samples):
+        image = open_image()
+        started = time.perf_counter()
+        prepared = image_preprocess.preprocess(open_image(), args.source)
+        preprocess_seconds = time.perf_counter() - started
+        totals["preprocess"] += preprocess_seconds
+
+        raw_seconds = seconds = raw_text = text = None
+        if run_ocr:
+            started = time.perf_counter()
+            raw_text = ocr_backends.image_to_string(image)
+            raw_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            text = ocr_backends.image_to_string(prepared)
+            seconds = time.perf_counter() - started
+            totals["raw_ocr"] += raw_seconds
+            totals["ocr"] += seconds
+            totals["raw_chars"] += len(raw_text.strip())
+            totals["chars"] += len(text.strip())
+
+        recall = ""
+        if run_ocr and truth:
+            recall = f"{word_recall(raw_text, truth):.2f}->{word_recall(text, truth):.2f}"
+        print(f"{i:>3} {image.width * image.height / 1e6:>7.1f} {prepared.width * prepared.height / 1e6:>8.1f} "
+              f"{preprocess_seconds:>7.2f} {raw_seconds or 0:>10.2f} {seconds or 0:>7.2f} "
+              f"{len(raw_text.strip()) if raw_text else 0:>10} {len(text.strip()) if text else 0:>7} {recall:>12}")
+
+    pages = len(samples) or 1
+    print(f"\nper page: preprocess {totals['preprocess'] / pages:.2f}s", end="")
+    if run_ocr:
+        print(f", OCR raw {totals['raw_ocr'] / pages:.2f}s -> {(totals['preprocess'] + totals['ocr']) / pages:.2f}s "
+              f"with preprocessing, characters {totals['raw_chars']} -> {totals['chars']}")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    main()
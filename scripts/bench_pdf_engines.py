@@ -0,0 +1,73 @@
+"""Benchmark the PDF text engines in pages/sec.
+
+Generates synthetic text PDFs (or uses ``--corpusDir``) and extracts them with
+each registered engine. PyMuPDF is measured serially and with per-page
+parallelism. The OCR engine is skipped when Tesseract is not installed.
+
+    python scripts/bench_pdf_engines.py --config config.yaml --files 5 --pages 40
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from bench_pipeline import resume_lines, write_pdf
+
+from byteowlscan.models import ocr_backends, pdf_engines
+from byteowlscan.utilities import AppConfig
+
+
+def bench_engine(name, pdf_paths, repeat):
+    best = float("inf")
+    pages = chars = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [pdf_engines.get_engine(name)(path) for path in pdf_paths]
+        best = min(best, time.perf_counter() - started)
+        pages = sum(len(result) for result in results)
+        chars = sum(len(text) for result in results for text in result.values())
+    return best, pages, chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text engines.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--files", type=int, default=5, help="Number of synthetic PDFs")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per synthetic PDF")
+    parser.add_argument("--corpusDir", help="Use existing PDFs instead of generating them")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    AppConfig.init_config(args.config)
+    if args.corpusDir:
+        pdf_paths = [os.path.join(args.corpusDir, name) for name in sorted(os.listdir(args.corpusDir))
+                     if name.lower().endswith(".pdf")]
+    else:
+        corpus_dir = tempfile.mkdtemp(prefix="byteowlscan-pdf-bench-")
+        pdf_paths = []
+        for i in range(args.files):
+            path = os.path.join(corpus_dir, f"resume_{i:04d}.pdf")
+            # resume_lines yields about 15 lines per page of content, 45 lines per PDF page
+            write_pdf(path, resume_lines(i, args.pages * 3))
+            pdf_paths.append(path)
+
+    runs = [("pymupdf (serial)", "pymupdf", {"PDF_WORKERS": 1}),
+            ("pymupdf (parallel)", "pymupdf", {"PDF_WORKERS": os.cpu_count() or 1, "PDF_PARALLEL_MIN_PAGES": 1}),
+            ("pdfminer", "pdfminer", {})]
+    if shutil.which("tesseract"):
+        runs.append(("ocr", "ocr", {}))
+    else:
+        print("tesseract not found, skipping the ocr engine")
+
+    print(f"{'engine':<20} {'pages':>7} {'seconds':>9} {'pages/s':>9} {'chars':>9}")
+    for label, name, overrides in runs:
+        for key, value in overrides.items():
+            AppConfig.set(key, value)
+        seconds, pages, chars = bench_engine(name, pdf_paths, 1 if name == "ocr" else args.repeat)
+        print(f"{label:<20} {pages:>7} {seconds:>9.3f} {pages / seconds:>9.1f} {chars:>9}")
+    ocr_backends.shutdown_ocr_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""End-to-end benchmark of the resume pipeline against a local fake OpenAI server.
+
+Generates synthetic PDF, DOCX and PNG resumes of varying size, runs
+``process_resume`` on them and writes the per-stage timings collected by
+``byteowlscan.utilities.metrics``, files/sec, p50/p95 latency and peak RSS to a
+JSON file, so results can be compared between versions.
+
+    python scripts/bench_pipeline.py --config config.yaml --files 30 --latency 0.2 --output bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import unicodedata
+
+import openai
+
+# Run from a checkout, where the fake OpenAI server lives with the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byteowlscan import main as byteowlscan_main
+from byteowlscan.utilities import AppConfig, app_utilities, initArgs, metrics
+from tests.fake_openai_server import FakeOpenAIServer
+
+STAGES = ("parse", "ocr", "compact", "local", "preprocess", "chunk", "extract", "merge", "save")
+
+SECTIONS = {
+    "Thông tin cá nhân": ["Họ và tên: Nguyễn Văn {n}", "Email: nguyenvan{n}@example.com", "Điện thoại: 09{phone}",
+                          "Địa chỉ: {n} Lê Lợi, Quận 1, TP. Hồ Chí Minh"],
+    "Học vấn": ["Cử nhân Công nghệ thông tin - Đại học Bách Khoa ({year})"],
+    "Kinh nghiệm làm việc": ["Công ty {company} - Kỹ sư phần mềm ({year} - Hiện tại)",
+                             "- Phát triển và bảo trì hệ thống quản lý nhân sự",
+                             "- Tối ưu hiệu năng truy vấn cơ sở dữ liệu"],
+    "Kỹ năng": ["Python, SQL, Docker, Kubernetes", "Tiếng Anh: IELTS 7.0"],
+}
+
+
+def resume_lines(index, pages):
+    rng = random.Random(index)
+    lines = []
+    for page in range(pages):
+        for title, templates in SECTIONS.items():
+            lines.append(title.upper())
+            for template in templates:
+                lines.append(template.format(n=index, phone=rng.randint(10000000, 99999999),
+                                             year=2010 + rng.randint(0, 12), company=f"ABC{page}"))
+            lines.append("")
+    return lines
+
+
+def ascii_text(text):
+    # The base-14 PDF fonts have no Vietnamese glyphs
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)).replace("đ", "d").replace("Đ", "D")
+
+
+def write_pdf(path, lines, lines_per_page=45):
+    import fitz
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 60), "\n".join(ascii_text(line) for line in lines[start:start + lines_per_page]), fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(path, lines):
+    from docx import Document
+    doc = Document()
+    for line in lines:
+        if line.isupper():
+            doc.add_heading(line, level=2)
+        else:
+            doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_png(path, lines):
+    from PIL import Image, ImageDraw
+    image = Image.new("L", (1240, 40 + 22 * len(lines)), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((40, 20 + 22 * i), ascii_text(line), fill=0)
+    image.save(path)
+
+
+def generate_corpus(directory, files, max_pages):
+    """Writes a mix of PDF, DOCX and PNG resumes of 1 to ``max_pages`` pages."""
+    writers = (("pdf", write_pdf), ("docx", write_docx), ("png", write_png))
+    for i in range(files):
+        extension, writer = writers[i % len(writers)]
+        pages = 1 + i % max_pages
+        writer(os.path.join(directory, f"resume_{i:04d}.{extension}"), resume_lines(i, pages))
+
+
+def stage_summary():
+    """Returns the total seconds and calls of each stage recorded by the metrics layer."""
+    stages = {stage: {"seconds": 0.0, "calls": 0} for stage in STAGES}
+    for histogram in metrics.to_json()["histograms"]:
+        stage = histogram["labels"].get("stage")
+        if histogram["name"] == "stage_seconds" and stage in stages:
+            stages[stage] = {"seconds": histogram["sum"], "calls": histogram["count"]}
+    return stages
+
+
+def token_summary():
+    """Returns the prompt, cached prompt and completion tokens reported by the API."""
+    totals = {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+    for counter in metrics.to_json()["counters"]:
+        name = counter["name"][:-len("_total")]
+        if counter["name"].endswith("_total") and name in totals:
+            totals[name] += counter["value"]
+    return totals
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline end to end.")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--files", type=int, default=30, help="Number of synthetic resumes")
+    parser.add_argument("--maxPages", type=int, default=3, help="Maximum pages per resume")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latency of the fake OpenAI server in seconds")
+    parser.add_argument("--corpusDir", help="Use existing resumes instead of generating them")
+    parser.add_argument("--output", default="bench_results.json", help="Machine-readable results file")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results, e.g. a git revision")
+    bench_args, pipeline_argv = parser.parse_known_args()
+
+    AppConfig.init_config(bench_args.config)
+    work_dir = tempfile.mkdtemp(prefix="byteowlscan-bench-")
+    corpus_dir = bench_args.corpusDir or os.path.join(work_dir, "corpus")
+    output_dir = os.path.join(work_dir, "outputs")
+    os.makedirs(output_dir)
+    if not bench_args.corpusDir:
+        os.makedirs(corpus_dir)
+        generate_corpus(corpus_dir, bench_args.files, bench_args.maxPages)
+    AppConfig.set("APP_RESULT_FILEPATH", output_dir)
+    AppConfig.set("METRICS_ENABLED", True)
+
+    # Remaining arguments go to the pipeline, e.g. --enableChunk=True
+    args = initArgs(["--directoryPath", corpus_dir] + pipeline_argv)
+    files = app_utilities.get_all_file_paths(corpus_dir)
+
+    with FakeOpenAIServer(latency=bench_args.latency) as server:
+        openai.api_key = "fake"
+        openai.api_base = server.url
+        metrics.enable()
+        started = time.perf_counter()
+        byteowlscan_main.process_resume(args)
+        wall_seconds = time.perf_counter() - started
+        # Requests sent one by one, or inside batches with --batchMode=True
+        requests = server.request_count + server.batch_request_count
+
+    results = {
+        "label": bench_args.label,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "files": len(files),
+        "pipeline_args": pipeline_argv,
+        "fake_latency_seconds": bench_args.latency,
+        "wall_seconds": wall_seconds,
+        "files_per_second": len(files) / wall_seconds if wall_seconds else None,
+        "latency_seconds": {
+            "p50": metrics.quantile("resume_seconds", 0.50),
+            "p95": metrics.quantile("resume_seconds", 0.95),
+        },
+        # Summed over threads and workers, so stages can add up to more than the wall time
+        "stages": stage_summary(),
+        "api_requests": requests,
+        "tokens": token_summary(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(bench_args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=4)
+    print(json.dumps(results, ensure_ascii=False, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Report the tokens saved by text compaction, per document.
+
+Parses each resume (files or directories given as arguments), compacts its
+text, and prints the tokens before and after, the lines removed and the
+``max_tokens`` reserved for the extraction answer, fixed versus sized from
+the input. No API call is made.
+
+    python scripts/compaction_report.py --config config.yaml resumes/ --json compaction.json
+"""
+import argparse
+import json
+import os
+
+from byteowlscan.models import extract_gpt
+from byteowlscan.utilities import AppConfig, app_utilities, text_compaction
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the tokens saved by text compaction.")
+    parser.add_argument("paths", nargs="+", help="Resume files or directories")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--json", help="Also write the per-document report to this JSON file")
+    args = parser.parse_args()
+
+    AppConfig.init_config(args.config)
+    files = []
+    for path in args.paths:
+        files.extend(app_utilities.get_all_file_paths(path) if os.path.isdir(path) else [path])
+
+    max_tokens = AppConfig.get("OPENAI_MAX_TOKENS")
+    rows = []
+    print(f"{'file':<40} {'tokens':>8} {'compact':>8} {'saved %':>8} {'furniture':>10} {'dupes':>6} {'max_tokens':>16}")
+    for path in files:
+        try:
+            text = app_utilities.parse_resume(path)
+        except Exception:
+            # Unsupported or unreadable file
+            continue
+        compacted, stats = text_compaction.compact_text(text)
+        saved = stats["tokens_before"] - stats["tokens_after"]
+        row = dict(stats, file=path, tokens_saved=saved,
+                   max_tokens=max_tokens, dynamic_max_tokens=extract_gpt.output_token_budget(compacted, max_tokens))
+        rows.append(row)
+        print(f"{os.path.basename(path)[:40]:<40} {stats['tokens_before']:>8} {stats['tokens_after']:>8} "
+              f"{100 * saved / (stats['tokens_before'] or 1):>8.1f} {stats['furniture_lines']:>10} "
+              f"{stats['duplicate_lines']:>6} {max_tokens or 0:>7} -> {row['dynamic_max_tokens'] or 0:>6}"
+              f"{'  (truncated)' if stats['truncated'] else ''}")
+
+    if rows:
+        before = sum(row["tokens_before"] for row in rows)
+        after = sum(row["tokens_after"] for row in rows)
+        reserved = sum(row["dynamic_max_tokens"] or 0 for row in rows)
+        print(f"\n{len(rows)} documents: {before} -> {after} input tokens ({100 * (before - after) / (before or 1):.1f}% saved), "
+              f"{(max_tokens or 0) * len(rows)} -> {reserved} output tokens reserved")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Summarize the runs recorded in a run manifest.
+
+Prints the throughput and failure rate of each run, and the failed files of the
+last run (or of ``--run``).
+
+    python scripts/manifest_report.py outputs/manifest.sqlite3 --json report.json
+"""
+import argparse
+import json
+
+from byteowlscan.utilities.run_manifest import RunManifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the runs of a run manifest.")
+    parser.add_argument("manifest", help="Path of the manifest, e.g. outputs/manifest.sqlite3")
+    parser.add_argument("--run", type=int, help="Run whose failures are listed (default: the last one)")
+    parser.add_argument("--json", help="Also write the summaries to this JSON file")
+    args = parser.parse_args()
+
+    manifest = RunManifest(args.manifest)
+    summaries = [manifest.summary(run_id) for run_id in manifest.run_ids()]
+    if not summaries:
+        print("No runs recorded.")
+        return
+
+    print(f"{'run':>5} {'total':>7} {'ok':>7} {'failed':>7} {'skipped':>7} {'wall s':>9} {'files/s':>8} {'fail %':>7}")
+    for summary in summaries:
+        print(f"{summary['run_id']:>5} {summary['total']:>7} {summary['succeeded']:>7} {summary['failed']:>7} "
+              f"{summary['skipped']:>7} {summary['wall_seconds']:>9.1f} {summary['files_per_second'] or 0:>8.2f} "
+              f"{100 * (summary['failure_rate'] or 0):>7.1f}{'' if summary['finished'] else '  (interrupted)'}")
+
+    run_id = args.run or summaries[-1]["run_id"]
+    failures = manifest.failures(run_id)
+    if failures:
+        print(f"\nFailed files in run {run_id}:")
+        for path, error in failures:
+            print(f"  {path}: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output_file:
+            json.dump(summaries, output_file, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from byteowlscan.server import serve
+
+if __name__ == "__main__":
+    serve()
\ No newline at end of file
@@ -18,4 +18,6 @@ setup(
     ],
     python_requires='>=3.6',
     install_requires=["pyyaml"],  # Add dependencies here if any
+    # OCR_BACKEND: "tesserocr" needs the Tesseract and Leptonica headers to build: pip install byteowlscan[tesserocr]
+    extras_require={"tesserocr": ["tesserocr"]},
 )
@@ -0,0 +1,40 @@
+import openai
+import pytest
+
+from byteowlscan.models import gpt_scheduler
+from byteowlscan.utilities import AppConfig, result_cache
+from tests.fake_openai_server import FakeOpenAIServer
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    """A minimal configuration, with the result cache inside the test directory."""
+    monkeypatch.setattr(AppConfig, "config", {
+        "OPENAI_MODEL": "gpt-4o-mini",
+        "OPENAI_MAX_TOKENS": 4096,
+        "OPENAI_TEMPERATURE": 0,
+        "OPENAI_MIN_MAX_TOKENS": 256,
+        "CACHE_ENABLED": False,
+        "CACHE_DIR": str(tmp_path / "cache"),
+        "APP_RESULT_FILEPATH": str(tmp_path / "outputs"),
+    })
+    monkeypatch.setattr(result_cache, "_cache", None)
+    return AppConfig.config
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """A process-wide GPT scheduler without rate budgets that retries quickly."""
+    scheduler = gpt_scheduler.GPTScheduler(max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    monkeypatch.setattr(gpt_scheduler, "_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Starts a fake OpenAI server and points the openai client at it."""
+    server = FakeOpenAIServer(retry_after=0.01)
+    monkeypatch.setattr(openai, "api_base", server.url)
+    monkeypatch.setattr(openai, "api_key", "sk-test")
+    with server:
+        yield server
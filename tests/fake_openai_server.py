@@ -0,0 +1,334 @@
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONTENT = json.dumps({
+    "candidateInformation": {
+        "fullName": "Nguyễn Văn A",
+        "email": "nguyenvana@example.com"
+    }
+}, ensure_ascii=False)
+
+class FakeOpenAIServer:
+    """
+    Local OpenAI-compatible HTTP server for tests and benchmarks.
+
+    It answers ``POST /v1/chat/completions`` with a canned completion after a
+    configurable latency, streamed as server-sent events when the request sets
+    ``stream``; answers longer than ``max_tokens`` (4 characters a token) are cut
+    with ``finish_reason`` ``length``, and prompt prefixes seen before are reported
+    in ``usage.prompt_tokens_details.cached_tokens``, like the API prompt cache. It
+    also stores uploaded files (``/v1/files``) and runs batches of chat completions
+    (``/v1/batches``), which complete ``batch_latency`` seconds after their creation. Point the client at it with ``openai.api_base = server.url``::
+
+        with FakeOpenAIServer(latency=0.05) as server:
+            openai.api_base = server.url
+            ...
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, content=DEFAULT_CONTENT, rate_limit_every=0,
+                 retry_after=0.1, batch_latency=0.0):
+        """
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to bind, 0 picks a free port.
+            latency (float): Seconds to wait before answering each request.
+            content (str | callable): Completion content, or a function ``content(request_body) -> str``.
+            rate_limit_every (int): Answer every n-th request with a 429, 0 never does.
+            retry_after (float): ``Retry-After`` seconds sent with the 429 responses.
+            batch_latency (float): Seconds a batch stays in progress before completing.
+        """
+        self.latency = latency
+        self.content = content
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.batch_latency = batch_latency
+        self.request_count = 0
+        self.batch_request_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {}
+        self.batches = {}
+        self._prefixes = set()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the fake API, suitable for ``openai.api_base``."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def completion(self, body):
+        """Builds the chat completion returned for a request body."""
+        content = self.content(body) if callable(self.content) else self.content
+        prompt_chars = sum(len(message.get("content") or "") for message in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4
+        cached_tokens = self.cached_tokens(body)
+        finish_reason = "stop"
+        if body.get("max_tokens") and len(content) > body["max_tokens"] * 4:
+            content, finish_reason = content[:body["max_tokens"] * 4], "length"
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-fake-{self.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    def cached_tokens(self, body):
+        """
+        Simulates prompt caching: returns the tokens of the longest prompt prefix seen
+        before, counted like the API (1024 tokens at least, then steps of 128).
+        """
+        prompt = "\x00".join(message.get("content") or "" for message in body.get("messages", []))
+        # 4 characters a token
+        prefixes = [hash(prompt[:end]) for end in range(1024 * 4, len(prompt) + 1, 128 * 4)]
+        with self._lock:
+            cached = 0
+            for n, prefix in enumerate(prefixes):
+                if prefix not in self._prefixes:
+                    break
+                cached = 1024 + 128 * n
+            self._prefixes.update(prefixes)
+        return cached
+
+    def completion_chunks(self, body):
+        """Splits the chat completion of a request body into streamed chunks of about one token."""
+        completion = self.completion(body)
+        choice = completion["choices"][0]
+        content = choice["message"]["content"]
+        header = {key: completion[key] for key in ("id", "created", "model")}
+        chunks = [dict(header, object="chat.completion.chunk",
+                       choices=[{"index": 0, "delta": {"role": "assistant", "content": content[start:start + 4]},
+                                 "finish_reason": None}])
+                  for start in range(0, len(content), 4)]
+        chunks.append(dict(header, object="chat.completion.chunk",
+                           choices=[{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append(dict(header, object="chat.completion.chunk", choices=[], usage=completion["usage"]))
+        return chunks
+
+    def add_file(self, content, purpose, filename="file"):
+        """Stores an uploaded file and returns its file object."""
+        with self._lock:
+            file_id = f"file-fake-{len(self.files) + 1}"
+            self.files[file_id] = {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": filename,
+                "purpose": purpose,
+                "content": content,
+            }
+        return self.file_view(file_id)
+
+    def file_view(self, file_id):
+        return {key: value for key, value in self.files[file_id].items() if key != "content"}
+
+    def create_batch(self, body):
+        """Runs the requests of a batch input file and returns the batch object."""
+        input_file = self.files.get(body.get("input_file_id"))
+        if input_file is None:
+            return None
+        outputs, errors = [], []
+        for line in input_file["content"].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            with self._lock:
+                self.batch_request_count += 1
+                request_number = self.batch_request_count
+            if request.get("url") != body.get("endpoint"):
+                errors.append({"id": f"batch_req_{request_number}", "custom_id": request.get("custom_id"),
+                               "response": None,
+                               "error": {"code": "invalid_url", "message": f"Unsupported url {request.get('url')}"}})
+                continue
+            outputs.append({"id": f"batch_req_{request_number}", "custom_id": request.get("custom_id"),
+                            "response": {"status_code": 200, "request_id": f"req_{request_number}",
+                                         "body": self.completion(request.get("body", {}))},
+                            "error": None})
+
+        def jsonl(records):
+            return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+        with self._lock:
+            batch_id = f"batch_fake_{len(self.batches) + 1}"
+        output_file = self.add_file(jsonl(outputs), "batch_output") if outputs else None
+        error_file = self.add_file(jsonl(errors), "batch_output") if errors else None
+        with self._lock:
+            self.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": body.get("endpoint"),
+                "input_file_id": body["input_file_id"],
+                "completion_window": body.get("completion_window", "24h"),
+                "created_at": time.time(),
+                "cancelled": False,
+                "output_file_id": output_file["id"] if output_file else None,
+                "error_file_id": error_file["id"] if error_file else None,
+                "request_counts": {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)},
+                "metadata": body.get("metadata"),
+            }
+        return self.batch_view(batch_id)
+
+    def batch_view(self, batch_id):
+        """Returns the batch object, in progress until ``batch_latency`` has elapsed."""
+        batch = self.batches[batch_id]
+        view = {key: value for key, value in batch.items() if key != "cancelled"}
+        view["created_at"] = int(batch["created_at"])
+        if batch["cancelled"]:
+            view.update(status="cancelled", output_file_id=None, error_file_id=None)
+        elif time.time() - batch["created_at"] < self.batch_latency:
+            view.update(status="in_progress", output_file_id=None, error_file_id=None,
+                        request_counts=dict(batch["request_counts"], completed=0, failed=0))
+        else:
+            view["status"] = "completed"
+        return view
+
+def _make_handler(server):
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections alive so clients can reuse them
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connection_count += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) >= 3 and parts[-3] == "files" and parts[-1] == "content" and parts[-2] in server.files:
+                self._send_bytes(200, server.files[parts[-2]]["content"], "application/octet-stream")
+            elif parts[-2:-1] == ["files"] and parts[-1] in server.files:
+                self._send_json(200, server.file_view(parts[-1]))
+            elif parts[-2:-1] == ["batches"] and parts[-1] in server.batches:
+                self._send_json(200, server.batch_view(parts[-1]))
+            else:
+                self._send_not_found()
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if parts[-1] == "files":
+                self._upload_file(body)
+                return
+            if parts[-1] == "batches":
+                batch = server.create_batch(json.loads(body or b"{}"))
+                if batch is None:
+                    self._send_not_found()
+                else:
+                    self._send_json(200, batch)
+                return
+            if parts[-1] == "cancel" and parts[-3:-2] == ["batches"] and parts[-2] in server.batches:
+                server.batches[parts[-2]]["cancelled"] = True
+                self._send_json(200, server.batch_view(parts[-2]))
+                return
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                return
+
+            with server._lock:
+                server.request_count += 1
+                rate_limited = server.rate_limit_every and server.request_count % server.rate_limit_every == 0
+            if rate_limited:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                headers={"Retry-After": str(server.retry_after)})
+                return
+            with server._lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                if server.latency:
+                    time.sleep(server.latency)
+                request = json.loads(body or b"{}")
+                if request.get("stream"):
+                    self._send_events(server.completion_chunks(request))
+                else:
+                    self._send_json(200, server.completion(request))
+            finally:
+                with server._lock:
+                    server.in_flight -= 1
+
+        def _upload_file(self, body):
+            # Multipart form sent by openai.File.create: the purpose and the file content
+            message = BytesParser(policy=HTTP).parsebytes(
+                b"Content-Type: " + self.headers.get("Content-Type", "").encode("latin-1") + b"\r\n\r\n" + body)
+            fields = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+            if "file" not in fields:
+                self._send_json(400, {"error": {"message": "Missing file", "type": "invalid_request_error"}})
+                return
+            purpose = fields["purpose"].get_payload(decode=True).decode("utf-8") if "purpose" in fields else ""
+            self._send_json(200, server.add_file(fields["file"].get_payload(decode=True), purpose,
+                                                 fields["file"].get_filename() or "file"))
+
+        def _send_events(self, chunks):
+            # Server-sent events, the end of the body being marked by closing the connection
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for chunk in chunks + ["[DONE]"]:
+                    data = chunk if isinstance(chunk, str) else json.dumps(chunk, ensure_ascii=False)
+                    self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client cancelled the stream
+                pass
+
+        def _send_not_found(self):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+
+        def _send_json(self, status, payload, headers=None):
+            self._send_bytes(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+        def _send_bytes(self, status, data, content_type, headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return FakeOpenAIHandler
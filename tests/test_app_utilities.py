@@ -0,0 +1,108 @@
+import hashlib
+
+import pytest
+
+from byteowlscan.models import extract_model
+from byteowlscan.utilities import app_utilities
+
+PDF = b"%PDF-1.7 a scanned resume"
+
+
+@pytest.fixture
+def extractions(config, monkeypatch):
+    """Replaces the PDF extractor, recording the documents it extracts."""
+    config["CACHE_ENABLED"] = True
+    calls = []
+
+    def extract(source):
+        calls.append(source)
+        return f"text {len(calls)}"
+
+    monkeypatch.setattr(extract_model, "extract_text_from_pdf", extract)
+    return calls
+
+
+def test_parsed_text_carries_the_document_hash(extractions):
+    text = app_utilities.parse_resume(PDF)
+    assert text == "text 1"
+    assert text.sha256 == hashlib.sha256(PDF).hexdigest()
+
+
+def test_text_is_cached_per_document(extractions):
+    assert app_utilities.parse_resume(PDF) == "text 1"
+    assert app_utilities.parse_resume(PDF) == "text 1"
+    assert app_utilities.parse_resume(PDF + b" edited") == "text 2"
+    assert len(extractions) == 2
+
+
+@pytest.mark.parametrize("key, value", [
+    ("PDF_ENGINE", "pdfminer"),
+    ("PDF_OCR_MIN_CHARS", 50),
+    ("OCR_LANG", "eng"),
+    ("OCR_DPI", 200),
+    ("OCR_PREPROCESS", {"pdf": {"enabled": False}}),
+])
+def test_changed_extraction_settings_extract_again(extractions, config, key, value):
+    assert app_utilities.parse_resume(PDF) == "text 1"
+    config[key] = value
+    assert app_utilities.parse_resume(PDF) == "text 2"
+    assert app_utilities.parse_resume(PDF) == "text 2"
+
+
+def test_worker_settings_keep_the_cached_text(extractions, config):
+    assert app_utilities.parse_resume(PDF) == "text 1"
+    config["OCR_WORKERS"] = 8
+    assert app_utilities.parse_resume(PDF) == "text 1"
+
+
+def test_extractor_version_is_part_of_the_key(extractions, monkeypatch):
+    assert app_utilities.parse_resume(PDF) == "text 1"
+    monkeypatch.setattr(extract_model, "EXTRACTOR_VERSION", "test")
+    assert app_utilities.parse_resume(PDF) == "text 2"
+
+
+def test_extraction_errors_propagate_and_are_not_cached(extractions, monkeypatch):
+    def broken(source):
+        raise RuntimeError("damaged xref table")
+
+    monkeypatch.setattr(extract_model, "extract_text_from_pdf", broken)
+    with pytest.raises(RuntimeError, match="damaged xref table"):
+        app_utilities.parse_resume(PDF)
+    monkeypatch.undo()
+    monkeypatch.setattr(extract_model, "extract_text_from_pdf", lambda source: "text")
+    assert app_utilities.parse_resume(PDF) == "text"
+
+
+def test_text_that_reads_like_an_error_is_kept(extractions, monkeypatch):
+    text = "An error occurred in production, I fixed it in an hour"
+    monkeypatch.setattr(extract_model, "extract_text_from_pdf", lambda source: text)
+    assert app_utilities.parse_resume(PDF) == text
+
+
+def test_parsed_text_carries_its_format(extractions):
+    assert app_utilities.parse_resume(PDF).file_format == "pdf"
+    # Also when the text comes from the cache
+    assert app_utilities.parse_resume(PDF).file_format == "pdf"
+
+
+def test_chunking_reuses_the_known_format(config, monkeypatch):
+    def detect_format(document):
+        raise AssertionError("the format is already known")
+
+    monkeypatch.setattr(app_utilities.document_input, "detect_format", detect_format)
+    text = "Kinh nghiệm làm việc. " * 2000
+    assert len(app_utilities.process_text_in_chunks("cv.pdf", text, 1000, "pdf")) > 1
+    parsed = app_utilities.document_input.ParsedText(text, "abc", "docx")
+    assert len(app_utilities.process_text_in_chunks("cv.docx", parsed, 1000)) > 1
+
+
+def test_sections_are_chunked_when_too_long(config):
+    config["SECTION_MIN_TOKENS"] = 50
+    experience = "Backend developer at Example Corp, payment systems. " * 200
+    text = f"Nguyễn Văn An\n\nHỌC VẤN\nĐại học Bách Khoa\n\nKINH NGHIỆM\n{experience}"
+    parts = app_utilities.process_text_in_sections("cv.docx", text, 1000, "docx")
+    sections = [keys for keys, _ in parts]
+    assert sections[-1] == ("candidateInformation", "education")
+    assert len(sections) > 2 and set(sections[:-1]) == {("workExperience",)}
+    assert parts[-1][1] == "Nguyễn Văn An\n\nHỌC VẤN\nĐại học Bách Khoa"
+    assert app_utilities.process_text_in_sections("cv.docx", "Nguyễn Văn An\nBackend developer") == []
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+from byteowlscan.models.async_gpt import AsyncGPTClient
+from byteowlscan.utilities import result_cache
+
+ARGS = SimpleNamespace(model="gpt-4o-mini", maxTokens=None)
+
+
+async def extract_all(texts, **client_options):
+    async with AsyncGPTClient(**client_options) as client:
+        return await asyncio.gather(*(client.extract_information(text, ARGS) for text in texts))
+
+
+def test_extract_information(config, scheduler, fake_openai):
+    [result] = asyncio.run(extract_all(["Nguyễn Văn A\nnguyenvana@example.com"]))
+    assert result == {"candidateInformation": {"fullName": "Nguyễn Văn A", "email": "nguyenvana@example.com"}}
+    assert fake_openai.request_count == 1
+
+
+def test_preprocess(config, scheduler, fake_openai):
+    fake_openai.content = "Nguyễn Văn A"
+
+    async def preprocess():
+        async with AsyncGPTClient() as client:
+            return await client.preprocess("Nguyễn   Văn A")
+
+    assert asyncio.run(preprocess()) == "Nguyễn Văn A"
+
+
+def test_requests_in_flight_are_capped(config, scheduler, fake_openai):
+    fake_openai.latency = 0.05
+    results = asyncio.run(extract_all([f"Resume {n}" for n in range(12)], max_in_flight=3))
+    assert len(results) == 12
+    assert fake_openai.max_in_flight == 3
+
+
+def test_connections_are_reused(config, scheduler, fake_openai):
+    asyncio.run(extract_all([f"Resume {n}" for n in range(20)], max_in_flight=2))
+    assert fake_openai.request_count == 20
+    assert fake_openai.connection_count <= 2
+
+
+def test_rate_limited_requests_are_retried(config, scheduler, fake_openai):
+    fake_openai.rate_limit_every = 3
+    results = asyncio.run(extract_all([f"Resume {n}" for n in range(6)], max_in_flight=2))
+    assert all(isinstance(result, dict) for result in results)
+    assert scheduler.summary()["rate_limited"] >= 2
+    assert scheduler.summary()["requests"] == 6
+
+
+def test_cache_is_used_off_the_event_loop(config, scheduler, fake_openai, monkeypatch):
+    config["CACHE_ENABLED"] = True
+    loop_threads = []
+    for name in ("get", "set"):
+        method = getattr(result_cache.ResultCache, name)
+
+        def record(self, *args, method=method):
+            loop_threads.append(_running_loop() is not None)
+            return method(self, *args)
+
+        monkeypatch.setattr(result_cache.ResultCache, name, record)
+    first = asyncio.run(extract_all(["Nguyễn Văn A"]))
+    second = asyncio.run(extract_all(["Nguyễn Văn A"]))
+    assert first == second
+    assert fake_openai.request_count == 1
+    assert loop_threads and not any(loop_threads)
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
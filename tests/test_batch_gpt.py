@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from byteowlscan.models import batch_gpt
+
+
+def chat_request(text, max_tokens=4096):
+    return {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": text}],
+            "max_tokens": max_tokens, "temperature": 0}
+
+
+REQUESTS = {f"extract-{n}": chat_request(f"Resume {n}") for n in range(3)}
+
+
+@pytest.fixture
+def batch_config(config):
+    config.update(BATCH_POLL_SECONDS=0.01, BATCH_TIMEOUT_HOURS=1)
+    return config
+
+
+def interrupted_run(config, directory):
+    """Submits the requests and stops waiting before their batch completes, like a crashed run."""
+    config["BATCH_TIMEOUT_HOURS"] = 0.05 / 3600
+    with pytest.raises(TimeoutError):
+        batch_gpt.run_batch(REQUESTS, directory, "extract")
+    config["BATCH_TIMEOUT_HOURS"] = 1
+
+
+def test_run_batch(batch_config, scheduler, fake_openai, tmp_path):
+    results = batch_gpt.run_batch(REQUESTS, str(tmp_path), "extract")
+    assert set(results) == set(REQUESTS)
+    for body, error in results.values():
+        assert error is None
+        assert json.loads(body["choices"][0]["message"]["content"])["candidateInformation"]
+    assert len(fake_openai.batches) == 1
+    assert fake_openai.batch_request_count == 3
+
+
+def test_reattaches_to_a_running_batch(batch_config, scheduler, fake_openai, tmp_path):
+    fake_openai.batch_latency = 0.3
+    interrupted_run(batch_config, str(tmp_path))
+
+    results = batch_gpt.run_batch(REQUESTS, str(tmp_path), "extract")
+    assert all(error is None for body, error in results.values())
+    # Waited for the batch of the first run instead of submitting the requests again
+    assert len(fake_openai.batches) == 1
+    assert fake_openai.batch_request_count == 3
+
+
+def test_changed_requests_are_not_reattached(batch_config, scheduler, fake_openai, tmp_path):
+    batch_gpt.run_batch(REQUESTS, str(tmp_path), "extract")
+    changed = dict(REQUESTS, **{"extract-0": chat_request("Resume 0, edited")})
+    results = batch_gpt.run_batch(changed, str(tmp_path), "extract")
+    assert all(error is None for body, error in results.values())
+    assert len(fake_openai.batches) == 2
+    assert fake_openai.batch_request_count == 4
+
+
+def test_resends_a_failed_batch(batch_config, scheduler, fake_openai, tmp_path):
+    fake_openai.batch_latency = 0.3
+    interrupted_run(batch_config, str(tmp_path))
+    for batch in fake_openai.batches.values():
+        batch["cancelled"] = True
+
+    fake_openai.batch_latency = 0
+    results = batch_gpt.run_batch(REQUESTS, str(tmp_path), "extract")
+    assert all(error is None for body, error in results.values())
+    assert len(fake_openai.batches) == 2
+    registry = batch_gpt.load_registry(str(tmp_path))
+    assert sorted(entry["status"] for entry in registry) == ["cancelled", "completed"]
+
+
+def test_answers_cut_by_max_tokens_are_retried(batch_config, scheduler, fake_openai, tmp_path):
+    requests = {request_id: dict(request, max_tokens=8) for request_id, request in REQUESTS.items()}
+    results = batch_gpt.complete_in_batches(requests, str(tmp_path), "extract", 4096)
+    for body, error in results.values():
+        assert error is None
+        assert body["choices"][0]["finish_reason"] == "stop"
+    # One batch for the cut answers, then one retry round with the full budget
+    assert len(fake_openai.batches) == 2
+    assert fake_openai.batch_request_count == 6
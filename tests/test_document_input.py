@@ -0,0 +1,72 @@
+import hashlib
+import io
+import pickle
+import zipfile
+
+import pytest
+from PIL import Image, PngImagePlugin
+
+from byteowlscan.utilities import document_input, output_sink, run_manifest
+
+DATA = b"%PDF-1.7 an uploaded resume"
+
+
+def test_memory_document_is_hashed_from_its_data(tmp_path, monkeypatch):
+    # A file named like the upload in the working directory must not be read
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "cv.pdf").write_bytes(b"another file")
+    document = document_input.MemoryDocument("cv.pdf", DATA)
+
+    assert document_input.document_hash(document) == hashlib.sha256(DATA).hexdigest()
+    record = output_sink.build_record(document, {"a": 1})
+    assert record["source"] == "cv.pdf"
+    assert record["sha256"] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_missing_file_has_no_hash(tmp_path):
+    assert document_input.document_hash(str(tmp_path / "missing.pdf")) is None
+
+
+def test_manifest_records_the_hash_of_a_memory_document(tmp_path):
+    manifest = run_manifest.RunManifest(str(tmp_path / "manifest.sqlite3"))
+    run_id = manifest.start_run(1)
+    manifest.record(run_id, document_input.MemoryDocument("cv.pdf", DATA), run_manifest.SUCCEEDED)
+    manifest.record(run_id, "other.pdf", run_manifest.SUCCEEDED, sha256="given")
+    with manifest._connect() as conn:
+        hashes = dict(conn.execute("SELECT path, sha256 FROM entries"))
+    assert hashes == {"cv.pdf": hashlib.sha256(DATA).hexdigest(), "other.pdf": "given"}
+
+
+def test_parsed_text_pickles_with_its_hash_and_format():
+    text = pickle.loads(pickle.dumps(document_input.ParsedText("Nguyễn Văn A", "abc", "docx")))
+    assert text == "Nguyễn Văn A"
+    assert text.sha256 == "abc"
+    assert text.file_format == "docx"
+
+
+def png_mentioning_pdf():
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Description", "scanned from cv.pdf (%PDF-1.7)")
+    output = io.BytesIO()
+    Image.new("L", (8, 8), 255).save(output, "PNG", pnginfo=info)
+    return output.getvalue()
+
+
+def docx_mentioning_pdf():
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        archive.writestr("customXml/%PDF-export.xml", "<a/>")
+        archive.writestr("word/document.xml", "<w:document/>")
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("data, file_format", [
+    (png_mentioning_pdf(), "image"),
+    (docx_mentioning_pdf(), "docx"),
+    (b"%PDF-1.7 a resume", "pdf"),
+    # PDF readers accept some junk before the header
+    (b"\xef\xbb\xbf\r\n%PDF-1.4 a resume", "pdf"),
+    (b"plain text", None),
+], ids=["png", "docx", "pdf", "pdf-after-junk", "text"])
+def test_formats_are_detected_from_their_signature(data, file_format):
+    assert document_input.detect_format(data) == file_format
@@ -0,0 +1,40 @@
+import pytest
+
+from byteowlscan.models import extract_model, ocr_engine, pdf_engines
+
+PDF = b"%PDF-1.7 a partly scanned resume"
+
+
+@pytest.fixture
+def pages(config, monkeypatch):
+    """A PDF whose second page has no text layer and needs OCR."""
+    pages = {1: "Nguyen Van A", 2: ""}
+    monkeypatch.setattr(pdf_engines, "extract_pdf_pages", lambda source: ("pymupdf", dict(pages)))
+    monkeypatch.setattr(pdf_engines, "pages_needing_ocr", lambda source, pages: [2])
+    return pages
+
+
+def failing_ocr(source, page_numbers=None):
+    raise RuntimeError("tesseract is not installed")
+
+
+def test_ocr_text_fills_the_pages_without_text(pages, monkeypatch):
+    monkeypatch.setattr(ocr_engine, "ocr_pdf_pages", lambda source, page_numbers=None: {2: "Experience"})
+    assert extract_model.extract_text_from_pdf(PDF) == "Nguyen Van A\fExperience"
+
+
+def test_failed_ocr_keeps_the_text_layer(pages, monkeypatch):
+    monkeypatch.setattr(ocr_engine, "ocr_pdf_pages", failing_ocr)
+    assert extract_model.extract_text_from_pdf(PDF) == "Nguyen Van A\f"
+
+
+def test_failed_ocr_without_text_layer_raises(pages, monkeypatch):
+    pages[1] = ""
+    monkeypatch.setattr(ocr_engine, "ocr_pdf_pages", failing_ocr)
+    with pytest.raises(RuntimeError, match="tesseract"):
+        extract_model.extract_text_from_pdf(PDF)
+
+
+def test_unreadable_documents_raise(config):
+    with pytest.raises(Exception):
+        extract_model.extract_text_from_word(b"PK\x03\x04 not a docx")
@@ -0,0 +1,107 @@
+import logging
+
+import openai
+import pytest
+
+from byteowlscan.models import extract_gpt, gpt_scheduler
+
+BUDGET = 100000
+REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Nguyen Van A"}], "max_tokens": 20000}
+RESPONSE = {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 100}}
+
+
+@pytest.fixture
+def budgeted(config):
+    return gpt_scheduler.GPTScheduler(tokens_per_minute=BUDGET, max_retries=3, backoff_base=0.01, backoff_max=0.05)
+
+
+def flaky(errors, response=RESPONSE):
+    """An API call raising ``errors`` in turn, then returning ``response``."""
+    errors = list(errors)
+
+    def call(**request):
+        if errors:
+            raise errors.pop(0)
+        return response
+    return call
+
+
+def chunks(*deltas, usage=None):
+    for delta in deltas:
+        yield {"choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+    if usage:
+        yield {"choices": [], "usage": usage}
+
+
+def test_failed_attempts_are_refunded(budgeted):
+    errors = [openai.error.RateLimitError("slow down"), openai.error.Timeout("timed out")]
+    assert budgeted.call(flaky(errors), REQUEST) == RESPONSE
+    assert budgeted._tokens == pytest.approx(BUDGET - 100, abs=50)
+    assert budgeted.summary()["tokens_used"] == 100
+
+
+def test_final_failure_is_refunded_and_logs_its_attempts(budgeted, caplog):
+    with caplog.at_level(logging.ERROR, logger=gpt_scheduler.__name__):
+        with pytest.raises(openai.error.InvalidRequestError):
+            budgeted.call(flaky([openai.error.InvalidRequestError("bad request", None)] * 5), REQUEST)
+        with pytest.raises(openai.error.RateLimitError):
+            budgeted.call(flaky([openai.error.RateLimitError("slow down")] * 5), REQUEST)
+    assert budgeted._tokens == pytest.approx(BUDGET, abs=50)
+    assert "after 1 attempt (not retryable)" in caplog.records[0].getMessage()
+    assert "after 4 attempts (retryable)" in caplog.records[1].getMessage()
+
+
+def test_streams_without_usage_are_settled_from_their_chunks(budgeted):
+    prompt = budgeted.estimate_prompt_tokens(REQUEST)
+    stream = budgeted.call(lambda **request: chunks("{", "\"a\"", ": 1", "}"), dict(REQUEST, stream=True))
+    # Nothing is settled before the stream ends
+    assert budgeted.summary()["requests"] == 0
+    assert len(list(stream)) == 4
+    assert budgeted.summary()["tokens_used"] == prompt + 4
+    assert budgeted._tokens == pytest.approx(BUDGET - prompt - 4, abs=50)
+
+
+def test_streams_closed_early_are_settled(budgeted):
+    prompt = budgeted.estimate_prompt_tokens(REQUEST)
+    stream = budgeted.call(lambda **request: chunks(*"abcdef"), dict(REQUEST, stream=True))
+    next(stream)
+    next(stream)
+    stream.close()
+    assert budgeted.summary()["tokens_used"] == prompt + 2
+
+
+def test_streams_use_their_usage_when_sent(budgeted):
+    stream = budgeted.call(lambda **request: chunks("{}", usage={"total_tokens": 42}), dict(REQUEST, stream=True))
+    list(stream)
+    assert budgeted.summary()["tokens_used"] == 42
+
+
+def test_cancelled_extraction_stream_is_settled(config, fake_openai, monkeypatch, budgeted):
+    monkeypatch.setattr(gpt_scheduler, "_scheduler", budgeted)
+    fake_openai.content = "{\"summary\": \"" + "word " * 200
+    response = extract_gpt.stream_completion(REQUEST, cancel_after=5)
+    assert response["choices"][0]["finish_reason"] == "cancelled"
+    summary = budgeted.summary()
+    assert summary["requests"] == 1
+    assert summary["tokens_used"] < REQUEST["max_tokens"]
+    assert budgeted._tokens == pytest.approx(BUDGET - summary["tokens_used"], abs=50)
+
+
+def test_requests_over_the_budget_are_refunded_what_was_taken(config):
+    scheduler = gpt_scheduler.GPTScheduler(tokens_per_minute=1000, max_retries=0)
+    # Estimated far above the budget: only the whole bucket is taken
+    assert scheduler.call(flaky([]), REQUEST) == RESPONSE
+    assert scheduler._tokens == pytest.approx(1000 - 100, abs=5)
+
+    scheduler = gpt_scheduler.GPTScheduler(tokens_per_minute=1000, max_retries=0)
+    with pytest.raises(openai.error.InvalidRequestError):
+        scheduler.call(flaky([openai.error.InvalidRequestError("bad request", None)]), REQUEST)
+    assert scheduler._tokens == pytest.approx(1000, abs=5)
+
+
+def test_streams_dropped_unread_are_settled(budgeted):
+    prompt = budgeted.estimate_prompt_tokens(REQUEST)
+    stream = budgeted.call(lambda **request: chunks("{}"), dict(REQUEST, stream=True))
+    del stream
+    assert budgeted.summary()["tokens_used"] == prompt
+    assert budgeted._tokens == pytest.approx(BUDGET - prompt, abs=50)
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw, JpegImagePlugin
+
+from byteowlscan.models import extract_model, image_preprocess, ocr_backends
+
+# Only the resolution steps, the others do not change the size
+RESIZE_ONLY = dict(image_preprocess.DEFAULT_SETTINGS, binarize=False, deskew=False, crop_margins=False)
+
+
+def photo(width=6000, height=4500, dpi=None):
+    """A large JPEG of a text-like page, e.g. a phone photo of a resume."""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for top in range(200, height - 200, 120):
+        draw.rectangle((300, top, width - 300, top + 40), fill="black")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=70, **({"dpi": dpi} if dpi else {}))
+    return output.getvalue()
+
+
+@pytest.fixture
+def drafts(monkeypatch):
+    """Records the scale the JPEG decoder applied on each ``draft`` call, None when it did nothing."""
+    applied = []
+    draft = JpegImagePlugin.JpegImageFile.draft
+
+    def recording_draft(image, mode, size):
+        width = image.width
+        result = draft(image, mode, size)
+        applied.append(width / image.width if result else None)
+        return result
+
+    monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", recording_draft)
+    return applied
+
+
+def test_large_jpeg_is_decoded_at_the_reduced_size(drafts):
+    image = image_preprocess.preprocess(Image.open(io.BytesIO(photo())), settings=RESIZE_ONLY)
+    assert drafts == [2]
+    # An A4 page at 300 dpi
+    assert image.size == (2481, 1861)
+    assert image.mode == "L"
+
+
+def test_dpi_metadata_is_not_applied_twice(drafts):
+    image = image_preprocess.preprocess(Image.open(io.BytesIO(photo(dpi=(600, 600)))), settings=RESIZE_ONLY)
+    assert drafts == [2]
+    assert image.size == (3000, 2250)
+
+
+def test_loaded_images_are_still_downscaled(drafts):
+    image = Image.open(io.BytesIO(photo()))
+    image.load()
+    assert image_preprocess.preprocess(image, settings=RESIZE_ONLY).size == (2481, 1861)
+    assert drafts == [None]
+
+
+def test_image_extraction_preprocesses_before_loading(config, drafts, monkeypatch):
+    config["OCR_PREPROCESS"] = {"image": {"binarize": False, "deskew": False, "crop_margins": False}}
+    seen = []
+    monkeypatch.setattr(ocr_backends, "image_to_string", lambda image: seen.append(image.size) or "Nguyen Van A")
+    assert extract_model.extract_text_from_image(photo()) == "Nguyen Van A"
+    assert drafts == [2]
+    assert seen == [(2481, 1861)]
@@ -0,0 +1,82 @@
+"""Check that importing byteowlscan stays within its startup-time budget.
+
+Runs each import in a fresh interpreter, takes the best of ``IMPORT_TIME_REPEAT``
+runs, and fails when it exceeds ``IMPORT_TIME_BUDGET_MS`` (200 ms by default) or
+when a heavy backend (OpenAI, PyMuPDF, Pillow, Tesseract, the tokenizers...) got
+loaded eagerly.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from byteowlscan.utilities.lazy_import import lazy_module
+
+# Modules that must only be loaded when a file of their format is processed
+HEAVY_MODULES = [
+    "aiohttp", "docx", "fitz", "mammoth", "markdownify", "numpy", "openai", "pdf2image",
+    "pdfminer.high_level", "PIL.Image", "pymupdf", "pytesseract", "requests",
+    "semantic_text_splitter", "tiktoken", "tokenizers",
+]
+
+# Statement timed in each interpreter: the package and the modules the CLI needs before parsing arguments
+TARGETS = ["byteowlscan", "byteowlscan.main"]
+
+PROBE = """
+import importlib, json, sys, time
+started = time.perf_counter()
+importlib.import_module({target!r})
+seconds = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules
+          and not type(sys.modules[name]).__name__ == "_LazyModule"]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 200))
+REPEAT = int(os.environ.get("IMPORT_TIME_REPEAT", 5))
+
+
+def probe(target):
+    """Imports ``target`` in a fresh interpreter and returns the import seconds and the heavy modules loaded."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    code = PROBE.format(target=target, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("target", TARGETS)
+def test_import_stays_within_budget(target):
+    runs = [probe(target) for _ in range(REPEAT)]
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    assert not loaded, f"import {target} loads {', '.join(loaded)}"
+    milliseconds = 1000 * min(run["seconds"] for run in runs)
+    assert milliseconds <= BUDGET_MS, f"import {target} takes {milliseconds:.1f} ms, over {BUDGET_MS:.0f} ms"
+
+
+def test_lazy_module_loads_once_across_threads(tmp_path, monkeypatch):
+    (tmp_path / "slow_backend.py").write_text(
+        "import time\ntime.sleep(0.2)\napi_key = None\nloads = globals().get('loads', 0) + 1\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "slow_backend", raising=False)
+
+    module = lazy_module("slow_backend")
+    module.api_key = "sk-test"
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(module.VALUE)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert values == [42] * 8
+    assert module.loads == 1
+    # Set before the load, like openai.api_key in main.run
+    assert module.api_key == "sk-test"
+    sys.modules.pop("slow_backend", None)
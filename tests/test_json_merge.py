@@ -0,0 +1,79 @@
+import pytest
+
+from byteowlscan.utilities import json_merge
+from byteowlscan.utilities.json_merge import CONCAT, FIRST_WINS, UNION, JsonMerger
+
+JOB = {"companyName": "Example Corp", "position": "Backend developer", "responsibilities": ["APIs", "On call"]}
+
+
+def merge(*chunks, **kwargs):
+    merger = JsonMerger(policies=kwargs.pop("policies", {}), **kwargs)
+    for chunk in chunks:
+        merger.add(chunk)
+    return merger.result
+
+
+def test_dicts_are_merged_key_by_key(config):
+    assert merge({"candidateInformation": {"fullName": "Nguyễn Văn An", "email": ""}},
+                 {"candidateInformation": {"phone": "0901234567", "email": None}, "skills": []},
+                 {"skills": ["Python"]}) == {
+        "candidateInformation": {"fullName": "Nguyễn Văn An", "phone": "0901234567"},
+        "skills": ["Python"],
+    }
+
+
+def test_duplicated_items_are_merged_once(config):
+    reordered = dict(reversed(list(JOB.items())))
+    result = merge({"workExperience": [JOB]}, {"workExperience": [reordered, {"companyName": "Other Corp"}]},
+                   {"skills": ["Python", "SQL"]}, {"skills": ["SQL", "Go"]})
+    assert result == {"workExperience": [JOB, {"companyName": "Other Corp"}], "skills": ["Python", "SQL", "Go"]}
+
+
+def test_conflicting_scalars_are_collected(config):
+    result = merge({"careerPlan": "Tech lead"}, {"careerPlan": "Architect"}, {"careerPlan": "Tech lead"},
+                   {"careerPlan": "CTO"})
+    assert result == {"careerPlan": ["Tech lead", "Architect", "CTO"]}
+
+
+def test_incoming_lists_extend_a_scalar(config):
+    assert merge({"skills": "Python"}, {"skills": ["Python", "SQL"]}) == {"skills": ["Python", "SQL"]}
+    assert merge({"skills": "Python"}, {"skills": ["SQL"]}, default_policy=CONCAT) == {"skills": ["Python", "SQL"]}
+    assert merge({"skills": ["Python"]}, {"skills": "SQL"}) == {"skills": ["Python", "SQL"]}
+
+
+def test_concat_keeps_duplicates(config):
+    result = merge({"skills": ["Python"], "careerPlan": "Lead"}, {"skills": ["Python"], "careerPlan": "Lead"},
+                   default_policy=CONCAT)
+    assert result == {"skills": ["Python", "Python"], "careerPlan": "Lead"}
+
+
+def test_first_wins_by_path_or_key(config):
+    policies = {"candidateInformation.fullName": FIRST_WINS, "skills": FIRST_WINS}
+    result = merge({"candidateInformation": {"fullName": "Nguyễn Văn An", "phone": "0901"}, "skills": ["Python"]},
+                   {"candidateInformation": {"fullName": "Nguyen Van An", "phone": "0912"}, "skills": ["Go"]},
+                   policies=policies, default_policy=UNION)
+    assert result == {"candidateInformation": {"fullName": "Nguyễn Văn An", "phone": ["0901", "0912"]},
+                      "skills": ["Python"]}
+
+
+def test_policies_come_from_the_config(config):
+    config["MERGE_DEFAULT_POLICY"] = FIRST_WINS
+    assert JsonMerger().add({"careerPlan": "Lead"}).add({"careerPlan": "CTO"}).result == {"careerPlan": "Lead"}
+    config["MERGE_POLICIES"] = {"careerPlan": "last-wins"}
+    with pytest.raises(ValueError):
+        JsonMerger()
+
+
+def test_existing_data_is_merged_into_and_invalid_chunks_skipped(config):
+    data = {"skills": ["Python"]}
+    merger = JsonMerger(data, policies={})
+    merger.add(["not", "a", "dict"]).add({"skills": ["Python", "Go"]}).add({"skills": [None, "", {}]})
+    assert merger.result is data
+    assert data == {"skills": ["Python", "Go"]}
+
+
+def test_prune_and_structural_hash():
+    assert json_merge.prune({"a": None, "b": [[], {"c": ""}], "d": 0, "e": False}) == {"d": 0, "e": False}
+    assert json_merge.prune([None, ""]) is json_merge._EMPTY
+    assert json_merge.structural_hash({"a": 1, "b": [1, 2]}) == json_merge.structural_hash({"b": [1, 2], "a": 1})
+    assert json_merge.structural_hash([1, 2]) != json_merge.structural_hash([2, 1])
@@ -0,0 +1,56 @@
+import random
+
+from byteowlscan.utilities.json_stream import IncrementalJsonParser, repair_json
+
+
+def test_complete_object_in_a_fence():
+    assert repair_json('```json\n{"a": 1, "b": [true, null]}\n```') == ({"a": 1, "b": [True, None]}, True)
+
+
+def test_cut_inside_a_string_keeps_its_beginning():
+    assert repair_json('{"name": "Nguyen Van A", "address": "12 Le L') == (
+        {"name": "Nguyen Van A", "address": "12 Le L"}, False)
+
+
+def test_cut_after_a_key_drops_it():
+    assert repair_json('{"a": {"b": [1, 2], "c"') == ({"a": {"b": [1, 2]}}, False)
+
+
+def test_cut_escape_is_dropped():
+    assert repair_json('{"a": "x\\u00e') == ({"a": "x"}, False)
+
+
+def test_cut_literal():
+    assert repair_json('{"a": 12') == ({"a": 12}, False)
+    assert repair_json('{"a": 1, "b": tru') == ({"a": 1}, False)
+
+
+def test_garbage_has_no_object():
+    assert repair_json("Sorry, I cannot help with that.") == (None, False)
+    assert repair_json("") == (None, False)
+
+
+def test_invalid_escape_in_a_key_does_not_raise():
+    assert repair_json('{"a\\_b": 1}') == (None, True)
+    assert repair_json('{"x": 1, "a\\_b": 1') == ({"x": 1}, False)
+
+
+def test_fields_are_reported_as_they_complete():
+    parser = IncrementalJsonParser()
+    fields = []
+    for piece in ['{"a": [1,', ' 2], "b', '": "x"', ', "c": {}}']:
+        fields.extend(parser.feed(piece))
+    assert fields == [("a", [1, 2]), ("b", "x"), ("c", {})]
+    assert parser.done and parser.result() == {"a": [1, 2], "b": "x", "c": {}}
+
+
+def test_random_input_never_raises():
+    rng = random.Random(0)
+    alphabet = '{}[]":,\\ abtrue0123456789.-nul\n'
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        repair_json(text)
+        parser = IncrementalJsonParser()
+        for start in range(0, len(text), 3):
+            parser.feed(text[start:start + 3])
+        parser.result()
@@ -0,0 +1,115 @@
+import pytest
+
+from byteowlscan.utilities import local_extract
+
+VIETNAMESE = """NGUYỄN VĂN AN
+Email: an.nguyen@example.vn | SĐT: 0901 234 567
+Ngày sinh: 12/05/1995
+Giới tính: Nam
+Địa chỉ: 12 Lê Lợi, Quận 1, TP. Hồ Chí Minh
+
+KINH NGHIỆM LÀM VIỆC
+Lập trình viên Backend tại Example Corp, 01/2019 - 12/2021
+Phụ trách hệ thống thanh toán, 2 triệu giao dịch mỗi ngày
+
+NGƯỜI THAM CHIẾU
+Trần Thị Bình - Trưởng phòng
+Điện thoại: 0912 345 678"""
+
+ENGLISH = """Personal information
+Full name: John Smith
+Date of birth: 1995-05-12
+Phone: +84 901 234 567, 0912 345 678
+Email: john.smith@example.com
+
+Work experience
+Backend developer at Example Corp
+Served 120000 users, 99.95 percent uptime in 2019-2021
+Built the billing service: 1 200 000 invoices per month"""
+
+
+def information(text):
+    data, residual, stats = local_extract.pre_extract(text)
+    return data.get("candidateInformation", {}), residual, stats
+
+
+def test_vietnamese_header_fields(config):
+    found, residual, stats = information(VIETNAMESE)
+    assert found == {
+        "fullName": "NGUYỄN VĂN AN",
+        "email": "an.nguyen@example.vn",
+        "phone": "0901 234 567",
+        "dateOfBirth": "12/05/1995",
+        "gender": "Nam",
+        "address": "12 Lê Lợi, Quận 1, TP. Hồ Chí Minh",
+    }
+    assert stats["lines_removed"] == 5
+    assert residual.startswith("\nKINH NGHIỆM LÀM VIỆC")
+
+
+def test_unaccented_labels_match(config):
+    found, _, _ = information("Ho va ten: Nguyen Van An\nSDT: 0901234567\nNgay sinh: 12-05-1995\nGioi tinh: nu")
+    assert found == {"fullName": "Nguyen Van An", "phone": "0901234567", "dateOfBirth": "12-05-1995",
+                     "gender": "nu"}
+
+
+def test_english_personal_section(config):
+    found, residual, _ = information(ENGLISH)
+    assert found == {
+        "fullName": "John Smith",
+        "dateOfBirth": "1995-05-12",
+        "phone": "+84 901 234 567, 0912 345 678",
+        "email": "john.smith@example.com",
+    }
+    # The emptied heading goes with its fields
+    assert not residual.lstrip().startswith("Personal information")
+    assert "Backend developer at Example Corp" in residual
+
+
+def test_body_text_is_left_alone(config):
+    _, residual, _ = information(VIETNAMESE)
+    # The reference's phone and the figures of the experience are no contact fields
+    assert "Điện thoại: 0912 345 678" in residual
+    assert "01/2019 - 12/2021" in residual
+    _, residual, _ = information(ENGLISH)
+    assert "Served 120000 users, 99.95 percent uptime in 2019-2021" in residual
+    assert "1 200 000 invoices per month" in residual
+
+
+@pytest.mark.parametrize("line", [
+    "01/2019 - 12/2021",
+    "2019 - 2021",
+    "Tel: 12/05/1995",
+    "Ngày sinh: 0901 234 567",
+    "Ngày sinh: 1995",
+    "Phone: call me after 6pm",
+    "Email: on request",
+    "CCCD: 0123 4567",
+    "Giới tính: Kỹ sư",
+    "Project Manager At Example",
+])
+def test_no_false_matches_in_header_lines(config, line):
+    found, residual, _ = information(f"Nguyễn Văn An\n{line}\n\nKinh nghiệm\nExample Corp")
+    assert found == {"fullName": "Nguyễn Văn An"}
+    assert line in residual.split("\n")
+
+
+def test_ambiguous_single_value_fields_are_left_to_gpt(config):
+    found, residual, _ = information("Địa chỉ: Hà Nội\nĐịa chỉ: Đà Nẵng\nEmail: a@example.vn\nEmail: b@example.vn")
+    assert found == {"email": "a@example.vn, b@example.vn"}
+    assert "Địa chỉ: Hà Nội\nĐịa chỉ: Đà Nẵng" in residual
+
+
+def test_local_fields_win_and_phones_are_combined():
+    local = {"candidateInformation": {"fullName": "Nguyễn Văn An", "phone": "0901 234 567"}}
+    result = {"candidateInformation": {"fullName": "Nguyen Van An", "phone": "+84 901 234 567; 0912345678"},
+              "skills": ["Python"]}
+    merged = local_extract.merge_local_fields(local, result)
+    assert merged == {"candidateInformation": {"fullName": "Nguyễn Văn An", "phone": "0901 234 567, 0912345678"},
+                      "skills": ["Python"]}
+    assert local_extract.merge_local_fields(local, "not json") == "not json"
+
+
+def test_local_extraction_can_be_disabled(config):
+    config["LOCAL_EXTRACT"] = False
+    assert local_extract.pre_extract_resume(VIETNAMESE) == ({}, VIETNAMESE)
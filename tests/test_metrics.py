@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from byteowlscan.utilities import metrics, text_compaction
+
+
+@pytest.fixture
+def collected(monkeypatch):
+    """Metrics collected from an empty state, restored afterwards."""
+    monkeypatch.setattr(metrics, "_counters", {})
+    monkeypatch.setattr(metrics, "_histograms", {})
+    monkeypatch.setattr(metrics, "_buckets", dict(metrics._buckets))
+    monkeypatch.setattr(metrics, "_enabled", True)
+
+
+def bucket_lines(name):
+    return [line for line in metrics.to_prometheus().splitlines() if line.startswith(f"byteowlscan_{name}_bucket")]
+
+
+def test_durations_use_the_default_buckets(collected):
+    metrics.observe("stage_seconds", 0.3, stage="parse")
+    lines = bucket_lines("stage_seconds")
+    assert len(lines) == len(metrics.DEFAULT_BUCKETS) + 1
+    assert 'byteowlscan_stage_seconds_bucket{stage="parse",le="0.25"} 0' in lines
+    assert 'byteowlscan_stage_seconds_bucket{stage="parse",le="0.5"} 1' in lines
+
+
+def test_prompt_cache_ratio_uses_ratio_buckets(collected):
+    for cached in (0, 512, 1024, 1536):
+        metrics.record_usage({"usage": {"prompt_tokens": 2048, "prompt_tokens_details": {"cached_tokens": cached}}},
+                             "extract")
+    lines = bucket_lines("prompt_cache_ratio")
+    assert len(lines) == len(metrics.RATIO_BUCKETS) + 1
+    assert 'byteowlscan_prompt_cache_ratio_bucket{call="extract",le="0.0"} 1' in lines
+    assert 'byteowlscan_prompt_cache_ratio_bucket{call="extract",le="0.5"} 3' in lines
+    assert 'byteowlscan_prompt_cache_ratio_bucket{call="extract",le="0.8"} 4' in lines
+    assert metrics.quantile("prompt_cache_ratio", 0.5, call="extract") == pytest.approx(0.3, abs=0.1)
+
+
+def test_histograms_set_their_own_buckets(collected):
+    metrics.set_buckets("pages", (1, 2, 5, 10))
+    for pages in (1, 3, 3, 12):
+        metrics.observe("pages", pages)
+    assert bucket_lines("pages") == [
+        'byteowlscan_pages_bucket{le="1"} 1',
+        'byteowlscan_pages_bucket{le="2"} 1',
+        'byteowlscan_pages_bucket{le="5"} 3',
+        'byteowlscan_pages_bucket{le="10"} 3',
+        'byteowlscan_pages_bucket{le="+Inf"} 4',
+    ]
+
+
+def test_merged_snapshots_keep_their_buckets(collected):
+    text_compaction.compact_resume_text("Nguyen Van A\n\nPage 1 of 2\nBackend developer\nPage 2 of 2")
+    snapshot = pickle.loads(pickle.dumps(metrics.snapshot()))
+    metrics.reset()
+    metrics.merge(snapshot)
+    metrics.merge(snapshot)
+    lines = bucket_lines("compact_saved_ratio")
+    assert len(lines) == len(metrics.RATIO_BUCKETS) + 1
+    assert lines[-1] == 'byteowlscan_compact_saved_ratio_bucket{le="+Inf"} 2'
+
+
+def test_label_values_are_escaped(collected):
+    metrics.inc("resumes_total", file='C:\\cv "final"\nv2.pdf')
+    assert 'byteowlscan_resumes_total{file="C:\\\\cv \\"final\\"\\nv2.pdf"} 1' in metrics.to_prometheus().splitlines()
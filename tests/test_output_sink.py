@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+from byteowlscan import main
+from byteowlscan.utilities import output_sink
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as jsonl_file:
+        return [json.loads(line) for line in jsonl_file]
+
+
+def test_file_sink_writes_one_file_per_resume(tmp_path):
+    sink = output_sink.FileSink(str(tmp_path / "out"))
+    first = sink.write("a/CV.pdf", {"fullName": "Nguyễn Văn A"})
+    second = sink.write("b/CV.pdf", {"fullName": "Trần Thị B"})
+    assert first != second
+    with open(first, encoding="utf-8") as json_file:
+        assert json.load(json_file) == {"fullName": "Nguyễn Văn A"}
+    assert sorted(os.listdir(tmp_path / "out")) == sorted([os.path.basename(first), os.path.basename(second)])
+    durable = []
+    sink.when_durable("a/CV.pdf", lambda: durable.append("a/CV.pdf"))
+    assert durable == ["a/CV.pdf"]
+
+
+def test_jsonl_sink_writes_in_batches(tmp_path):
+    path = str(tmp_path / "resumes.jsonl")
+    durable = []
+    with output_sink.JsonlSink(path, batch_size=2) as sink:
+        sink.write("a.pdf", {"n": 1}, {"parse": 0.5}, sha256="a")
+        sink.when_durable("a.pdf", lambda: durable.append("a.pdf"))
+        assert not os.path.exists(path) or not read_lines(path)
+        assert durable == []
+        sink.write("b.pdf", {"n": 2}, sha256="b")
+        assert durable == ["a.pdf"]
+        # Already written
+        sink.when_durable("a.pdf", lambda: durable.append("a.pdf again"))
+        sink.write("c.pdf", {"n": 3}, sha256="c")
+        sink.when_durable("c.pdf", lambda: durable.append("c.pdf"))
+    assert durable == ["a.pdf", "a.pdf again", "c.pdf"]
+    records = read_lines(path)
+    assert [(record["source"], record["sha256"], record["data"]) for record in records] == [
+        ("a.pdf", "a", {"n": 1}), ("b.pdf", "b", {"n": 2}), ("c.pdf", "c", {"n": 3})]
+    assert records[0]["timings"] == {"parse": 0.5}
+
+
+def test_a_failed_batch_is_dropped_and_reported(tmp_path, monkeypatch):
+    path = str(tmp_path / "resumes.jsonl")
+    sink = output_sink.JsonlSink(path, batch_size=2)
+    sink.write("ok.pdf", {"n": 0}, sha256="0")
+    sink.write("ok2.pdf", {"n": 0}, sha256="0")
+    outcomes = []
+    sink.write("a.pdf", {"n": 1}, sha256="a")
+    sink.when_durable("a.pdf", lambda: outcomes.append(("a.pdf", None)),
+                      on_error=lambda message: outcomes.append(("a.pdf", message)))
+
+    fsync = os.fsync
+
+    def failing_fsync(fd):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(output_sink.os, "fsync", failing_fsync)
+    with pytest.raises(OSError, match="No space left"):
+        sink.write("b.pdf", {"n": 2}, sha256="b")
+    assert outcomes == [("a.pdf", "Output write failed: [Errno 28] No space left on device")]
+
+    monkeypatch.setattr(output_sink.os, "fsync", fsync)
+    sink.write("c.pdf", {"n": 3}, sha256="c")
+    sink.close()
+    # Neither the failed batch nor a part of it reaches the file later
+    assert [record["source"] for record in read_lines(path)] == ["ok.pdf", "ok2.pdf", "c.pdf"]
+
+
+def test_failed_batches_are_recorded_as_failures(tmp_path, monkeypatch):
+    recorded = []
+
+    def record(path, output, error, timings, sha256=None):
+        recorded.append((path, output, error))
+
+    def failing_fsync(fd):
+        raise OSError("EIO")
+
+    sink = output_sink.JsonlSink(str(tmp_path / "resumes.jsonl"), batch_size=10)
+    sink.write("a.pdf", {"n": 1}, sha256="a")
+    main.record_when_durable("a.pdf", sink.file_path, None, {}, "a", sink=sink, record_fn=record)
+    monkeypatch.setattr(output_sink.os, "fsync", failing_fsync)
+    with pytest.raises(OSError):
+        sink.flush()
+    assert recorded == [("a.pdf", None, "Output write failed: EIO")]
+
+
+def test_sharded_sink_rolls_over(tmp_path):
+    directory = str(tmp_path / "shards")
+    with output_sink.ShardedJsonlSink(directory, max_bytes=600, batch_size=1) as sink:
+        for n in range(10):
+            sink.write(f"{n}.pdf", {"summary": "x" * 100})
+    shards = sorted(os.listdir(directory))
+    assert shards[0] == "resumes-00000.jsonl" and len(shards) > 1
+    assert all(os.path.getsize(os.path.join(directory, name)) <= 600 for name in shards)
+    sources = [record["source"] for name in shards for record in read_lines(os.path.join(directory, name))]
+    assert sources == [f"{n}.pdf" for n in range(10)]
+
+
+def test_sharded_sink_starts_after_the_last_shard(tmp_path):
+    directory = tmp_path / "shards"
+    directory.mkdir()
+    (directory / "resumes-00000.jsonl").write_text("{}\n")
+    (directory / "resumes-00003.jsonl").write_text("{}\n")
+    (directory / "other-00007.jsonl").write_text("{}\n")
+    with output_sink.ShardedJsonlSink(str(directory), max_bytes=10 ** 6) as sink:
+        sink.write("a.pdf", {})
+    assert sink.file_path.endswith("resumes-00004.jsonl")
+    assert (directory / "resumes-00003.jsonl").read_text() == "{}\n"
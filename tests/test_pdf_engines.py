@@ -0,0 +1,119 @@
+import io
+
+import pymupdf
+import pytest
+from PIL import Image
+
+from byteowlscan.models import extract_model, ocr_engine, pdf_engines
+
+TEXT = ("Nguyen Van A, backend developer at Example Corp since 2019. Built the payment and billing "
+        "services, mentored two junior developers and ran the on-call rotation.")
+
+
+def scan(size):
+    """A PNG standing for a scanned page."""
+    buffer = io.BytesIO()
+    Image.new("L", size, 200).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def write_text(page, text, top=72, render_mode=0):
+    words, line = text.split(), []
+    for word in words:
+        line.append(word)
+        if len(line) == 8:
+            page.insert_text((72, top), " ".join(line), fontsize=11, render_mode=render_mode)
+            top, line = top + 16, []
+    if line:
+        page.insert_text((72, top), " ".join(line), fontsize=11, render_mode=render_mode)
+
+
+@pytest.fixture
+def pdf():
+    """A PDF of a text page, a scan, a scan under a header, a text page with a photo and a hidden OCR layer."""
+    document = pymupdf.open()
+    write_text(document.new_page(), TEXT * 3)
+    document.new_page().insert_image(pymupdf.Rect(0, 0, 595, 842), stream=scan((300, 420)), keep_proportion=False)
+    page = document.new_page()
+    page.insert_image(pymupdf.Rect(0, 60, 595, 842), stream=scan((300, 400)))
+    write_text(page, "Nguyen Van A - Curriculum vitae", top=30)
+    page = document.new_page()
+    page.insert_image(pymupdf.Rect(420, 40, 540, 180), stream=scan((120, 140)))
+    write_text(page, TEXT * 3, top=220)
+    page = document.new_page()
+    page.insert_image(pymupdf.Rect(0, 0, 595, 842), stream=scan((300, 420)), keep_proportion=False)
+    write_text(page, TEXT, render_mode=3)
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def test_pages_are_classified(config, pdf):
+    _, pages = pdf_engines.extract_pdf_pages(pdf, "pymupdf", [])
+    profiles = pdf_engines.profile_pages(pdf, pages)
+    assert [pdf_engines.needs_ocr(profiles[page]) for page in sorted(profiles)] == [
+        None, "no text", "scanned", None, "invisible text"]
+    assert profiles[2]["image_coverage"] == pytest.approx(1.0)
+    assert 0 < profiles[4]["image_coverage"] < 0.1
+    assert pdf_engines.pages_needing_ocr(pdf, pages) == [2, 3, 5]
+
+
+def test_pages_are_classified_from_their_text_when_unreadable(config):
+    pages = {1: TEXT, 2: "  "}
+    assert pdf_engines.pages_needing_ocr(b"%PDF-1.7 truncated", pages) == [2]
+
+
+def test_thresholds_come_from_the_config(config, pdf):
+    config["PDF_OCR_IMAGE_COVERAGE"] = 1.1
+    _, pages = pdf_engines.extract_pdf_pages(pdf, "pymupdf", [])
+    assert pdf_engines.pages_needing_ocr(pdf, pages) == [2, 5]
+
+
+@pytest.mark.parametrize("engine", ["pymupdf", "pdfminer"])
+def test_engines_extract_each_page(config, pdf, engine):
+    pages = pdf_engines.get_engine(engine)(pdf)
+    assert sorted(pages) == [1, 2, 3, 4, 5]
+    assert "Example Corp" in pages[1]
+    assert not pages[2].strip()
+    assert "Curriculum vitae" in pages[3]
+    assert sorted(pdf_engines.get_engine(engine)(pdf, [4, 1])) == [1, 4]
+
+
+def test_engine_registry(config, pdf, monkeypatch):
+    assert {"pymupdf", "pdfminer", "ocr"} <= set(pdf_engines.available_engines())
+    with pytest.raises(ValueError, match="Unknown PDF engine: missing"):
+        pdf_engines.get_engine("missing")
+
+    monkeypatch.setattr(pdf_engines, "_engines", dict(pdf_engines._engines))
+
+    @pdf_engines.register_engine("broken")
+    def broken(pdf_path, page_numbers=None):
+        raise RuntimeError("cannot read")
+
+    assert pdf_engines.get_engine("broken") is broken
+    name, pages = pdf_engines.extract_pdf_pages(pdf, "broken", ["missing", "pymupdf"])
+    assert name == "pymupdf"
+    assert len(pages) == 5
+    with pytest.raises(RuntimeError, match="cannot read"):
+        pdf_engines.extract_pdf_pages(pdf, "broken", [])
+
+
+def test_only_pages_needing_ocr_are_ocrd(config, pdf, monkeypatch):
+    requested = []
+
+    def ocr(source, page_numbers=None):
+        requested.extend(page_numbers)
+        # Longer than the text layers, so that it replaces them
+        return {page: f"ocr {page} {TEXT}" for page in page_numbers}
+
+    monkeypatch.setattr(ocr_engine, "ocr_pdf_pages", ocr)
+    text = extract_model.extract_text_from_pdf(pdf)
+    assert requested == [2, 3, 5]
+    pages = text.split("\f")
+    assert "Example Corp" in pages[0] and "Example Corp" in pages[3]
+    assert [page.split()[1] for page in pages[1:3] + pages[4:]] == ["2", "3", "5"]
+
+
+def test_page_ranges():
+    assert ocr_engine.page_ranges_of([1, 2, 3, 5, 6, 9], 2) == [(1, 2), (3, 3), (5, 6), (9, 9)]
+    assert ocr_engine.page_ranges_of([], 4) == []
@@ -0,0 +1,82 @@
+import os
+import threading
+
+from byteowlscan.utilities import pipeline
+
+PATHS = [f"resume-{n}.pdf" for n in range(12)]
+
+
+class WriterCrash(BaseException):
+    pass
+
+
+def parse_text(path):
+    return f"text of {path}"
+
+
+def parse_or_die(path):
+    if path == "resume-3.pdf":
+        # Kills the worker, which breaks the whole pool
+        os._exit(1)
+    return parse_text(path)
+
+
+def run(parse_fn=parse_text, save_fn=None, **options):
+    outcomes = {}
+
+    def done(path, output, error, timings, sha256):
+        assert path not in outcomes
+        outcomes[path] = (output, error)
+
+    counts = pipeline.run_pipeline(
+        PATHS, parse_fn,
+        extract_fn=lambda path, text: {"text": text},
+        save_fn=save_fn or (lambda path, data, timings, sha256: f"out/{path}"),
+        done_fn=done, parse_workers=2, extract_workers=2, queue_size=2, **options)
+    return counts, outcomes
+
+
+def test_every_file_is_saved_and_recorded():
+    counts, outcomes = run()
+    assert counts == {"succeeded": 12, "failed": 0}
+    assert outcomes == {path: (f"out/{path}", None) for path in PATHS}
+
+
+def test_files_left_by_a_broken_parse_pool_are_failed():
+    counts, outcomes = run(parse_or_die)
+    assert set(outcomes) == set(PATHS)
+    assert counts["failed"] >= 1
+    assert counts["succeeded"] + counts["failed"] == len(PATHS)
+    assert outcomes["resume-3.pdf"][1]
+    assert all(output is None for output, error in outcomes.values() if error)
+
+
+def test_a_failing_save_stage_stops_the_pipeline():
+    def save(path, data, timings, sha256):
+        raise WriterCrash()
+
+    raised = []
+
+    def target():
+        try:
+            run(save_fn=save)
+        except WriterCrash as e:
+            raised.append(e)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "the pipeline is blocked"
+    assert raised
+
+
+def test_save_errors_fail_their_file_only():
+    def save(path, data, timings, sha256):
+        if path == "resume-5.pdf":
+            raise OSError("disk full")
+        return f"out/{path}"
+
+    counts, outcomes = run(save_fn=save)
+    assert counts == {"succeeded": 11, "failed": 1}
+    assert outcomes["resume-5.pdf"] == (None, "disk full")
+
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from byteowlscan.utilities import result_cache
+
+
+def open_cache(tmp_path, max_bytes=1000, access_resolution=0.0):
+    return result_cache.ResultCache(str(tmp_path / "cache"), max_bytes, access_resolution)
+
+
+def total_size(cache):
+    with cache._connect() as conn:
+        return conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+
+
+def last_access(cache, namespace, key):
+    with cache._connect() as conn:
+        return conn.execute("SELECT last_access FROM entries WHERE namespace = ? AND key = ?",
+                            (namespace, key)).fetchone()[0]
+
+
+def test_hits_and_misses(tmp_path):
+    cache = open_cache(tmp_path)
+    assert cache.get("text", "a") is None
+    cache.set("text", "a", "Nguyễn Văn A")
+    assert cache.get("text", "a") == "Nguyễn Văn A"
+    cache.set("text", "a", "Nguyen Van A")
+    assert cache.get("text", "a") == "Nguyen Van A"
+
+
+def test_namespaces_are_isolated(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("text", "a", "text")
+    cache.set("result", "a", "{}")
+    assert cache.get("text", "a") == "text"
+    assert cache.get("result", "a") == "{}"
+    assert cache.get("preprocessed", "a") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(clock))
+    cache = open_cache(tmp_path, max_bytes=300)
+    for key in "abc":
+        cache.set("text", key, key * 100)
+    # a becomes the most recently used, b the least
+    assert cache.get("text", "a") == "a" * 100
+    cache.set("text", "d", "d" * 100)
+    assert cache.get("text", "b") is None
+    assert [cache.get("text", key) is not None for key in "acd"] == [True, True, True]
+    assert total_size(cache) == 300
+
+
+def test_values_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = open_cache(tmp_path, max_bytes=10)
+    cache.set("text", "a", "x" * 11)
+    assert cache.get("text", "a") is None
+    assert total_size(cache) == 0
+
+
+def test_the_total_size_follows_writes(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("text", "a", "x" * 100)
+    cache.set("text", "b", "é" * 50)
+    assert total_size(cache) == 200
+    cache.set("text", "a", "x" * 10)
+    assert total_size(cache) == 110
+
+
+def test_reopening_keeps_the_entries_and_the_total(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.set("text", "a", "x" * 100)
+    reopened = open_cache(tmp_path)
+    assert reopened.get("text", "a") == "x" * 100
+    assert total_size(reopened) == 100
+
+
+def test_an_older_cache_is_seeded_once(tmp_path):
+    (tmp_path / "cache").mkdir()
+    with sqlite3.connect(tmp_path / "cache" / "cache.sqlite3") as conn:
+        conn.execute("CREATE TABLE entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                     " size INTEGER NOT NULL, last_access REAL NOT NULL, PRIMARY KEY (namespace, key))")
+        conn.execute("INSERT INTO entries VALUES ('text', 'a', 'xxxx', 4, 0)")
+    conn.close()
+    assert total_size(open_cache(tmp_path)) == 4
+    assert total_size(open_cache(tmp_path)) == 4
+
+
+def test_recent_hits_do_not_write(tmp_path):
+    cache = open_cache(tmp_path, access_resolution=3600)
+    cache.set("text", "a", "x")
+    accessed = last_access(cache, "text", "a")
+    assert cache.get("text", "a") == "x"
+    assert last_access(cache, "text", "a") == accessed
+
+
+def test_old_hits_refresh_the_access_time(tmp_path, monkeypatch):
+    cache = open_cache(tmp_path, access_resolution=60)
+    cache.set("text", "a", "x")
+    accessed = last_access(cache, "text", "a")
+    monkeypatch.setattr(result_cache.time, "time", lambda: accessed + 61)
+    assert cache.get("text", "a") == "x"
+    assert last_access(cache, "text", "a") == pytest.approx(accessed + 61)
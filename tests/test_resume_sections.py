@@ -0,0 +1,78 @@
+import pytest
+
+from byteowlscan.utilities import resume_sections
+
+RESUME = """Nguyễn Văn An
+an.nguyen@example.vn
+
+I. HỌC VẤN
+Đại học Bách Khoa, 2013 - 2017
+
+2. Kinh nghiệm làm việc:
+Backend developer, Example Corp
+Experience
+Payment systems, three years
+
+- Kỹ năng
+Python, SQL
+Kỹ năng mềm:
+Teamwork
+Chứng chỉ"""
+
+
+@pytest.mark.parametrize("line, key", [
+    ("HỌC VẤN", "education"),
+    ("Hoc van", "education"),
+    ("II. Kinh nghiệm làm việc", "workExperience"),
+    ("3) Kỹ năng mềm", "skills"),
+    ("- Ngoại ngữ", "languageSkills"),
+    ("• Dự án tiêu biểu", "projects"),
+    ("Thông tin cá nhân:", "candidateInformation"),
+    ("Thong tin ca nhan：", "candidateInformation"),
+    ("Work experience", "workExperience"),
+    ("EXPERIENCE", "workExperience"),
+    ("Experience:", "workExperience"),
+    ("1. Experience", "workExperience"),
+    ("SUMMARY", "candidateInformation"),
+    ("Contact:", "candidateInformation"),
+])
+def test_headings(line, key):
+    assert resume_sections.heading_key(line) == key
+
+
+@pytest.mark.parametrize("line", ["Experience", "Summary", "Profile", "contact", "- Training",
+                                  "Học vấn và kinh nghiệm", "Backend developer with Python skills",
+                                  "Kỹ năng " + "x" * 60, ""])
+def test_lines_that_are_not_headings(line):
+    assert resume_sections.heading_key(line) is None
+
+
+def test_find_sections():
+    assert resume_sections.find_sections(RESUME) == [
+        ("education", 3, 6),
+        ("workExperience", 6, 11),
+        ("skills", 11, 13),
+        ("skills", 13, 15),
+        ("trainingCourses", 15, 16),
+    ]
+
+
+def test_split_sections_routes_the_preamble_and_joins_same_keys():
+    parts = dict(resume_sections.split_sections(RESUME))
+    assert list(parts) == [("candidateInformation",), ("education",), ("workExperience",), ("skills",)]
+    assert parts[("candidateInformation",)] == "Nguyễn Văn An\nan.nguyen@example.vn"
+    # A body line reading "Experience" stays in its section
+    assert parts[("workExperience",)].endswith("Experience\nPayment systems, three years")
+    assert parts[("skills",)] == "- Kỹ năng\nPython, SQL\n\nKỹ năng mềm:\nTeamwork"
+
+
+def test_split_sections_groups_short_sections(config):
+    text = RESUME.replace("Payment systems, three years", "Payment systems, three years. " * 100)
+    parts = resume_sections.split_sections(text, min_tokens=100)
+    assert [keys for keys, _ in parts] == [("workExperience",), ("candidateInformation", "education", "skills")]
+    assert parts[1][1].startswith("Nguyễn Văn An\nan.nguyen@example.vn\n\nI. HỌC VẤN")
+
+
+def test_text_without_headings_is_not_split():
+    assert resume_sections.find_sections("Nguyễn Văn An\nBackend developer") == []
+    assert resume_sections.split_sections("Nguyễn Văn An\nBackend developer") == []
@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+
+from byteowlscan.utilities import result_cache, run_manifest
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Records the SQLite connections opened by the manifest and the cache."""
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(sqlite3, "connect", tracking_connect)
+    return opened
+
+
+def assert_closed(connections):
+    assert connections
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+def test_manifest_closes_its_connections(tmp_path, connections):
+    manifest = run_manifest.RunManifest(str(tmp_path / "manifest.sqlite3"))
+    run_id = manifest.start_run(2)
+    manifest.record(run_id, "a.pdf", run_manifest.SUCCEEDED, output="out/a.json", sha256="a")
+    manifest.record(run_id, "b.pdf", run_manifest.FAILED, error="damaged", sha256="b")
+    manifest.finish_run(run_id)
+    assert manifest.summary(run_id)["succeeded"] == 1
+    assert manifest.failures(run_id) == [("b.pdf", "damaged")]
+    assert manifest.run_ids() == [run_id]
+    assert_closed(connections)
+
+
+def test_failed_statements_roll_back_and_close(tmp_path, connections):
+    manifest = run_manifest.RunManifest(str(tmp_path / "manifest.sqlite3"))
+    with pytest.raises(sqlite3.OperationalError):
+        with manifest._connect() as conn:
+            conn.execute("INSERT INTO runs (started_at, total) VALUES (0, 1)")
+            conn.execute("SELECT * FROM missing_table")
+    assert manifest.run_ids() == []
+    assert_closed(connections)
+
+
+def test_cache_closes_its_connections(tmp_path, connections):
+    cache = result_cache.ResultCache(str(tmp_path / "cache"), max_bytes=1024)
+    cache.set("text", "key", "value")
+    assert cache.get("text", "key") == "value"
+    assert_closed(connections)
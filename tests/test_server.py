@@ -0,0 +1,137 @@
+import http.client
+import json
+import os
+import socket
+
+import pytest
+import requests
+
+from byteowlscan.server import ResumeServer
+from byteowlscan.utilities import initArgs
+
+
+def write_docx(path, lines):
+    from docx import Document
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """An input root holding a resume, next to a file outside it."""
+    root = tmp_path / "inputs"
+    root.mkdir()
+    write_docx(root / "cv.docx", ["Nguyen Van A", "Experience", "Backend developer at Example Corp"])
+    write_docx(tmp_path / "secret.docx", ["Not for the server"])
+    return root
+
+
+@pytest.fixture
+def server(config, scheduler, fake_openai, inputs):
+    config["SERVER_INPUT_ROOT"] = str(inputs)
+    args = initArgs(["--parseWorkers", "1", "--gptConcurrency", "2"])
+    with ResumeServer(args, port=0) as server:
+        yield server
+
+
+def post_job(server, params=None, **kwargs):
+    return requests.post(f"{server.url}/jobs", params=dict(params or {}, wait="true"), timeout=60, **kwargs)
+
+
+def test_job_by_path_under_the_input_root(server, fake_openai):
+    response = post_job(server, json={"paths": ["cv.docx"]})
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert job["errors"] == {}
+    path = os.path.join(server.input_root, "cv.docx")
+    assert job["results"][path]["candidateInformation"]["fullName"]
+    assert fake_openai.request_count >= 1
+
+    assert requests.get(f"{server.url}/jobs/{job['id']}", timeout=10).json()["status"] == "succeeded"
+    assert requests.get(f"{server.url}/health", timeout=10).json()["jobs"]["succeeded"] == 1
+
+
+def test_upload_job(server, inputs):
+    data = (inputs / "cv.docx").read_bytes()
+    response = post_job(server, params={"filename": "cv.docx"}, data=data)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "succeeded"
+    [name] = job["results"]
+    assert name.endswith("_cv.docx")
+
+
+def test_job_without_wait_is_polled(server):
+    response = requests.post(f"{server.url}/jobs", json={"path": "cv.docx"}, timeout=10)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    server.jobs[job_id]["future"].result(timeout=60)
+    assert requests.get(f"{server.url}/jobs/{job_id}", timeout=10).json()["status"] == "succeeded"
+    assert requests.get(f"{server.url}/jobs/unknown", timeout=10).status_code == 404
+
+
+@pytest.mark.parametrize("path", ["../secret.docx", "{root}/../secret.docx", "{parent}/secret.docx", "/etc/passwd"])
+def test_paths_outside_the_input_root_are_rejected(server, fake_openai, inputs, path):
+    path = path.format(root=inputs, parent=inputs.parent)
+    response = post_job(server, json={"paths": ["cv.docx", path]})
+    assert response.status_code == 403
+    assert response.json()["rejected"] == [path]
+    assert not server.jobs
+    assert fake_openai.request_count == 0
+
+
+def test_symlinks_out_of_the_input_root_are_rejected(server, inputs):
+    os.symlink(inputs.parent / "secret.docx", inputs / "link.docx")
+    response = post_job(server, json={"paths": ["link.docx"]})
+    assert response.status_code == 403
+    assert not server.jobs
+
+
+def test_missing_files_are_reported(server):
+    response = post_job(server, json={"paths": ["missing.docx"]})
+    assert response.status_code == 400
+    assert response.json()["missing"] == ["missing.docx"]
+
+
+def test_jobs_by_path_need_an_input_root(config, scheduler, fake_openai, inputs):
+    config["SERVER_INPUT_ROOT"] = ""
+    with ResumeServer(initArgs(["--parseWorkers", "1"]), port=0) as server:
+        response = post_job(server, json={"paths": [str(inputs / "cv.docx")]})
+        assert response.status_code == 403
+        assert not server.jobs
+
+
+def raw_post(server, headers, body=b""):
+    """Sends a POST /jobs with exactly the given headers and returns the status and the JSON answer."""
+    with socket.create_connection(server._httpd.server_address[:2], timeout=10) as sock:
+        sock.sendall(b"POST /jobs HTTP/1.1\r\nHost: localhost\r\n" + headers + b"\r\n" + body)
+        # Nothing more is sent, e.g. the rest of an announced body
+        sock.shutdown(socket.SHUT_WR)
+        response = http.client.HTTPResponse(sock)
+        response.begin()
+        return response.status, json.loads(response.read())
+
+
+@pytest.mark.parametrize("headers, status", [
+    (b"", 411),
+    (b"Content-Length: abc\r\n", 400),
+    (b"Content-Length: -1\r\n", 400),
+    (b"Content-Length: 1000000000000\r\n", 413),
+    (b"Content-Length: 100\r\n", 400),
+])
+def test_bad_content_lengths_are_refused(server, headers, status):
+    answer_status, answer = raw_post(server, headers, b'{"paths": ["cv.docx"]}')
+    assert answer_status == status
+    assert answer["error"]
+    assert not server.jobs
+
+
+@pytest.mark.parametrize("body", [b"[1]", b'"cv.docx"', b'{"paths": [1]}', b'{"paths": "cv.docx"}',
+                                  b'{"paths": [["cv.docx"]]}', b'{"path": {"a": 1}}'])
+def test_malformed_job_bodies_are_refused(server, body):
+    response = post_job(server, data=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert not server.jobs
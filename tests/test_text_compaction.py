@@ -0,0 +1,68 @@
+from byteowlscan.utilities import text_compaction
+
+BULLET = "- Designed REST APIs for the payment and billing services"
+
+
+def compact(config, text, **settings):
+    config.update(settings)
+    return text_compaction.compact_text(text)
+
+
+def test_bullets_repeated_under_two_jobs_are_kept(config):
+    text = "\n".join(["Experience", "Backend developer, Example Corp", BULLET, "- Mentored two juniors",
+                      "Backend developer, Other Corp", BULLET])
+    compacted, stats = compact(config, text)
+    assert compacted == text
+    assert stats["duplicate_lines"] == 0
+
+
+def test_adjacent_repeated_lines_are_removed(config):
+    compacted, stats = compact(config, f"Experience\n{BULLET}\n\n{BULLET.upper()}\n- Mentored two juniors")
+    assert compacted == f"Experience\n{BULLET}\n\n- Mentored two juniors"
+    assert stats["duplicate_lines"] == 1
+
+
+def test_short_adjacent_repeats_are_kept(config):
+    compacted, stats = compact(config, "Skills\nPython\nPython")
+    assert compacted == "Skills\nPython\nPython"
+    assert stats["duplicate_lines"] == 0
+
+
+def test_indentation_is_kept(config):
+    compacted, _ = compact(config, "- Example Corp  \n  - Built  the\tbilling   service\n\t- On call\n   \nEnd")
+    assert compacted == "- Example Corp\n  - Built the billing service\n\t- On call\n\nEnd"
+
+
+def test_headers_footers_and_page_numbers_are_removed(config):
+    pages = [f"Nguyen Van A - CV\nLine {page} of the resume\nNguyen Van A - Page {page} of 3\n{page}"
+             for page in (1, 2, 3)]
+    compacted, stats = compact(config, "\f".join(pages))
+    assert compacted.splitlines() == ["Nguyen Van A - CV", "Line 1 of the resume", "Nguyen Van A - Page 1 of 3",
+                                      "Line 2 of the resume", "Line 3 of the resume"]
+    assert stats["furniture_lines"] == 7
+
+
+def test_numbers_at_the_edge_of_a_single_page_are_kept(config):
+    pages = ["Summary\nBackend developer\n5", "Experience\nExample Corp\nSkills"]
+    compacted, stats = compact(config, "\f".join(pages))
+    assert compacted.splitlines()[2] == "5"
+    assert stats["furniture_lines"] == 0
+
+
+def test_single_page_text_has_no_furniture(config):
+    compacted, stats = compact(config, "1\nNguyen Van A\n2")
+    assert compacted == "1\nNguyen Van A\n2"
+    assert stats["furniture_lines"] == 0
+
+
+def test_text_is_truncated_at_a_line_boundary(config):
+    text = "\n".join(f"Line {i} of the resume" for i in range(200))
+    compacted, stats = compact(config, text, COMPACT_MAX_INPUT_TOKENS=50)
+    assert stats["truncated"]
+    assert stats["tokens_after"] <= 50
+    assert text.startswith(compacted + "\n")
+
+
+def test_compaction_can_be_disabled(config):
+    config["COMPACT_TEXT"] = False
+    assert text_compaction.compact_resume_text(f"{BULLET}\n{BULLET}") == f"{BULLET}\n{BULLET}"